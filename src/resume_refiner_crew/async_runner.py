@@ -0,0 +1,342 @@
+"""Asyncio runner: drive many crew runs from one event loop.
+
+A crew run mostly waits on LLM responses, but it cannot simply be awaited in
+the caller's process: CrewAI's Crew.kickoff_async runs the blocking kickoff in
+a worker thread (its LLM clients have no async path), and a run writes its
+inputs, outputs, checkpoints and logs to paths relative to the working
+directory, so two runs in one process overwrite each other's files.
+
+AsyncCrewRunner therefore runs every pipeline in a child process, in its own
+workspace under ASYNC_RUNS_DIR (a copy of the knowledge and templates
+folders), and awaits the process on the event loop:
+
+- a running pipeline holds no thread of the runner, so one event loop drives
+  any number of runs; at most max_concurrency execute at once and further
+  submissions wait for a free slot
+- the child process calls run_crew_with_params with the submission it reads
+  from stdin (the API key is never put in its environment or command line)
+  and writes the CrewResult to ASYNC_RESULT_FILENAME; the runner returns it
+  with its paths inside the workspace
+- the output of the run is logged to ASYNC_RUN_LOG_FILENAME in the workspace;
+  the run's requests are queued with 'batch' priority, and the CrewAI storage
+  folder named after the workspace is deleted once the run is over
+- before its first run, a runner deletes the workspaces of earlier runs
+  beyond the newest ASYNC_RUNS_KEEP
+- a submission identical to one in flight joins it instead of taking a slot
+  (see single_flight), and every waiter receives the shared CrewResult
+- cancelling a submission kills its child process, once no other waiter of
+  the same run is left
+
+Runs are isolated by their workspace, not by their RunConfig (see
+run_config): the child process works in it, so its knowledge inputs,
+outputs, checkpoints and CrewAI storage stay apart from every other run.
+The rate-limit budget is the one thing the runs share: every child opens
+the same rate-limit store (see rate_limiter), so runs on one API key draw
+from one budget, and their 'batch' requests wait behind the interactive
+requests of web sessions.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from .constants import (
+    ASYNC_MAX_CONCURRENCY,
+    ASYNC_RESULT_FILENAME,
+    ASYNC_RUN_LOG_FILENAME,
+    ASYNC_RUNS_DIR,
+    ASYNC_RUNS_KEEP,
+    BATCH_RESULTS_FILE,
+    OUTPUT_DIR,
+)
+from .model_compare import prepare_workspace
+from .rate_limiter import get_rate_limit_store
+from .single_flight import SingleFlight, submission_key
+from .streamlit_runner import CrewResult, run_crew_with_params
+from .utils import remove_crewai_storage
+from .validation import InvalidInputError
+
+logger = logging.getLogger(__name__)
+
+
+class BatchRunResult(CrewResult):
+    """Result of one run of a batch, with the files it was started from."""
+
+    resume: str
+    job_description: str
+
+
+class AsyncCrewRunner:
+    """Runs crew pipelines in child processes awaited on one event loop.
+
+    Args:
+        max_concurrency: Maximum number of runs executing at once.
+        runs_dir: Folder of the runs' workspaces.
+        keep_runs: Workspaces of earlier runs kept, newest first, when the
+            runner starts its first run.
+
+    Raises:
+        InvalidInputError: If max_concurrency is below 1.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+        runs_dir: Path = ASYNC_RUNS_DIR,
+        keep_runs: int = ASYNC_RUNS_KEEP
+    ) -> None:
+        if max_concurrency < 1:
+            raise InvalidInputError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        self.max_concurrency = max_concurrency
+        self.runs_dir = runs_dir
+        self.keep_runs = keep_runs
+        self._pruned = False
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._flights: SingleFlight["asyncio.Task[CrewResult]"] = SingleFlight()
+        self._waiters: Dict["asyncio.Task[CrewResult]", int] = {}
+
+    async def run(
+        self,
+        resume_pdf_bytes: bytes,
+        job_description: str,
+        api_key: str,
+        model: str,
+        target_words: int,
+        **options: Any
+    ) -> CrewResult:
+        """Run the crew once, when a slot is free, or join the identical run in flight.
+
+        Args:
+            resume_pdf_bytes: PDF file content as bytes.
+            job_description: Job description text.
+            api_key: OpenAI API key.
+            model: OpenAI model name.
+            target_words: Target resume word count.
+            **options: Other keyword arguments of run_crew_with_params
+                (language, enable_report, model_preset, ...); request_priority
+                defaults to 'batch'.
+
+        Returns:
+            CrewResult of the run, with its PDF and output folder inside the
+            run's workspace. A failed run is reported in the result, not raised.
+        """
+        params = {
+            'resume_pdf_bytes': base64.b64encode(resume_pdf_bytes).decode('ascii'),
+            'job_description': job_description,
+            'api_key': api_key,
+            'model': model,
+            'target_words': target_words,
+            'request_priority': 'batch',
+            **options
+        }
+        key = submission_key(
+            resume_pdf_bytes, job_description, api_key, model=model, target_words=target_words, **options
+        )
+        task, started = self._flights.join(key, lambda: asyncio.ensure_future(self._run_in_slot(params)))
+        if started:
+            task.add_done_callback(lambda done: self._flights.finish(key, done))
+        else:
+            logger.info("Async runner: identical submission in flight, waiting for its result")
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # The shared run is only cancelled with its last waiter
+            if self._waiters[task] == 1:
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+        return CrewResult(**result)
+
+    async def _run_in_slot(self, params: Dict[str, Any]) -> CrewResult:
+        async with self._slots:
+            if not self._pruned:
+                self._pruned = True
+                await asyncio.to_thread(prune_workspaces, self.runs_dir, self.keep_runs)
+            workspace = self.runs_dir / uuid.uuid4().hex[:12]
+            await asyncio.to_thread(prepare_workspace, workspace)
+            return await self._run_in_workspace(workspace, params)
+
+    async def run_all(self, submissions: Sequence[Dict[str, Any]]) -> List[CrewResult]:
+        """Run every submission (keyword arguments of run), in the order given.
+
+        Returns:
+            One CrewResult per submission, in the order of submissions.
+        """
+        return list(await asyncio.gather(*(self.run(**submission) for submission in submissions)))
+
+    async def _run_in_workspace(self, workspace: Path, params: Dict[str, Any]) -> CrewResult:
+        log_file = workspace / ASYNC_RUN_LOG_FILENAME
+        logger.info(f"Async runner: starting run in {workspace}")
+        started = time.monotonic()
+        with open(log_file, 'wb') as log:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "resume_refiner_crew.async_runner",
+                cwd=workspace,
+                env={
+                    **os.environ,
+                    # CrewAI names its storage folder after the run's workspace
+                    'CREWAI_STORAGE_DIR': workspace.name,
+                    # Resolved here: a relative store path would point into the workspace
+                    'LLM_RATE_LIMIT_STORE': str(get_rate_limit_store().resolve()),
+                },
+                stdin=asyncio.subprocess.PIPE,
+                stdout=log,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+            try:
+                await process.communicate(json.dumps(params).encode('utf-8'))
+            except asyncio.CancelledError:
+                process.kill()
+                await process.wait()
+                raise
+        wall_seconds = time.monotonic() - started
+
+        try:
+            result = json.loads((workspace / ASYNC_RESULT_FILENAME).read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError):
+            logger.warning(
+                f"Async runner: run in {workspace} exited with code {process.returncode} "
+                f"without a result, see {log_file}"
+            )
+            return CrewResult(
+                success=False,
+                error=f"Run exited with code {process.returncode}, see {log_file}",
+                pdf_path=None,
+                output_dir=str(workspace / OUTPUT_DIR),
+                run_id=None
+            )
+
+        logger.info(
+            f"Async runner: run in {workspace} "
+            f"{'completed' if result['success'] else 'failed'} in {wall_seconds:.1f}s"
+        )
+        return CrewResult(
+            success=result['success'],
+            error=result['error'],
+            pdf_path=str(workspace / result['pdf_path']) if result['pdf_path'] else None,
+            output_dir=str(workspace / result['output_dir']),
+            run_id=result['run_id']
+        )
+
+
+def prune_workspaces(runs_dir: Path, keep: int) -> None:
+    """Delete the run workspaces of runs_dir beyond the newest keep."""
+    if not runs_dir.is_dir():
+        return
+    workspaces = sorted(
+        (path for path in runs_dir.iterdir() if path.is_dir()),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True
+    )
+    for workspace in workspaces[keep:]:
+        shutil.rmtree(workspace, ignore_errors=True)
+    if workspaces[keep:]:
+        logger.info(f"Async runner: deleted {len(workspaces[keep:])} old run workspaces")
+
+
+def load_batch_manifest(manifest_path: str) -> List[Dict[str, Any]]:
+    """Read the runs of a batch manifest.
+
+    The manifest is a JSON list of objects with the 'resume' PDF and the
+    'job_description' text file of each run (paths relative to the manifest's
+    folder), and optionally other keyword arguments of run_crew_with_params
+    (model, target_words, language, ...) that override the batch defaults.
+
+    Raises:
+        InvalidInputError: If the manifest or a file it names cannot be read.
+    """
+    path = Path(manifest_path)
+    try:
+        entries = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError) as e:
+        raise InvalidInputError(f"Cannot read batch manifest {manifest_path}: {e}") from e
+    if not isinstance(entries, list) or not all(
+        isinstance(entry, dict) and 'resume' in entry and 'job_description' in entry
+        for entry in entries
+    ):
+        raise InvalidInputError(
+            "A batch manifest must be a JSON list of objects with 'resume' and 'job_description'"
+        )
+    for entry in entries:
+        for key in ('resume', 'job_description'):
+            if not (path.parent / entry[key]).is_file():
+                raise InvalidInputError(f"{key} not found: {path.parent / entry[key]}")
+    return [
+        {**entry, 'resume': str(path.parent / entry['resume']),
+         'job_description': str(path.parent / entry['job_description'])}
+        for entry in entries
+    ]
+
+
+def run_batch(
+    entries: Sequence[Dict[str, Any]],
+    defaults: Dict[str, Any],
+    max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+    output_file: Path = BATCH_RESULTS_FILE
+) -> List[BatchRunResult]:
+    """Run the entries of a batch manifest on one event loop.
+
+    Args:
+        entries: Runs read by load_batch_manifest.
+        defaults: Keyword arguments of run_crew_with_params shared by every
+            run (api_key, model, target_words, ...); an entry's own values
+            take precedence.
+        max_concurrency: Maximum number of runs executing at once.
+        output_file: JSON file the results are written to.
+
+    Returns:
+        One result per entry, in the order of entries.
+    """
+    submissions = [
+        {
+            **defaults,
+            **{key: value for key, value in entry.items() if key not in ('resume', 'job_description')},
+            'resume_pdf_bytes': Path(entry['resume']).read_bytes(),
+            'job_description': Path(entry['job_description']).read_text(encoding='utf-8'),
+        }
+        for entry in entries
+    ]
+    results = asyncio.run(AsyncCrewRunner(max_concurrency).run_all(submissions))
+    batch_results = [
+        BatchRunResult(resume=entry['resume'], job_description=entry['job_description'], **result)
+        for entry, result in zip(entries, results)
+    ]
+
+    try:
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(batch_results, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Failed to write the batch results: {e}")
+    return batch_results
+
+
+def _run_submission() -> None:
+    """Child process entry point: run the submission read from stdin here."""
+    params = json.loads(sys.stdin.buffer.read())
+    params['resume_pdf_bytes'] = base64.b64decode(params['resume_pdf_bytes'])
+    try:
+        result = run_crew_with_params(**params)
+    finally:
+        remove_crewai_storage()
+    Path(ASYNC_RESULT_FILENAME).write_text(json.dumps(result, indent=2), encoding='utf-8')
+    if not result['success']:
+        logger.error(result['error'])
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    _run_submission()
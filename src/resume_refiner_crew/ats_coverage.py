@@ -0,0 +1,378 @@
+"""Local ATS keyword coverage of the final resume.
+
+The job analysis lists the job's technical skills and tools, and the resume
+optimization lists the keywords an ATS will look for. ats_coverage checks,
+without any LLM request, which of them the final resume contains and where:
+
+- keywords and resume text are split into tokens, lowercased and stemmed
+  with a few English and Spanish suffix rules ("pipelines" matches
+  "pipeline", "problem-solving" matches "problem solving")
+- qualifiers in parentheses are dropped and "/" or "or" separates
+  alternatives ("TensorFlow / Keras" is covered by either) when every
+  alternative is a known skill or several words long, so "A/B testing" and
+  "CI/CD" are not covered by a lone "a" or "CD"; a stopword or single
+  character is never an alternative
+- every keyword variant becomes a token sequence of one Aho-Corasick
+  automaton, and the whole resume is scanned once, whatever the number of
+  keywords
+- the resume is read from structured_resume.json (the content of the PDF),
+  or from the verified or optimized markdown resume when it is missing
+
+The result (coverage percentage, missing keywords, and the section and line
+of every match) is written to ATS_COVERAGE_FILE for the Web UI.
+"""
+
+import json
+import logging
+import re
+import functools
+import unicodedata
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterator, List, Mapping, Optional, Sequence, Tuple, TypedDict
+
+from .constants import (
+    ATS_COVERAGE_FILE,
+    JOB_ANALYSIS_FILE,
+    OPTIMIZED_RESUME_FILE,
+    RESUME_OPTIMIZATION_FILE,
+    SKILL_TAXONOMY,
+    STRUCTURED_RESUME_FILE,
+    VERIFIED_RESUME_FILE,
+)
+from .fact_check import STOPWORDS
+
+logger = logging.getLogger(__name__)
+
+# Words with inner '.', '+' or '#' ("node.js", "c++", "c#") are single tokens
+_TOKEN_RE = re.compile(r"\w+(?:\.\w+)*[+#]*", re.UNICODE)
+# Suffix -> replacement, longest first; only applied to alphabetic tokens.
+# A final 'e' is dropped afterwards, so 'manage', 'managed' and 'managing'
+# (or 'pipeline' and 'pipelines') share a stem.
+_SUFFIXES: Tuple[Tuple[str, str], ...] = (
+    ("ies", "y"), ("ing", ""), ("ed", ""), ("s", ""),
+)
+_MIN_STEM_LENGTH = 3
+# Separates resume segments in the token stream, so no match spans two of them
+_SEGMENT_BREAK = "\n"
+_SNIPPET_CHARS = 160
+_QUALIFIER_RE = re.compile(r"\([^)]*\)")
+_ALTERNATIVES_RE = re.compile(r"\s*/\s*|\s+or\s+")
+
+# Job analysis and optimization fields the keywords are taken from
+KEYWORD_SOURCES: Tuple[Tuple[str, str], ...] = (
+    ("job_analysis", "technical_skills"),
+    ("job_analysis", "tools_and_technologies"),
+    ("optimization", "keywords_for_ats"),
+)
+
+
+class KeywordLocation(TypedDict):
+    """Place of the resume where a keyword was found."""
+
+    section: str
+    location: str  # 'line 12' in markdown, a field path in structured JSON
+    text: str
+
+
+class KeywordCoverage(TypedDict):
+    """Coverage of a single keyword."""
+
+    keyword: str
+    sources: List[str]
+    found: bool
+    locations: List[KeywordLocation]
+
+
+class AtsCoverage(TypedDict):
+    """ATS keyword coverage of a resume."""
+
+    resume_source: str
+    coverage: float
+    total_keywords: int
+    matched_keywords: List[str]
+    missing_keywords: List[str]
+    keywords: List[KeywordCoverage]
+
+
+def stem(token: str) -> str:
+    """Lowercase a token and strip a common inflection suffix."""
+    token = token.lower()
+    if not token.isalpha():
+        return token
+    for suffix, replacement in _SUFFIXES:
+        # 'ss' endings are not plurals ('business', 'process')
+        if suffix == "s" and token.endswith("ss"):
+            break
+        if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM_LENGTH:
+            token = token[:-len(suffix)] + replacement
+            break
+    if token.endswith("e") and len(token) > _MIN_STEM_LENGTH:
+        token = token[:-1]
+    return token
+
+
+def token_spans(text: str) -> List[Tuple[str, int, int]]:
+    """Tokens of a text as written, with their start and end offsets."""
+    return [(match.group(), match.start(), match.end()) for match in _TOKEN_RE.finditer(text)]
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Stemmed tokens of a text."""
+    text = unicodedata.normalize("NFKC", text).replace("**", "").replace("__", "")
+    return [stem(token) for token in _TOKEN_RE.findall(text)]
+
+
+@functools.lru_cache(maxsize=1)
+def _known_skills() -> FrozenSet[Tuple[str, ...]]:
+    """Token sequences of every SKILL_TAXONOMY name and alias."""
+    return frozenset(
+        tuple(normalize_tokens(name))
+        for canonical, aliases in SKILL_TAXONOMY.items()
+        for name in (canonical, *aliases)
+    )
+
+
+def _is_filler(tokens: Tuple[str, ...]) -> bool:
+    """Whether a token sequence is a lone stopword or character."""
+    return len(tokens) == 1 and (len(tokens[0]) == 1 or tokens[0] in STOPWORDS)
+
+
+def _is_alternative(tokens: Tuple[str, ...]) -> bool:
+    """Whether a part of a keyword split on '/' or 'or' stands on its own."""
+    return not _is_filler(tokens) and (len(tokens) > 1 or tokens in _known_skills())
+
+
+def keyword_variants(keyword: str) -> List[Tuple[str, ...]]:
+    """Token sequences that count as an occurrence of a keyword."""
+    variants = [tuple(normalize_tokens(keyword))]
+    alternatives = [
+        tuple(normalize_tokens(alternative))
+        for alternative in _ALTERNATIVES_RE.split(_QUALIFIER_RE.sub(" ", keyword))
+    ]
+    alternatives = [tokens for tokens in alternatives if tokens]
+    if len(alternatives) > 1 and not all(_is_alternative(tokens) for tokens in alternatives):
+        alternatives = []
+    variants.extend(tokens for tokens in alternatives if tokens not in variants and not _is_filler(tokens))
+    return [variant for variant in variants if variant]
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton matching token sequences in a token stream."""
+
+    def __init__(self, patterns: Sequence[Sequence[str]]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for token in pattern:
+                if token not in self._goto[state]:
+                    self._goto[state][token] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = self._goto[state][token]
+            self._out[state].append(index)
+
+        # Breadth-first, so every failure target is complete before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def search(self, tokens: Sequence[str]) -> Iterator[Tuple[int, int]]:
+        """Yield (token position, pattern index) for every pattern occurrence."""
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for index in self._out[state]:
+                yield position, index
+
+
+def extract_keywords(
+    job_analysis: Mapping[str, Any],
+    optimization: Mapping[str, Any]
+) -> Dict[str, List[str]]:
+    """Collect the keywords of the job analysis and resume optimization.
+
+    Keywords that normalize to the same tokens are merged.
+
+    Returns:
+        Source fields of every keyword, by keyword as first written.
+    """
+    documents = {"job_analysis": job_analysis, "optimization": optimization}
+    keywords: Dict[str, List[str]] = {}
+    seen: Dict[Tuple[str, ...], str] = {}
+    for document, field in KEYWORD_SOURCES:
+        for item in documents[document].get(field) or []:
+            keyword = item.get("keyword") if isinstance(item, dict) else item
+            if not isinstance(keyword, str):
+                continue
+            tokens = tuple(normalize_tokens(keyword))
+            if not tokens:
+                continue
+            keyword = seen.setdefault(tokens, keyword.strip())
+            sources = keywords.setdefault(keyword, [])
+            if field not in sources:
+                sources.append(field)
+    return keywords
+
+
+def markdown_segments(markdown: str) -> List[Tuple[KeywordLocation, str]]:
+    """Non-empty lines of a markdown resume, with their section and line number."""
+    segments: List[Tuple[KeywordLocation, str]] = []
+    section = ""
+    for number, line in enumerate(markdown.splitlines(), start=1):
+        text = line.strip()
+        if not text:
+            continue
+        if text.startswith("## "):
+            section = text.lstrip("# ").strip()
+        segments.append((KeywordLocation(section=section, location=f"line {number}", text=text), text))
+    return segments
+
+
+def structured_segments(data: Any, path: str = "") -> List[Tuple[KeywordLocation, str]]:
+    """Text fields of a structured resume, with their section and field path."""
+    if isinstance(data, str):
+        section = re.split(r"[.\[]", path, maxsplit=1)[0]
+        return [(KeywordLocation(section=section, location=path, text=data), data)]
+    segments: List[Tuple[KeywordLocation, str]] = []
+    if isinstance(data, dict):
+        for key, value in data.items():
+            # Bolding hints repeat the achievements' words
+            if key not in ("keywords_to_bold", "language"):
+                segments.extend(structured_segments(value, f"{path}.{key}" if path else key))
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            segments.extend(structured_segments(value, f"{path}[{index}]"))
+    return segments
+
+
+def compute_keyword_coverage(
+    keywords: Mapping[str, Sequence[str]],
+    segments: Sequence[Tuple[KeywordLocation, str]],
+    resume_source: str = ""
+) -> AtsCoverage:
+    """Find every keyword in the resume segments in a single pass.
+
+    Args:
+        keywords: Source fields of every keyword, by keyword.
+        segments: Resume text segments with their location.
+        resume_source: Name of the file the segments were read from.
+
+    Returns:
+        Coverage of the keywords, in the order they were given.
+    """
+    names = list(keywords)
+    patterns: List[Tuple[str, ...]] = []
+    pattern_keywords: List[int] = []
+    for index, name in enumerate(names):
+        for variant in keyword_variants(name):
+            patterns.append(variant)
+            pattern_keywords.append(index)
+    automaton = KeywordAutomaton(patterns)
+
+    tokens: List[str] = []
+    token_segments: List[int] = []
+    for index, (_, text) in enumerate(segments):
+        segment_tokens = normalize_tokens(text) + [_SEGMENT_BREAK]
+        tokens.extend(segment_tokens)
+        token_segments.extend([index] * len(segment_tokens))
+
+    locations: Dict[int, List[KeywordLocation]] = {}
+    for position, pattern_index in automaton.search(tokens):
+        keyword_index = pattern_keywords[pattern_index]
+        location, _ = segments[token_segments[position]]
+        found = locations.setdefault(keyword_index, [])
+        if not found or found[-1] is not location:
+            found.append(location)
+
+    results = [
+        KeywordCoverage(
+            keyword=name,
+            sources=list(keywords[name]),
+            found=index in locations,
+            locations=[
+                KeywordLocation(
+                    section=location["section"],
+                    location=location["location"],
+                    text=location["text"][:_SNIPPET_CHARS],
+                )
+                for location in locations.get(index, [])
+            ],
+        )
+        for index, name in enumerate(names)
+    ]
+    matched = [r["keyword"] for r in results if r["found"]]
+    return AtsCoverage(
+        resume_source=resume_source,
+        coverage=round(100 * len(matched) / len(names), 1) if names else 100.0,
+        total_keywords=len(names),
+        matched_keywords=matched,
+        missing_keywords=[r["keyword"] for r in results if not r["found"]],
+        keywords=results,
+    )
+
+
+def _load_json(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data if isinstance(data, dict) else {}
+
+
+def _resume_segments() -> Tuple[str, List[Tuple[KeywordLocation, str]]]:
+    """Segments of the most final resume available in the output folder."""
+    if STRUCTURED_RESUME_FILE.exists():
+        return STRUCTURED_RESUME_FILE.name, structured_segments(_load_json(STRUCTURED_RESUME_FILE))
+    for path in (VERIFIED_RESUME_FILE, OPTIMIZED_RESUME_FILE):
+        if path.exists():
+            return path.name, markdown_segments(path.read_text(encoding="utf-8"))
+    return "", []
+
+
+def write_ats_coverage(output_path: Path = ATS_COVERAGE_FILE) -> Optional[AtsCoverage]:
+    """Compute the ATS keyword coverage of the run outputs and write it as JSON.
+
+    Returns:
+        The coverage, or None if the job analysis or the resume is missing
+        or unreadable.
+    """
+    try:
+        keywords = extract_keywords(_load_json(JOB_ANALYSIS_FILE), _load_json(RESUME_OPTIMIZATION_FILE))
+        resume_source, segments = _resume_segments()
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"ATS keyword coverage skipped: {e}")
+        return None
+    if not keywords or not segments:
+        logger.info("ATS keyword coverage skipped: no keywords or no resume in the output folder")
+        return None
+
+    coverage = compute_keyword_coverage(keywords, segments, resume_source)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(coverage, indent=2, ensure_ascii=False), encoding="utf-8")
+    logger.info(
+        f"ATS keyword coverage of {resume_source}: {coverage['coverage']}% of "
+        f"{coverage['total_keywords']} keywords, missing: {', '.join(coverage['missing_keywords']) or 'none'}"
+    )
+    return coverage
+
+
+def load_ats_coverage(path: Path = ATS_COVERAGE_FILE) -> Optional[AtsCoverage]:
+    """Load the ATS keyword coverage of the last run, if any."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
@@ -0,0 +1,417 @@
+"""Run checkpoints for resuming a failed crew execution.
+
+Every run gets a folder under .runs/<run_id>/ holding:
+- manifest.json: inputs, options, status and the list of completed tasks
+- inputs/: copies of the resume PDF and job description used by the run
+- one file per completed task, with the same content as its output/ file
+
+Checkpoints live outside output/ so they survive setup_clean_storage(). When a
+run is resumed, completed task outputs are restored into output/ and handed to
+the crew as context, and only the remaining tasks are executed.
+
+A partial re-run forks a previous run: checkpoints of the tasks that do not
+depend on the changed parameters are copied into a new run, which is then
+resumed like a failed one.
+"""
+
+import json
+import logging
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, TypedDict
+
+from crewai.tasks.task_output import TaskOutput
+
+from .constants import (
+    OUTPUT_DIR,
+    PARAMETER_DEPENDENT_TASKS,
+    RUNS_DIR,
+    RUN_INPUTS_DIRNAME,
+    RUN_MANIFEST_FILENAME,
+    TASK_DEPENDENCIES,
+    TASK_OUTPUT_FILES,
+)
+from .utils import validate_path_exists
+
+logger = logging.getLogger(__name__)
+
+
+class TaskCheckpoint(TypedDict):
+    """Checkpoint entry of a completed task."""
+
+    file: str
+    agent: str
+    completed_at: str
+
+
+class RunManifest(TypedDict):
+    """Persisted state of a crew run."""
+
+    run_id: str
+    status: str
+    created_at: str
+    updated_at: str
+    error: Optional[str]
+    inputs: Dict[str, str]
+    options: Dict[str, Any]
+    input_files: Dict[str, str]
+    tasks: Dict[str, TaskCheckpoint]
+    parent_run: Optional[str]
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def get_run_dir(run_id: str) -> Path:
+    """Return the checkpoint folder of a run."""
+    return RUNS_DIR / run_id
+
+
+def new_run_id() -> str:
+    """Generate a sortable, unique run identifier (e.g. '20251027-135546-1a2b3c')."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def load_manifest(run_id: str) -> RunManifest:
+    """Load the manifest of a run.
+
+    Args:
+        run_id: Identifier of the run.
+
+    Returns:
+        The run manifest.
+
+    Raises:
+        FileNotFoundError: If the run has no manifest.
+    """
+    manifest_path = get_run_dir(run_id) / RUN_MANIFEST_FILENAME
+    validate_path_exists(manifest_path, "run manifest")
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest: RunManifest) -> None:
+    manifest['updated_at'] = _now()
+    manifest_path = get_run_dir(manifest['run_id']) / RUN_MANIFEST_FILENAME
+    tmp_path = manifest_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    tmp_path.replace(manifest_path)
+
+
+def create_run(
+    inputs: Dict[str, str],
+    options: Dict[str, Any],
+    input_files: List[Path]
+) -> str:
+    """Create a new run folder and manifest.
+
+    Args:
+        inputs: Crew kickoff inputs.
+        options: Crew options (enable_report, enable_fact_check, ...).
+        input_files: Input files to snapshot so the run can be resumed later.
+
+    Returns:
+        The new run identifier.
+    """
+    run_id = new_run_id()
+    run_dir = get_run_dir(run_id)
+    inputs_dir = run_dir / RUN_INPUTS_DIRNAME
+    inputs_dir.mkdir(parents=True, exist_ok=True)
+
+    stored_inputs: Dict[str, str] = {}
+    for file_path in input_files:
+        if file_path.is_file():
+            shutil.copy2(file_path, inputs_dir / file_path.name)
+            stored_inputs[str(file_path)] = file_path.name
+
+    now = _now()
+    _save_manifest(RunManifest(
+        run_id=run_id,
+        status='running',
+        created_at=now,
+        updated_at=now,
+        error=None,
+        inputs=dict(inputs),
+        options=dict(options),
+        input_files=stored_inputs,
+        tasks={},
+        parent_run=None
+    ))
+    logger.info(f"Created run {run_id}")
+    return run_id
+
+
+def start_run(
+    inputs: Dict[str, str],
+    options: Dict[str, Any],
+    input_files: List[Path],
+    resume_run: Optional[str] = None
+) -> str:
+    """Create a new run, or prepare an existing one to be resumed.
+
+    Args:
+        inputs: Crew kickoff inputs.
+        options: Crew options (enable_report, enable_fact_check, ...).
+        input_files: Input files to snapshot for a new run.
+        resume_run: Identifier of a previous run to resume. Its input files
+            are restored to their original locations.
+
+    Returns:
+        Identifier of the run to execute.
+    """
+    if not resume_run:
+        return create_run(inputs, options, input_files)
+
+    restore_run_inputs(resume_run)
+    mark_run_status(resume_run, 'running')
+    logger.info(f"Resuming run {resume_run}")
+    return resume_run
+
+
+def mark_run_status(run_id: str, status: str, error: Optional[str] = None) -> None:
+    """Update the status ('pending', 'running', 'completed', 'failed') of a run."""
+    manifest = load_manifest(run_id)
+    manifest['status'] = status
+    manifest['error'] = error
+    _save_manifest(manifest)
+
+
+def _task_output_content(output: TaskOutput) -> str:
+    """Serialize a task output the same way CrewAI writes its output_file."""
+    if output.json_dict:
+        return json.dumps(output.json_dict, ensure_ascii=False)
+    if output.pydantic:
+        return output.pydantic.model_dump_json()
+    return output.raw
+
+
+def save_task_checkpoint(run_id: str, output: TaskOutput) -> None:
+    """Persist the output of a completed task.
+
+    Args:
+        run_id: Identifier of the run.
+        output: Output of the completed task.
+    """
+    task_name = output.name
+    if task_name not in TASK_OUTPUT_FILES:
+        logger.warning(f"Not checkpointing unknown task: {task_name}")
+        return
+
+    filename = TASK_OUTPUT_FILES[task_name].name
+    (get_run_dir(run_id) / filename).write_text(_task_output_content(output), encoding='utf-8')
+
+    manifest = load_manifest(run_id)
+    manifest['tasks'][task_name] = TaskCheckpoint(
+        file=filename,
+        agent=output.agent,
+        completed_at=_now()
+    )
+    _save_manifest(manifest)
+    logger.info(f"Checkpointed {task_name} for run {run_id}")
+
+
+def make_checkpoint_callback(run_id: str) -> Callable[[TaskOutput], None]:
+    """Build a Crew task_callback that checkpoints every completed task."""
+
+    def _callback(output: TaskOutput) -> None:
+        try:
+            save_task_checkpoint(run_id, output)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to checkpoint task {output.name}: {e}")
+
+    return _callback
+
+
+def load_completed_outputs(run_id: str) -> Dict[str, str]:
+    """Load the outputs of all completed tasks of a run.
+
+    Returns:
+        Mapping of task name to its checkpointed output content.
+    """
+    manifest = load_manifest(run_id)
+    run_dir = get_run_dir(run_id)
+
+    completed: Dict[str, str] = {}
+    for task_name, checkpoint in manifest['tasks'].items():
+        checkpoint_path = run_dir / checkpoint['file']
+        if checkpoint_path.exists():
+            completed[task_name] = checkpoint_path.read_text(encoding='utf-8')
+        else:
+            logger.warning(f"Checkpoint file missing for {task_name}: {checkpoint_path}")
+    return completed
+
+
+def restore_run_inputs(run_id: str) -> None:
+    """Copy the input files of a run back to their original locations."""
+    manifest = load_manifest(run_id)
+    inputs_dir = get_run_dir(run_id) / RUN_INPUTS_DIRNAME
+
+    for original_path, stored_name in manifest['input_files'].items():
+        target = Path(original_path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(inputs_dir / stored_name, target)
+
+
+def restore_run_outputs(run_id: str) -> None:
+    """Copy the checkpointed task outputs of a run into the output folder.
+
+    Must be called after setup_clean_storage(), which empties output/.
+    """
+    manifest = load_manifest(run_id)
+    run_dir = get_run_dir(run_id)
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    for task_name, checkpoint in manifest['tasks'].items():
+        checkpoint_path = run_dir / checkpoint['file']
+        if checkpoint_path.exists():
+            shutil.copy2(checkpoint_path, TASK_OUTPUT_FILES[task_name])
+
+
+def read_run_input(run_id: str, filename: str) -> bytes:
+    """Read an input file snapshot of a run.
+
+    Args:
+        run_id: Identifier of the run.
+        filename: Name of the input file (e.g. 'CV.pdf').
+
+    Raises:
+        FileNotFoundError: If the run has no such input file.
+    """
+    input_path = get_run_dir(run_id) / RUN_INPUTS_DIRNAME / filename
+    validate_path_exists(input_path, "run input")
+    return input_path.read_bytes()
+
+
+def find_parsed_resume(resume_pdf_path: Path) -> Optional[str]:
+    """Return the parsed resume of the latest run of the same resume PDF.
+
+    Runs are matched on the content of their resume snapshot, so a parsed
+    resume is never reused for another PDF.
+
+    Args:
+        resume_pdf_path: Path of the resume PDF.
+
+    Returns:
+        The checkpointed parse_resume_task output, or None if no run parsed
+        this PDF.
+    """
+    if not RUNS_DIR.is_dir():
+        return None
+    resume_pdf = resume_pdf_path.read_bytes()
+
+    # Run identifiers sort by creation time
+    for run_dir in sorted(RUNS_DIR.iterdir(), reverse=True):
+        try:
+            manifest = load_manifest(run_dir.name)
+        except (OSError, json.JSONDecodeError):
+            continue
+        checkpoint = manifest['tasks'].get('parse_resume_task')
+        if checkpoint is None or not (run_dir / checkpoint['file']).is_file():
+            continue
+        snapshots = (run_dir / RUN_INPUTS_DIRNAME / name for name in manifest['input_files'].values())
+        if any(snapshot.is_file() and snapshot.read_bytes() == resume_pdf for snapshot in snapshots):
+            logger.info(f"Using the parsed resume of run {run_dir.name}")
+            return (run_dir / checkpoint['file']).read_text(encoding='utf-8')
+    return None
+
+
+def get_changed_params(
+    manifest: RunManifest,
+    inputs: Dict[str, str],
+    options: Dict[str, Any]
+) -> Set[str]:
+    """Return the parameters whose value differs from the ones a run used.
+
+    Parameters the previous run did not record are considered unchanged.
+    """
+    previous = {**manifest['inputs'], **manifest['options']}
+    current = {**inputs, **options}
+    return {
+        name for name, value in current.items()
+        if name in previous and previous[name] != value
+    }
+
+
+def get_invalidated_tasks(changed_params: Iterable[str]) -> Set[str]:
+    """Compute the tasks whose output is invalidated by changed parameters.
+
+    A task is invalidated if it reads a changed parameter directly, or if it
+    receives an invalidated task's output as context.
+
+    Args:
+        changed_params: Names of the changed parameters.
+
+    Returns:
+        Names of the tasks that have to be executed again.
+    """
+    invalidated = {
+        task_name
+        for param in changed_params
+        for task_name in PARAMETER_DEPENDENT_TASKS.get(param, ())
+    }
+
+    # TASK_OUTPUT_FILES is in pipeline order, so one pass propagates downstream
+    for task_name in TASK_OUTPUT_FILES:
+        if any(dependency in invalidated for dependency in TASK_DEPENDENCIES[task_name]):
+            invalidated.add(task_name)
+
+    return invalidated
+
+
+def fork_run(
+    run_id: str,
+    inputs: Dict[str, str],
+    options: Dict[str, Any]
+) -> str:
+    """Create a new run that reuses the still-valid checkpoints of a previous one.
+
+    The new run is left ready to be resumed: its input files are copied from
+    the previous run, and only checkpoints of tasks that are not invalidated by
+    the changed parameters are kept.
+
+    Args:
+        run_id: Identifier of the previous run.
+        inputs: Crew kickoff inputs for the new run.
+        options: Crew options for the new run.
+
+    Returns:
+        Identifier of the new run.
+    """
+    manifest = load_manifest(run_id)
+    changed_params = get_changed_params(manifest, inputs, options)
+    invalidated = get_invalidated_tasks(changed_params)
+
+    new_id = new_run_id()
+    run_dir = get_run_dir(run_id)
+    new_run_dir = get_run_dir(new_id)
+    shutil.copytree(run_dir / RUN_INPUTS_DIRNAME, new_run_dir / RUN_INPUTS_DIRNAME)
+
+    kept_tasks: Dict[str, TaskCheckpoint] = {}
+    for task_name, checkpoint in manifest['tasks'].items():
+        if task_name not in invalidated:
+            shutil.copy2(run_dir / checkpoint['file'], new_run_dir / checkpoint['file'])
+            kept_tasks[task_name] = checkpoint
+
+    now = _now()
+    _save_manifest(RunManifest(
+        run_id=new_id,
+        status='pending',
+        created_at=now,
+        updated_at=now,
+        error=None,
+        inputs={**manifest['inputs'], **inputs},
+        options={**manifest['options'], **options},
+        input_files=manifest['input_files'],
+        tasks=kept_tasks,
+        parent_run=run_id
+    ))
+    logger.info(
+        f"Forked run {run_id} into {new_id}: changed {sorted(changed_params) or 'nothing'}, "
+        f"reusing {sorted(kept_tasks)}"
+    )
+    return new_id
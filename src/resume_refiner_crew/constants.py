@@ -4,8 +4,9 @@ This module centralizes all magic numbers, hardcoded paths, and configuration
 values to maintain consistency and improve maintainability.
 """
 
+import tempfile
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
 # Directory Paths
 CREWAI_TEMP_DIR = Path(".crewai_temp")
@@ -13,6 +14,9 @@ OUTPUT_DIR = Path("output")
 FIXTURES_DIR = Path("tests/fixtures")
 KNOWLEDGE_DIR = Path("knowledge")
 CONFIG_DIR = Path("config")
+TEMPLATES_DIR = Path("templates")
+# Package data, resolved from the installed package rather than the working directory
+PACKAGE_TEMPLATES_DIR = Path(__file__).parent / "templates"
 
 # Configuration Files
 AGENTS_CONFIG = CONFIG_DIR / "agents.yaml"
@@ -24,6 +28,9 @@ DEFAULT_JOB_DESC_PATH = Path("job_description.txt")  # TextFileKnowledgeSource w
 DEFAULT_RESUME_BEST_PRACTICES_PATH = Path("resume_best_practices.txt")  # TextFileKnowledgeSource will prepend "knowledge/"
 FIXTURE_LOGS_FILE = FIXTURES_DIR / "crew_logs.txt"
 CREW_LOGS_FILE = CREWAI_TEMP_DIR / "crew_logs.txt"
+LIVE_OUTPUT_FILE = CREWAI_TEMP_DIR / "live_output.md"
+STAGE_METRICS_FILE = CREWAI_TEMP_DIR / "stage_metrics.json"
+PRESCREEN_FILE = OUTPUT_DIR / "prescreen.json"
 
 # Output File Names
 PARSED_RESUME_FILE = OUTPUT_DIR / "parsed_resume.md"
@@ -33,6 +40,106 @@ OPTIMIZED_RESUME_FILE = OUTPUT_DIR / "optimized_resume.md"
 VERIFIED_RESUME_FILE = OUTPUT_DIR / "verified_resume.md"
 STRUCTURED_RESUME_FILE = OUTPUT_DIR / "structured_resume.json"
 FINAL_REPORT_FILE = OUTPUT_DIR / "final_report.md"
+ATS_COVERAGE_FILE = OUTPUT_DIR / "ats_coverage.json"
+MODEL_COMPARISON_FILE = OUTPUT_DIR / "model_comparison.json"
+BATCH_RESULTS_FILE = OUTPUT_DIR / "batch_results.json"
+REPORT_TEMPLATE = PACKAGE_TEMPLATES_DIR / "final_report.md.j2"
+
+# Output file written by each task, in pipeline order
+TASK_OUTPUT_FILES: Dict[str, Path] = {
+    "parse_resume_task": PARSED_RESUME_FILE,
+    "analyze_job_task": JOB_ANALYSIS_FILE,
+    "optimize_resume_task": RESUME_OPTIMIZATION_FILE,
+    "generate_resume_task": OPTIMIZED_RESUME_FILE,
+    "verify_resume_task": VERIFIED_RESUME_FILE,
+    "harvard_format_task": STRUCTURED_RESUME_FILE,
+    "generate_report_task": FINAL_REPORT_FILE,
+}
+
+# Upstream tasks whose output each task receives as context
+TASK_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "parse_resume_task": (),
+    "analyze_job_task": ("parse_resume_task",),
+    "optimize_resume_task": ("parse_resume_task", "analyze_job_task"),
+    "generate_resume_task": ("parse_resume_task", "optimize_resume_task"),
+    "verify_resume_task": ("parse_resume_task", "generate_resume_task"),
+    "harvard_format_task": ("verify_resume_task", "generate_resume_task"),
+    "generate_report_task": ("analyze_job_task", "optimize_resume_task"),
+}
+
+# Fields of the JSON output of a context task that each task receives
+# (see context_assembly); other context outputs are sent whole
+CONTEXT_FIELDS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "optimize_resume_task": {
+        "analyze_job_task": (
+            "job_title", "language", "technical_skills", "soft_skills", "nice_to_have",
+            "experience_requirements", "key_responsibilities", "education_requirements",
+            "tools_and_technologies", "industry_knowledge", "certifications_required",
+            "match_score",
+        ),
+    },
+    "generate_report_task": {
+        "analyze_job_task": ("job_title", "language", "match_score"),
+        "optimize_resume_task": ("content_suggestions", "skills_to_highlight", "keywords_for_ats"),
+    },
+}
+
+# Tasks that read each run parameter directly (used to compute partial re-runs).
+# Tasks downstream of these are invalidated through TASK_DEPENDENCIES.
+PARAMETER_DEPENDENT_TASKS: Dict[str, Tuple[str, ...]] = {
+    "TARGET_RESUME_WORDS": ("generate_resume_task", "verify_resume_task"),
+    "TARGET_LANGUAGE": ("generate_resume_task", "harvard_format_task"),
+    # The fast profile folds the self-verification into the resume writer
+    "enable_fact_check": ("generate_resume_task", "harvard_format_task"),
+    "enable_report": ("generate_report_task",),
+    "pipeline_profile": ("generate_resume_task",),
+}
+
+# Knowledge Sources
+# Knowledge files up to this size (characters) are sent verbatim in the task
+# context instead of through the vector store; override with
+# KNOWLEDGE_INLINE_MAX_CHARS (0 sends every file to the vector store)
+KNOWLEDGE_INLINE_MAX_CHARS = 12000
+
+# Run Checkpoints
+# Each run gets a folder with a manifest and a copy of every completed task output
+RUNS_DIR = Path(".runs")
+RUN_MANIFEST_FILENAME = "manifest.json"
+RUN_INPUTS_DIRNAME = "inputs"
+
+# Job Analysis Reuse
+# Every job analysis is stored with a MinHash signature of its job description
+# (JOB_DEDUP_SHINGLE_WORDS-word shingles). A new job description whose
+# estimated similarity to a stored one reaches JOB_DEDUP_THRESHOLD reuses its
+# requirements; only the candidate is scored again. LSH splits the signature in
+# JOB_DEDUP_BANDS bands, so only near-duplicate candidates are compared.
+# Disable with REUSE_JOB_ANALYSES=false.
+JOB_ANALYSES_DIR = Path(".job_analyses")
+JOB_ANALYSES_INDEX_FILENAME = "index.json"
+JOB_DEDUP_SHINGLE_WORDS = 5
+JOB_DEDUP_PERMUTATIONS = 128
+JOB_DEDUP_BANDS = 16
+JOB_DEDUP_THRESHOLD = 0.8
+JOB_DEDUP_MAX_ENTRIES = 500
+
+# Model Comparison
+# Compare mode runs the crew once per model, COMPARE_MAX_PARALLEL at a time,
+# each in its own workspace under COMPARE_DIR (a copy of the knowledge and
+# templates folders, with its own output, checkpoints and job analyses).
+COMPARE_DIR = Path(".compare")
+COMPARE_RUN_LOG_FILENAME = "run.log"
+COMPARE_MAX_PARALLEL = 4
+
+# Async Runner
+# The async runner drives up to ASYNC_MAX_CONCURRENCY crew runs from one event
+# loop, each in a child process and its own workspace under ASYNC_RUNS_DIR.
+# A runner keeps the newest ASYNC_RUNS_KEEP workspaces of earlier runs (their
+# PDFs and outputs) and deletes the rest before its first run.
+ASYNC_RUNS_DIR = Path(".async_runs")
+ASYNC_RUN_LOG_FILENAME = "run.log"
+ASYNC_RESULT_FILENAME = "result.json"
+ASYNC_MAX_CONCURRENCY = 8
+ASYNC_RUNS_KEEP = 50
 
 # Word Count Configuration
 DEFAULT_TARGET_WORDS = 500
@@ -53,6 +160,283 @@ PDF_FILENAME_TEMPLATE = "CV_{last_name}_{first_name}_{job_title}.pdf"
 # OpenAI Configuration
 DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
 
+# Model Routing
+# Each agent declares a model_tier in agents.yaml: "fast" for mechanical stages
+# (parsing, JSON structuring), "strong" for analysis and writing. A preset maps
+# each tier to a model; None means the main model (OPENAI_MODEL).
+DEFAULT_MODEL_TIER = "strong"
+DEFAULT_MODEL_PRESET = "balanced"
+MODEL_PRESETS: Dict[str, Dict[str, Optional[str]]] = {
+    "single": {"fast": None, "strong": None},
+    "balanced": {"fast": "gpt-4o-mini", "strong": None},
+    "turbo": {"fast": "gpt-4.1-nano", "strong": None},
+}
+
+# USD per 1M tokens: (input, cached input, output), for per-stage cost estimates
+MODEL_PRICING: Dict[str, Tuple[float, float, float]] = {
+    "gpt-5-pro": (15.00, 15.00, 120.00),
+    "gpt-5": (1.25, 0.125, 10.00),
+    "gpt-5-mini": (0.25, 0.025, 2.00),
+    "gpt-5-nano": (0.05, 0.005, 0.40),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4-turbo": (10.00, 10.00, 30.00),
+    "gpt-4": (30.00, 30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 0.50, 1.50),
+}
+
+# Request Hedging and Fallback
+# A request still unanswered after its hedge delay is sent a second time and
+# the first response wins. The hedge delay is the LLM_HEDGE_PERCENTILE latency
+# of the agent's last LLM_LATENCY_WINDOW requests on the model, capped by the
+# agent's latency SLO (used alone until LLM_HEDGE_MIN_SAMPLES are measured).
+# With LLM_FALLBACK_MODEL set, timed out and rate limited requests are sent to
+# it, and a model with LLM_CIRCUIT_BREAKER_FAILURES consecutive failures is
+# skipped for LLM_CIRCUIT_BREAKER_COOLDOWN_SECONDS. Disable hedging with
+# ENABLE_REQUEST_HEDGING=false; override the percentile and the SLOs with the
+# LLM_HEDGE_PERCENTILE and LLM_LATENCY_SLO_SECONDS environment variables.
+LLM_HEDGE_PERCENTILE = 95
+LLM_HEDGE_MIN_SAMPLES = 5
+LLM_HEDGE_MIN_SECONDS = 5.0
+LLM_LATENCY_WINDOW = 50
+LLM_DEFAULT_SLO_SECONDS = 60.0
+# Seconds to a response (to its first chunk when streamed), per agent
+LLM_LATENCY_SLO_SECONDS: Dict[str, float] = {
+    "resume_parser": 60.0,
+    "job_analyzer": 60.0,
+    "resume_analyzer": 90.0,
+    "resume_writer": 120.0,
+    "fact_checker": 90.0,
+    "harvard_formatter": 60.0,
+    "report_generator": 45.0,
+}
+LLM_REQUEST_TIMEOUT_SECONDS = 300.0
+LLM_CIRCUIT_BREAKER_FAILURES = 3
+LLM_CIRCUIT_BREAKER_COOLDOWN_SECONDS = 120.0
+
+# Rate Limits
+# Requests and tokens per minute per model (OpenAI usage tier 1), shared by all
+# runs on this machine that use the same API key; override with LLM_RATE_LIMITS.
+# Requests wait in a queue per key and model, interactive before batch. Token
+# use is estimated from the prompt length until the response reports it.
+LLM_RATE_LIMITS: Dict[str, Tuple[int, int]] = {
+    "gpt-5": (500, 500_000),
+    "gpt-5-mini": (500, 500_000),
+    "gpt-5-nano": (500, 200_000),
+    "gpt-4.1": (500, 30_000),
+    "gpt-4.1-mini": (500, 200_000),
+    "gpt-4.1-nano": (500, 200_000),
+    "gpt-4o": (500, 30_000),
+    "gpt-4o-mini": (500, 200_000),
+}
+LLM_DEFAULT_RATE_LIMIT: Tuple[int, int] = (500, 30_000)
+REQUEST_PRIORITIES: Dict[str, int] = {"interactive": 0, "batch": 1}
+DEFAULT_REQUEST_PRIORITY = "batch"
+# Rough characters per token, for rate-limit estimates and logged prompt sizes
+LLM_CHARS_PER_TOKEN = 4
+LLM_COMPLETION_TOKENS_ESTIMATE = 1500
+# SQLite file holding the buckets and queues of every process (web sessions,
+# batch and comparison runs run in processes of their own); override with
+# LLM_RATE_LIMIT_STORE. Waiting requests poll it every LLM_RATE_LIMIT_POLL_SECONDS,
+# and a queued request not polled for LLM_RATE_LIMIT_STALE_SECONDS (its
+# process died) no longer holds up the queue.
+LLM_RATE_LIMIT_STORE = Path(tempfile.gettempdir()) / "resume_refiner_crew" / "rate_limits.sqlite3"
+LLM_RATE_LIMIT_POLL_SECONDS = 0.1
+LLM_RATE_LIMIT_STALE_SECONDS = 10.0
+
+# Job Analysis Output
+# 'compact' requests only the JobRequirements fields the pipeline consumes
+# (JobRequirementsLite: skills, tools, experience, education, industry and
+# certifications, match score); 'full' also requests benefits, compensation,
+# company details and the rest of the JobRequirements schema.
+JOB_ANALYSIS_MODES: Tuple[str, ...] = ("compact", "full")
+DEFAULT_JOB_ANALYSIS_MODE = "compact"
+
+# Final Report
+# 'off' skips the report, 'local' renders it from REPORT_TEMPLATE without an
+# LLM, 'llm' adds a short narrative paragraph written by the report generator.
+# ENABLE_REPORTS accepts a mode, or true/false for DEFAULT_REPORT_MODE/'off'.
+REPORT_MODES: Tuple[str, ...] = ("off", "local", "llm")
+DEFAULT_REPORT_MODE = "local"
+
+# Pipeline Profiles
+# 'standard' writes the resume and fact-checks it in separate passes; 'fast'
+# has the resume writer verify its own claims in the same pass (one LLM stage
+# less, at a small accuracy cost). Harvard structuring is local in both.
+PIPELINE_PROFILES: Tuple[str, ...] = ("standard", "fast")
+DEFAULT_PIPELINE_PROFILE = "standard"
+
+# Job Description Preprocessing
+# Pasted job descriptions are cleaned before they are written to the knowledge
+# folder: whitespace is normalised, repeated paragraphs are dropped, and
+# paragraphs classified as boilerplate are removed. A heading naming a
+# category drops its whole section, except paragraphs with requirement
+# phrases; other paragraphs are dropped when they contain
+# JD_BOILERPLATE_MIN_HITS phrases of a category and fewer than
+# JD_BOILERPLATE_MIN_HITS requirement phrases. Disable with
+# PREPROCESS_JOB_DESCRIPTION=false.
+JD_BOILERPLATE_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    "benefits": (
+        "benefits", "perks", "what we offer", "we offer", "why join us", "compensation and benefits",
+        "beneficios", "ofrecemos", "qué ofrecemos",
+    ),
+    "company": (
+        "about us", "about the company", "who we are", "our story", "our culture", "our values",
+        "life at", "sobre nosotros", "quiénes somos", "acerca de",
+    ),
+    "eeo": (
+        "equal opportunity", "equal employment opportunity", "eeo statement", "diversity and inclusion",
+        "igualdad de oportunidades",
+    ),
+}
+JD_BOILERPLATE_PHRASES: Dict[str, Tuple[str, ...]] = {
+    "eeo": (
+        "equal opportunity", "equal employment", "without regard to", "race", "color", "religion",
+        "sexual orientation", "gender identity", "national origin", "veteran status", "disability",
+        "reasonable accommodation", "protected characteristic", "igualdad de oportunidades",
+    ),
+    "benefits": (
+        "health insurance", "dental", "vision insurance", "401(k)", "paid time off", "pto", "vacation",
+        "parental leave", "stock options", "equity", "wellness", "gym", "remote-friendly", "bonus",
+        "seguro médico", "vacaciones",
+    ),
+    "company": (
+        "we believe", "we hire", "our mission", "our company", "our business", "our team", "our culture",
+        "we are a", "we love", "founded", "headquartered", "our clients", "join us", "we are committed",
+        "nuestra misión", "nuestra empresa",
+    ),
+    "web": (
+        "cookie", "cookies", "accept all", "privacy policy", "terms of use", "sign in", "log in",
+        "apply now", "share this job", "save job", "report this job", "similar jobs", "javascript",
+        "show more", "show less", "easy apply",
+    ),
+}
+# Phrases of the job itself; paragraphs with several of them are always kept
+JD_REQUIREMENT_PHRASES: Tuple[str, ...] = (
+    "experience", "years", "skills", "responsibilit", "qualification", "requirement", "must",
+    "degree", "knowledge of", "proficien", "you will", "you'll", "develop", "design", "build",
+    "experiencia", "requisitos", "conocimientos", "responsabilidades", "años",
+)
+JD_BOILERPLATE_MIN_HITS = 2
+# Short lines (in words) dropped on a single web junk phrase
+JD_WEB_JUNK_MAX_WORDS = 12
+# Below this share of the original length, the classifier is distrusted and
+# only whitespace and duplicate cleanup is applied
+JD_MIN_KEPT_RATIO = 0.3
+JOB_DESCRIPTION_STATS_FILE = KNOWLEDGE_DIR / "job_description_stats.json"
+
+# Job Pre-screen
+# Local ranking of many job descriptions against one resume (prescreen.py):
+# score = w * BM25 cosine similarity + (1 - w) * keyword coverage
+PRESCREEN_BM25_K1 = 1.5
+PRESCREEN_BM25_B = 0.75
+# Top terms of each job description checked for keyword coverage
+PRESCREEN_KEYWORDS = 30
+PRESCREEN_SIMILARITY_WEIGHT = 0.5
+DEFAULT_PRESCREEN_TOP_K = 10
+
+# Fact Check
+# 'targeted' checks every claim locally against the parsed resume and asks the
+# fact checker only about the claims it could not match; 'full' sends the
+# whole resume to the fact checker. Override with FACT_CHECK_MODE.
+FACT_CHECK_MODES: Tuple[str, ...] = ("targeted", "full")
+DEFAULT_FACT_CHECK_MODE = "targeted"
+# Share of a claim's content words that must appear in the original resume
+FACT_CHECK_MIN_SUPPORT = 0.8
+# Lines of the original resume shown as evidence for each suspect claim
+FACT_CHECK_EVIDENCE_LINES = 3
+
+# Local-First Agents
+# Times a LocalFirstAgent asks its LLM again when its output_handler cannot
+# use the answer (no JSON, invalid JSON, fields missing)
+LOCAL_FIRST_OUTPUT_RETRIES = 1
+
+# Local Resume Formatting
+# Section headings of the generated markdown resume, per language, mapped to
+# HarvardFormattedResume fields. Headings are matched lowercased, without
+# punctuation and with '&' read as 'and'. Unknown headings become
+# additional_sections.
+RESUME_SECTION_HEADINGS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "English": {
+        "summary": ("summary", "professional summary", "profile", "objective"),
+        "work_experience": (
+            "work experience", "experience", "professional experience", "employment history"
+        ),
+        "education": ("education",),
+        "certifications": (
+            "certifications", "courses and certifications", "courses",
+            "licenses and certifications",
+        ),
+        "skills": ("skills", "technical skills", "skills and competencies"),
+        "languages": ("languages",),
+        "projects": ("projects",),
+    },
+    "Spanish": {
+        "summary": ("resumen", "resumen profesional", "perfil", "perfil profesional", "objetivo"),
+        "work_experience": ("experiencia", "experiencia laboral", "experiencia profesional"),
+        "education": ("educación", "educacion", "formación", "formacion", "formación académica"),
+        "certifications": ("certificaciones", "cursos", "cursos y certificaciones", "certificados"),
+        "skills": ("habilidades", "competencias", "aptitudes", "habilidades técnicas"),
+        "languages": ("idiomas",),
+        "projects": ("proyectos",),
+    },
+}
+# Keywords bolded per work experience by the local formatter
+MAX_KEYWORDS_TO_BOLD = 5
+
+# Skill Taxonomy
+# Canonical skill name -> aliases (see skill_taxonomy.py). Skills of the job
+# analysis are renamed to their canonical name, and any alias of a bolded
+# keyword is bolded. Names are matched by token, case-insensitively and
+# allowing plurals; aliases written in capitals ("CV") are acronyms and only
+# match capitalized text.
+SKILL_TAXONOMY: Dict[str, Tuple[str, ...]] = {
+    # Languages and frameworks
+    "Python": ("python3",),
+    "JavaScript": ("JS", "javascript"),
+    "TypeScript": ("typescript",),
+    "C++": ("cpp",),
+    "C#": ("csharp", "c sharp"),
+    "Node.js": ("nodejs", "node js"),
+    "PyTorch": ("torch",),
+    "TensorFlow": ("TF",),
+    "Keras": (),
+    "scikit-learn": ("sklearn", "scikit learn"),
+    "OpenCV": ("open cv",),
+    "NumPy": (),
+    "Pandas": (),
+    "FastAPI": ("fast api",),
+    "React": ("reactjs", "react.js"),
+    # Data and infrastructure
+    "SQL": (),
+    "PostgreSQL": ("postgres",),
+    "Apache Airflow": ("airflow",),
+    "Apache Spark": ("spark", "pyspark"),
+    "Docker": (),
+    "Kubernetes": ("K8s",),
+    "AWS": ("amazon web services",),
+    "GCP": ("google cloud platform", "google cloud"),
+    "Microsoft Azure": ("azure",),
+    "CI/CD": ("ci cd", "continuous integration continuous delivery"),
+    "Git": (),
+    "REST APIs": ("rest api", "restful api", "restful apis"),
+    "MLOps": ("ml ops",),
+    "ETL": (),
+    # Fields
+    "Machine Learning": ("ML", "aprendizaje automático"),
+    "Deep Learning": ("DL", "aprendizaje profundo"),
+    "Computer Vision": ("CV", "visión por computadora", "visión artificial"),
+    "Natural Language Processing": ("NLP", "procesamiento de lenguaje natural"),
+    "Artificial Intelligence": ("AI", "IA", "inteligencia artificial"),
+    "Large Language Models": ("LLM",),
+    "Object Detection": ("detección de objetos",),
+    "Image Segmentation": ("segmentación de imágenes",),
+    "Data Visualization": ("data visualisation", "visualización de datos"),
+}
+
 # Streamlit Progress Tracking
 # Maps task names to (position, agent_name, status_text)
 TASKS_INFO: Dict[str, Tuple[int, str, str]] = {
@@ -67,6 +451,11 @@ TASKS_INFO: Dict[str, Tuple[int, str, str]] = {
 
 TOTAL_TASKS = len(TASKS_INFO)
 
+# Live Output Streaming
+# Tasks whose LLM token stream is relayed to LIVE_OUTPUT_FILE for the UI
+STREAMED_TASKS: Tuple[str, ...] = ("generate_resume_task", "verify_resume_task")
+STREAM_FINAL_ANSWER_MARKER = "Final Answer:"
+
 # Validation Limits
 MAX_FILENAME_LENGTH = 255
 MIN_API_KEY_LENGTH = 20
@@ -78,6 +467,7 @@ LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
 # Scoring Weights (for JobRequirements)
+# Category weights of the overall match; override with SCORING_FACTORS (JSON)
 DEFAULT_SCORING_FACTORS = {
     "technical_skills": 0.35,
     "soft_skills": 0.20,
@@ -85,3 +475,11 @@ DEFAULT_SCORING_FACTORS = {
     "education": 0.10,
     "industry": 0.10,
 }
+# Importance of a skill within its category (SkillScore.required)
+SKILL_IMPORTANCE_WEIGHTS = {
+    "required": 1.0,
+    "nice_to_have": 0.5,
+}
+# Share of a skill's score that depends on the relevance of its usage context;
+# the rest is its match level
+SKILL_CONTEXT_WEIGHT = 0.3
@@ -0,0 +1,93 @@
+"""Assembly of the context a task receives from upstream tasks.
+
+CrewAI joins the raw output of every context task. That sends pretty-printed
+JSON (indentation is a large share of its tokens) with every field the
+upstream model produced, whether the consumer uses it or not, and repeats
+identical blocks. assemble_context builds the same divider-joined context,
+but:
+
+- JSON outputs are re-serialized compactly, keeping only the fields the
+  consuming task needs (CONTEXT_FIELDS)
+- a block identical to an earlier one is sent once
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from crewai import Task
+from crewai.utilities.formatter import DIVIDERS
+
+from .constants import LLM_CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+
+def _load_json(raw: str) -> Optional[Any]:
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def reduce_output(raw: str, fields: Optional[Sequence[str]] = None) -> str:
+    """Compact a JSON task output, keeping only some of its fields.
+
+    Args:
+        raw: Raw task output.
+        fields: Top-level fields to keep; None keeps every field.
+
+    Returns:
+        Compact JSON, or the raw output unchanged if it is not a JSON object.
+    """
+    data = _load_json(raw)
+    if not isinstance(data, dict):
+        return raw
+    if fields is not None:
+        data = {key: data[key] for key in fields if key in data}
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def assemble_context(
+    tasks: Sequence[Task],
+    context_fields: Optional[Mapping[str, Sequence[str]]] = None
+) -> str:
+    """Build the context of a task from the outputs of its context tasks.
+
+    Args:
+        tasks: Context tasks, in order. Tasks without output are skipped.
+        context_fields: Fields kept from each context task's JSON output,
+            by task name. Outputs of other tasks are kept whole.
+
+    Returns:
+        The context blocks joined with CrewAI's divider.
+    """
+    context_fields = context_fields or {}
+    blocks: List[str] = []
+    for task in tasks:
+        if task.output is None:
+            continue
+        block = reduce_output(task.output.raw, context_fields.get(task.name)).strip()
+        if block and block not in blocks:
+            blocks.append(block)
+    return DIVIDERS.join(blocks)
+
+
+def log_prompt_size(task_name: str, prompt: str, context: str, chars_saved: int) -> Dict[str, int]:
+    """Log the size of a task prompt and what context assembly saved.
+
+    Returns:
+        Prompt and context sizes in characters, and the estimated prompt tokens.
+    """
+    sizes = {
+        "prompt_chars": len(prompt) + len(context),
+        "context_chars": len(context),
+        "context_chars_saved": chars_saved,
+    }
+    sizes["estimated_prompt_tokens"] = sizes["prompt_chars"] // LLM_CHARS_PER_TOKEN
+    logger.info(
+        f"{task_name}: task prompt {sizes['prompt_chars']} chars "
+        f"(~{sizes['estimated_prompt_tokens']} tokens), context {sizes['context_chars']} chars, "
+        f"{sizes['context_chars_saved']} chars saved by context assembly"
+    )
+    return sizes
@@ -1,29 +1,63 @@
 """Resume Refiner Crew configuration and orchestration."""
 
-import os
+import json
+import logging
+import re
+from dataclasses import replace
 from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
-from crewai import Agent, Crew, Process, Task, LLM
+from crewai import Agent, Crew, Process, Task
+from crewai.llms.base_llm import BaseLLM
 from crewai.project import CrewBase, agent, crew, task
-from crewai.knowledge.source.text_file_knowledge_source import TextFileKnowledgeSource
+from crewai.rag.chromadb.config import ChromaDBConfig
+from crewai.rag.embeddings.factory import build_embedder
+from crewai.tasks.output_format import OutputFormat
+from crewai.tasks.task_output import TaskOutput
 from crewai_tools import PDFSearchTool
 
+from .checkpoint import load_completed_outputs, make_checkpoint_callback
 from .constants import (
     AGENTS_CONFIG,
+    CONTEXT_FIELDS,
     TASKS_CONFIG,
     DEFAULT_RESUME_PATH,
     DEFAULT_JOB_DESC_PATH,
     DEFAULT_RESUME_BEST_PRACTICES_PATH,
-    DEFAULT_OPENAI_MODEL,
+    KNOWLEDGE_DIR,
 )
+from .fact_check import (
+    Claim,
+    apply_verdicts,
+    find_suspect_claims,
+    format_claims_for_review,
+    list_claims,
+    parse_verdicts,
+)
+from .job_dedup import JobAnalysisIndex, JobAnalysisMatch, fingerprint
+from .knowledge import format_knowledge, load_knowledge
+from .local_first import LocalFirstAgent
+from .model_routing import resolve_agent_model
 from .models import (
+    JobMatchScore,
     JobRequirements,
+    JobRequirementsLite,
     ResumeOptimization,
     HarvardFormattedResume,
 )
+from .llm_resilience import request_policy
+from .prompt_caching import StablePrefixTask, create_llm
+from .report import get_report_mode, render_report
+from .resume_markdown import ResumeParseError, parse_resume_markdown
+from .run_config import RUN_CONFIG_OPTIONS, RunConfig
+from .scoring import include_computed_scores
+from .stage_metrics import record_stage_metrics, register_stage_metrics_listener
+from .streaming import register_live_output_relay
 from .tools.word_counter_tool import WordCounterTool
 from .utils import validate_path_exists
 
+logger = logging.getLogger(__name__)
+
 
 @CrewBase
 class ResumeRefinerCrew():
@@ -37,32 +71,126 @@ class ResumeRefinerCrew():
         job_description_path: str = str(DEFAULT_JOB_DESC_PATH),
         resume_pdf_path: str = str(DEFAULT_RESUME_PATH),
         resume_best_practices_path: str = str(DEFAULT_RESUME_BEST_PRACTICES_PATH),
+        run_config: Optional[RunConfig] = None,
         **kwargs
     ) -> None:
         """Initialize crew with job description and resume.
 
         Args:
-            job_description_path: Path to job description text file.
-                Note: TextFileKnowledgeSource will prepend "knowledge/" to relative paths.
+            job_description_path: Path to job description text file, relative
+                to the knowledge folder. Sent in the prompt when it is shorter
+                than KNOWLEDGE_INLINE_MAX_CHARS, otherwise through the vector store.
+            resume_best_practices_path: Path to the resume best practices file,
+                relative to the knowledge folder (sent like the job description).
             resume_pdf_path: Path to resume PDF file (used as-is by PDFSearchTool).
+            run_config: Settings of the run (API key, model, word target,
+                pipeline options); built from the environment when omitted.
+            **kwargs: Optional flags: enable_report (report mode 'off',
+                'local' or 'llm', or a boolean; defaults to ENABLE_REPORTS),
+                enable_fact_check, enable_streaming (stream writer/fact checker tokens to the UI),
+                run_id (checkpoint every task into that run, and skip the
+                tasks the run already completed), and any RunConfig setting
+                (model_preset, pipeline_profile, job_analysis_mode,
+                fact_check_mode, reuse_job_analyses, enable_hedging,
+                fallback_model, request_priority, ...), which takes
+                precedence over run_config.
 
         Raises:
-            FileNotFoundError: If resume PDF doesn't exist.
+            FileNotFoundError: If resume PDF or a knowledge file doesn't exist.
+            ConfigurationError: If the model preset, job analysis mode,
+                fact check mode, pipeline profile, report mode or request
+                priority is unknown.
+            InvalidInputError: If the word target of the run is out of range.
         """
         resume_path_obj = Path(resume_pdf_path)
         validate_path_exists(resume_path_obj, "resume PDF")
 
         self.job_description_path = job_description_path
         self.resume_pdf_path = resume_pdf_path
-        self.job_description = TextFileKnowledgeSource(file_paths=[job_description_path])
-        self.resume_best_practices = TextFileKnowledgeSource(file_paths=[resume_best_practices_path])
-        self.pdf_search_tool = PDFSearchTool(pdf=resume_pdf_path)
+        # Small knowledge files are sent in the task context, larger ones
+        # through the vector store (see knowledge.py)
+        job_description_text, self.job_description_sources = load_knowledge(job_description_path)
+        self.job_description_context = format_knowledge("JOB DESCRIPTION", job_description_text)
+        best_practices_text, self.best_practices_sources = load_knowledge(resume_best_practices_path)
+        self.best_practices_context = format_knowledge("RESUME BEST PRACTICES", best_practices_text)
 
-        model = os.getenv("OPENAI_MODEL", DEFAULT_OPENAI_MODEL)
-        self.llm = LLM(model=model)
+        # Run settings: explicit run_config, or the environment (see run_config)
+        overrides = {
+            name: kwargs.get(name) for name in RUN_CONFIG_OPTIONS if kwargs.get(name) is not None
+        }
+        self.config = (
+            replace(run_config, **overrides) if run_config is not None
+            else RunConfig.from_env(**overrides)
+        )
+        self.model = self.config.model
+        self.model_preset = self.config.model_preset
+        self.job_analysis_mode = self.config.job_analysis_mode
+        self.fact_check_mode = self.config.fact_check_mode
+        self.pipeline_profile = self.config.pipeline_profile
 
-        self.enable_report = kwargs.get('enable_report', True)
+        self.report_mode = get_report_mode(kwargs.get('enable_report'))
+        self.enable_report = self.report_mode != 'off'
         self.enable_fact_check = kwargs.get('enable_fact_check', True)
+        self.enable_streaming = kwargs.get('enable_streaming', True)
+        self.run_id = kwargs.get('run_id')
+
+        # The fast profile fuses the fact check into the resume writer's pass
+        self.separate_fact_check = self.enable_fact_check and self.pipeline_profile == 'standard'
+
+        # Claims the local pre-pass could not match, sent to the fact checker;
+        # None until the pre-pass of the current fact check succeeds
+        self._suspect_claims: Optional[List[Claim]] = None
+
+        # Stored analysis of a near-duplicate job description: its requirements
+        # are reused and only the candidate is scored again
+        self.job_analysis_index: Optional[JobAnalysisIndex] = None
+        self.job_analysis_match: Optional[JobAnalysisMatch] = None
+        if self.config.reuse_job_analyses:
+            self.job_description_text = (KNOWLEDGE_DIR / job_description_path).read_text(encoding='utf-8')
+            self.job_analysis_index = JobAnalysisIndex()
+            self.job_analysis_match = self.job_analysis_index.find(
+                self.job_description_text, self.job_analysis_mode
+            )
+
+        # The tool's dict config drops an embedder API key, so the vector store
+        # config is built with the run's embedder directly
+        embedder = self.config.embedder
+        self.pdf_search_tool = (
+            PDFSearchTool(
+                pdf=resume_pdf_path,
+                config=ChromaDBConfig(embedding_function=build_embedder(embedder))
+            )
+            if embedder else PDFSearchTool(pdf=resume_pdf_path)
+        )
+
+        if self.enable_streaming:
+            register_live_output_relay()
+        register_stage_metrics_listener()
+
+    def _agent_llm(self, agent_name: str, stream: bool = False) -> BaseLLM:
+        """Build a dedicated LLM for an agent, on the model routed to it.
+
+        Each agent gets its own instance so its token usage (including cached
+        prompt tokens) is tracked per stage, and requests are hedged against
+        the agent's own latency SLO (see llm_resilience).
+        """
+        model = resolve_agent_model(
+            agent_name, self.agents_config[agent_name], self.model, self.model_preset
+        )
+        # Writer and fact checker produce the longest free-text outputs, so only
+        # they stream; structured-output tasks keep a non-streaming LLM.
+        return create_llm(
+            model,
+            cache_key=agent_name,
+            api_key=self.config.api_key,
+            policy=request_policy(
+                agent_name,
+                self.config.fallback_model,
+                self.config.enable_hedging,
+                self.config.request_priority
+            ),
+            stream=stream and self.enable_streaming
+        )
 
     # PARSE RESUME
     # Parse PDF resume to markdown format
@@ -71,39 +199,95 @@ class ResumeRefinerCrew():
         return Agent(
             config=self.agents_config['resume_parser'],
             verbose=True,
-            llm=self.llm,
+            llm=self._agent_llm('resume_parser'),
             tools=[self.pdf_search_tool]
         )
 
     @task
     def parse_resume_task(self) -> Task:
-        return Task(
+        return StablePrefixTask(
             config=self.tasks_config['parse_resume_task'],
             output_file='output/parsed_resume.md',
             agent=self.resume_parser()
         )
 
     # ANALYZE JOB
-    # Analyze job descriptions and score candidate fit
+    # Analyze job descriptions and score candidate fit. When the job description
+    # nearly duplicates one analysed before, its requirements are reused: the
+    # stored analysis is returned as is for the same resume, otherwise the
+    # analyzer only scores the candidate against the stored requirements.
     @agent
     def job_analyzer(self) -> Agent:
-        return Agent(
+        if self.job_analysis_match is None:
+            return Agent(
+                config=self.agents_config['job_analyzer'],
+                verbose=True,
+                llm=self._agent_llm('job_analyzer'),
+                knowledge_sources=self.job_description_sources or None,
+                embedder=self.config.embedder
+            )
+        return LocalFirstAgent(
             config=self.agents_config['job_analyzer'],
             verbose=True,
-            llm=self.llm,
-            knowledge_sources=[self.job_description]
+            llm=self._agent_llm('job_analyzer'),
+            local_handler=self._reuse_job_analysis,
+            context_handler=self._stored_requirements_context,
+            output_handler=self._merge_match_score,
+            response_model=JobMatchScore
         )
 
+    def _reuse_job_analysis(self, task: Task) -> Optional[str]:
+        """Return the stored analysis when it scored the same resume."""
+        resume = task.context[0].output.raw
+        if fingerprint(resume) != self.job_analysis_match['resume_fingerprint']:
+            return None
+        return json.dumps(self.job_analysis_match['analysis'], ensure_ascii=False)
+
+    def _stored_requirements_context(self, task: Task, context: Optional[str]) -> str:
+        requirements = {
+            key: value for key, value in self.job_analysis_match['analysis'].items()
+            if key not in ('match_score', 'score_explanation')
+        }
+        resume = task.context[0].output.raw
+        return f"JOB REQUIREMENTS:\n{json.dumps(requirements, ensure_ascii=False)}\n\nRESUME:\n{resume}"
+
+    def _merge_match_score(self, task: Task, result: str) -> str:
+        """Combine the stored requirements with the new candidate scoring."""
+        match = re.search(r"\{.*\}", result, re.DOTALL)
+        if not match:
+            raise ValueError(f"Job analyzer answer contains no JSON: {result[:200]}")
+        match_score = JobMatchScore.model_validate_json(match.group())
+        analysis = {**self.job_analysis_match['analysis'], 'match_score': match_score.model_dump()}
+        analysis.pop('score_explanation', None)
+        return json.dumps(analysis, ensure_ascii=False)
+
     @task
     def analyze_job_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['analyze_job_task'],
+        reuse = self.job_analysis_match is not None
+        inline_knowledge = [self.job_description_context] if self.job_description_context else []
+        return StablePrefixTask(
+            config=self.tasks_config['score_match_task' if reuse else 'analyze_job_task'],
             output_file='output/job_analysis.json',
-            output_pydantic=JobRequirements,
+            # Compact mode only asks for the fields later tasks and the PDF use
+            output_pydantic=JobRequirementsLite if self.job_analysis_mode == 'compact' else JobRequirements,
+            guardrail=include_computed_scores,
+            inline_knowledge=[] if reuse else inline_knowledge,
             agent=self.job_analyzer(),
             context=[self.parse_resume_task()]
         )
 
+    def _store_job_analysis(self, output: TaskOutput) -> None:
+        """Add a new job analysis to the index, for near-duplicate job descriptions."""
+        resume = self.parse_resume_task().output
+        if resume is None:
+            return
+        try:
+            self.job_analysis_index.add(
+                self.job_description_text, output.raw, self.job_analysis_mode, resume.raw
+            )
+        except OSError as e:
+            logger.error(f"Failed to store the job analysis for reuse: {e}")
+
     # OPTIMIZE RESUME
     # Analyze resumes and provide structured optimization suggestions
     @agent
@@ -111,16 +295,19 @@ class ResumeRefinerCrew():
         return Agent(
             config=self.agents_config['resume_analyzer'],
             verbose=True,
-            llm=self.llm,
-            knowledge_sources=[self.resume_best_practices]
+            llm=self._agent_llm('resume_analyzer'),
+            knowledge_sources=self.best_practices_sources or None,
+            embedder=self.config.embedder
         )
 
     @task
     def optimize_resume_task(self) -> Task:
-        return Task(
+        return StablePrefixTask(
             config=self.tasks_config['optimize_resume_task'],
             output_file='output/resume_optimization.json',
             output_pydantic=ResumeOptimization,
+            inline_knowledge=[self.best_practices_context] if self.best_practices_context else [],
+            context_fields=CONTEXT_FIELDS['optimize_resume_task'],
             agent=self.resume_analyzer(),
             context=[self.parse_resume_task(), self.analyze_job_task()]
         )
@@ -132,14 +319,20 @@ class ResumeRefinerCrew():
         return Agent(
             config=self.agents_config['resume_writer'],
             verbose=True,
-            llm=self.llm,
-            tools=[WordCounterTool()]
+            llm=self._agent_llm('resume_writer', stream=True),
+            tools=[WordCounterTool(target_words=self.config.target_words)]
         )
 
     @task
     def generate_resume_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['generate_resume_task'],
+        config = self.tasks_config['generate_resume_task']
+        if self.enable_fact_check and not self.separate_fact_check:
+            config = {
+                **config,
+                'description': f"{config['description']}\n{config['self_verification']}"
+            }
+        return StablePrefixTask(
+            config=config,
             output_file='output/optimized_resume.md',
             agent=self.resume_writer(),
             context=[self.parse_resume_task(), self.optimize_resume_task()]
@@ -147,20 +340,59 @@ class ResumeRefinerCrew():
 
     # VERIFY RESUME
     # Verify all claims in the optimized resume against the original CV
-    # and remove any hallucinated content
+    # and remove any hallucinated content. In 'targeted' mode the claims are
+    # matched locally first, and the fact checker only judges the unmatched ones.
     @agent
     def fact_checker(self) -> Agent:
-        return Agent(
+        if self.fact_check_mode == 'full':
+            return Agent(
+                config=self.agents_config['fact_checker'],
+                verbose=True,
+                llm=self._agent_llm('fact_checker', stream=True),
+                tools=[WordCounterTool(target_words=self.config.target_words)]
+            )
+        return LocalFirstAgent(
             config=self.agents_config['fact_checker'],
             verbose=True,
-            llm=self.llm,
-            tools=[WordCounterTool()]
+            llm=self._agent_llm('fact_checker'),
+            local_handler=self._check_claims_locally,
+            context_handler=self._suspect_claims_context,
+            output_handler=self._apply_claim_verdicts
         )
 
+    @staticmethod
+    def _verification_sources(task: Task) -> Tuple[str, str]:
+        """Original and optimized resume from the verify task context."""
+        original, optimized = (t.output.raw for t in task.context)
+        return original, optimized
+
+    def _check_claims_locally(self, task: Task) -> Optional[str]:
+        """Return the optimized resume as verified when every claim matches the original."""
+        self._suspect_claims = None
+        original, optimized = self._verification_sources(task)
+        self._suspect_claims = find_suspect_claims(original, optimized)
+        logger.info(f"Fact check: {len(self._suspect_claims)} claims left to the fact checker")
+        return None if self._suspect_claims else optimized
+
+    def _suspect_claims_context(self, task: Task, context: Optional[str]) -> str:
+        original, optimized = self._verification_sources(task)
+        if self._suspect_claims is None:
+            # The local matching failed: the fact checker reviews every claim
+            self._suspect_claims = list_claims(optimized)
+            logger.warning(
+                f"Fact check: local matching failed, {len(self._suspect_claims)} claims left to the fact checker"
+            )
+        return format_claims_for_review(self._suspect_claims, original)
+
+    def _apply_claim_verdicts(self, task: Task, result: str) -> str:
+        _, optimized = self._verification_sources(task)
+        return apply_verdicts(optimized, self._suspect_claims, parse_verdicts(result))
+
     @task
     def verify_resume_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['verify_resume_task'],
+        config_name = 'verify_resume_task' if self.fact_check_mode == 'full' else 'verify_claims_task'
+        return StablePrefixTask(
+            config=self.tasks_config[config_name],
             output_file='output/verified_resume.md',
             agent=self.fact_checker(),
             context=[self.parse_resume_task(), self.generate_resume_task()]
@@ -168,19 +400,55 @@ class ResumeRefinerCrew():
 
     # FORMAT TO HARVARD
     # Parse and structure resume content into Harvard-compliant format 
-    # with precise data extraction
+    # with precise data extraction. The resume is parsed locally; the LLM
+    # formatter only runs when the markdown does not follow the conventions.
     @agent
     def harvard_formatter(self) -> Agent:
-        return Agent(
+        return LocalFirstAgent(
             config=self.agents_config['harvard_formatter'],
             verbose=True,
-            llm=self.llm
+            llm=self._agent_llm('harvard_formatter'),
+            local_handler=self._format_resume_locally
         )
 
+    def _bold_candidates(self) -> List[str]:
+        """Job skills and ATS keywords worth bolding in the formatted resume."""
+        candidates: List[str] = []
+        job_analysis = self.analyze_job_task().output
+        if job_analysis is not None and job_analysis.pydantic is not None:
+            for field in ('technical_skills', 'soft_skills', 'nice_to_have'):
+                candidates.extend(getattr(job_analysis.pydantic, field, []))
+
+        optimization = self.optimize_resume_task().output
+        if optimization is not None and optimization.pydantic is not None:
+            for keyword in optimization.pydantic.keywords_for_ats:
+                if isinstance(keyword, dict):
+                    keyword = keyword.get('keyword')
+                if isinstance(keyword, str):
+                    candidates.append(keyword)
+        return candidates
+
+    def _format_resume_locally(self, task: Task) -> Optional[str]:
+        """Structure the resume of the task context with the local parser.
+
+        Returns:
+            HarvardFormattedResume JSON, or None to let the LLM format the resume.
+        """
+        source = task.context[0].output if task.context else None
+        if source is None:
+            return None
+
+        try:
+            resume = parse_resume_markdown(source.raw, self._bold_candidates())
+        except ResumeParseError as e:
+            logger.info(f"Resume could not be formatted locally, using the LLM formatter: {e}")
+            return None
+        return resume.model_dump_json()
+
     @task
     def harvard_format_task(self) -> Task:
-        context = [self.verify_resume_task()] if self.enable_fact_check else [self.generate_resume_task()]
-        return Task(
+        context = [self.verify_resume_task()] if self.separate_fact_check else [self.generate_resume_task()]
+        return StablePrefixTask(
             config=self.tasks_config['harvard_format_task'],
             output_file='output/structured_resume.json',
             output_pydantic=HarvardFormattedResume,
@@ -189,25 +457,72 @@ class ResumeRefinerCrew():
         )
 
     # GENERATE REPORT
-    # Create comprehensive, visually appealing, and actionable reports 
-    # from job application analysis
+    # Render the job application report from the job analysis and the resume
+    # optimization; in 'llm' mode the agent only writes its opening paragraph
     @agent
     def report_generator(self) -> Agent:
-        return Agent(
+        return LocalFirstAgent(
             config=self.agents_config['report_generator'],
             verbose=True,
-            llm=self.llm
+            llm=self._agent_llm('report_generator'),
+            local_handler=self._render_report if self.report_mode == 'local' else None,
+            output_handler=self._render_report if self.report_mode == 'llm' else None
         )
-    
+
+    def _render_report(self, task: Task, narrative: Optional[str] = None) -> str:
+        """Render the final report from the job analysis and optimization outputs."""
+        job_analysis = self.analyze_job_task().output
+        optimization = self.optimize_resume_task().output
+        return render_report(
+            job_analysis.pydantic if job_analysis is not None else None,
+            optimization.pydantic if optimization is not None else None,
+            narrative=narrative
+        )
+
     @task
     def generate_report_task(self) -> Task:
-        return Task(
+        return StablePrefixTask(
             config=self.tasks_config['generate_report_task'],
             output_file='output/final_report.md',
+            context_fields=CONTEXT_FIELDS['generate_report_task'],
             agent=self.report_generator(),
             context=[self.analyze_job_task(), self.optimize_resume_task()]
         )
 
+    def _restore_task_output(self, task: Task, content: str) -> None:
+        """Attach a checkpointed output to a task so later tasks get it as context."""
+        pydantic_output = (
+            task.output_pydantic.model_validate_json(content) if task.output_pydantic else None
+        )
+        task.output = TaskOutput(
+            description=task.description,
+            name=task.name,
+            expected_output=task.expected_output,
+            raw=content,
+            pydantic=pydantic_output,
+            agent=task.agent.role,
+            output_format=OutputFormat.PYDANTIC if pydantic_output else OutputFormat.RAW
+        )
+
+    def _make_task_callback(self, tasks: List[Task]) -> Callable[[TaskOutput], None]:
+        """Build the Crew task_callback: stage metrics, then the run checkpoint."""
+        tasks_by_name = {t.name: t for t in tasks}
+        checkpoint_callback: Optional[Callable[[TaskOutput], None]] = (
+            make_checkpoint_callback(self.run_id) if self.run_id else None
+        )
+
+        def _callback(output: TaskOutput) -> None:
+            task = tasks_by_name.get(output.name)
+            if task is not None:
+                record_stage_metrics(task, output)
+            if (output.name == 'analyze_job_task' and self.job_analysis_index is not None
+                    and self.job_analysis_match is None):
+                self._store_job_analysis(output)
+            if checkpoint_callback is not None:
+                checkpoint_callback(output)
+
+        return _callback
+
     @crew
     def crew(self) -> Crew:
         tasks = [
@@ -217,7 +532,7 @@ class ResumeRefinerCrew():
             self.generate_resume_task(),
         ]
 
-        if self.enable_fact_check:
+        if self.separate_fact_check:
             tasks.append(self.verify_resume_task())
 
         tasks.append(self.harvard_format_task())
@@ -225,11 +540,22 @@ class ResumeRefinerCrew():
         if self.enable_report:
             tasks.append(self.generate_report_task())
 
+        # When resuming a run, completed tasks are not executed again: their
+        # checkpointed output is attached so it is still passed as context.
+        completed_outputs: Dict[str, str] = {}
+        if self.run_id:
+            completed_outputs = load_completed_outputs(self.run_id)
+            for t in tasks:
+                if t.name in completed_outputs:
+                    self._restore_task_output(t, completed_outputs[t.name])
+            tasks = [t for t in tasks if t.name not in completed_outputs]
+
         return Crew(
             agents=[t.agent for t in tasks],
             tasks=tasks,
             verbose=True,
             process=Process.sequential,
             memory=False,
-            output_log_file=".crewai_temp/crew_logs.txt"
+            output_log_file=".crewai_temp/crew_logs.txt",
+            task_callback=self._make_task_callback(tasks)
         )
@@ -0,0 +1,314 @@
+"""Local lexical pre-pass of the fact check.
+
+Most lines of the optimized resume are rewordings of lines of the parsed
+resume. The pre-pass indexes the parsed resume (words, word stems, numbers
+and dates) and scores every claim of the optimized resume (each line below a
+'##' section heading) for support:
+
+- every number and date of the claim must appear in the original resume,
+  together with its unit ('$5 million', '80%', '4 years'), so a known number
+  cannot back a different amount
+- most of its content words must appear in it, allowing for inflection
+- names (words with inner capitals, acronyms, capitalized words inside the
+  sentence) must appear in it; an acronym may also appear spelled out
+
+Claims failing any rule are suspect. Only suspect claims are sent to the fact
+checker, each with the most similar lines of the original resume as evidence,
+and the fact checker answers with a verdict per claim, applied locally. When
+no claim is suspect the fact checker is not called at all.
+"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Literal, Optional, Sequence, Set
+
+from pydantic import BaseModel, Field, ValidationError
+
+from .constants import FACT_CHECK_EVIDENCE_LINES, FACT_CHECK_MIN_SUPPORT
+
+logger = logging.getLogger(__name__)
+
+# Words that carry no claim, in the languages resumes are written in
+STOPWORDS: FrozenSet[str] = frozenset(
+    "a an and as at by for from in into of on or the to with within over up via "
+    "using including across per its their his her our is are was were be been "
+    "that this these those which who while than then more most "
+    "i me my we us our you your they them it will can would should may not no all any also "
+    "y e o u de del la las el los en con para por un una unos unas al su sus "
+    "que como entre sobre desde hasta mediante más".split()
+)
+
+_TOKEN_RE = re.compile(r"\w+(?:[+#.]\w+)*\+*", re.UNICODE)
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+# A number with its currency sign and/or unit word; the unit is part of the claim
+_QUANTITY_RE = re.compile(
+    r"(?P<currency>[$€£])?\s?(?P<number>\d+(?:[.,]\d+)?)\+?"
+    r"(?:\s?(?P<unit>%|x\b|k\b|m\b|bn\b|"
+    r"(?:thousand|million|billion|millones|mil|years?|months?|weeks?|años|meses|semanas)\b))?",
+    re.IGNORECASE
+)
+_PREFIX_RE = re.compile(r"^(\s*(?:#{1,6}\s+|[-*+]\s+|\d+[.)]\s+)?)")
+_STEM_LENGTH = 5
+_MAX_ACRONYM_LENGTH = 4
+
+
+def _stem(token: str) -> str:
+    return token[:_STEM_LENGTH]
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text)
+
+
+def _is_name(token: str, position: int) -> bool:
+    """Whether a token looks like a proper name, acronym or product name."""
+    if any(char.isupper() for char in token[1:]):
+        return True
+    return position > 0 and token[0].isupper()
+
+
+def _acronyms(line: str) -> Set[str]:
+    """Acronyms of the phrases of a line ('computer vision' -> 'cv')."""
+    initials = [t[0].lower() for t in _tokens(line) if t.lower() not in STOPWORDS]
+    return {
+        "".join(initials[start:start + length])
+        for length in range(2, _MAX_ACRONYM_LENGTH + 1)
+        for start in range(len(initials) - length + 1)
+    }
+
+
+def _quantities(text: str) -> List[str]:
+    """Numbers of a text with their currency and unit, normalized ('$5 million', '80%')."""
+    quantities = []
+    for match in _QUANTITY_RE.finditer(text):
+        unit = (match.group("unit") or "").lower()
+        if len(unit) > 1 and unit != "bn":
+            unit = f" {unit}"
+        quantities.append(f"{match.group('currency') or ''}{match.group('number')}{unit}")
+    return quantities
+
+
+def _visible_text(line: str) -> str:
+    return _PREFIX_RE.sub("", line).replace("**", "").replace("__", "").strip()
+
+
+@dataclass
+class SourceIndex:
+    """Lexical index of the original resume."""
+
+    lines: List[str]
+    tokens: Set[str] = field(default_factory=set)
+    stems: Set[str] = field(default_factory=set)
+    numbers: Set[str] = field(default_factory=set)
+    quantities: Set[str] = field(default_factory=set)
+    acronyms: Set[str] = field(default_factory=set)
+    line_tokens: List[Set[str]] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, markdown: str) -> "SourceIndex":
+        """Index every non-empty line of a markdown document."""
+        index = cls(lines=[_visible_text(line) for line in markdown.splitlines() if line.strip()])
+        for line in index.lines:
+            tokens = {token.lower() for token in _tokens(line)}
+            index.line_tokens.append(tokens)
+            index.tokens |= tokens
+            index.stems |= {_stem(token) for token in tokens if len(token) >= _STEM_LENGTH}
+            index.numbers |= set(_NUMBER_RE.findall(line))
+            index.quantities |= set(_quantities(line))
+            index.acronyms |= _acronyms(line)
+        return index
+
+    def supports(self, token: str) -> bool:
+        if token.isupper() and token.lower() in self.acronyms:
+            return True
+        token = token.lower()
+        return token in self.tokens or (
+            len(token) >= _STEM_LENGTH and _stem(token) in self.stems
+        )
+
+    def supports_quantity(self, quantity: str) -> bool:
+        """Whether a quantity of _quantities() appears in the original resume.
+
+        A bare number matches any occurrence of it; a number with a currency
+        or unit only matches the same amount with the same unit.
+        """
+        return quantity in self.numbers or quantity in self.quantities
+
+    def evidence(self, claim: str, limit: int = FACT_CHECK_EVIDENCE_LINES) -> List[str]:
+        """Return the lines of the original resume sharing most words with a claim."""
+        words = {t.lower() for t in _tokens(claim)} - STOPWORDS
+        ranked = sorted(
+            range(len(self.lines)),
+            key=lambda i: len(words & self.line_tokens[i]),
+            reverse=True
+        )
+        return [self.lines[i] for i in ranked[:limit] if words & self.line_tokens[i]]
+
+
+@dataclass
+class Claim:
+    """A line of the optimized resume, with its lexical support."""
+
+    claim_id: int
+    line_index: int
+    text: str
+    support: float
+    unsupported_numbers: List[str]
+    unsupported_names: List[str]
+
+    @property
+    def is_suspect(self) -> bool:
+        return (
+            self.support < FACT_CHECK_MIN_SUPPORT
+            or bool(self.unsupported_numbers)
+            or bool(self.unsupported_names)
+        )
+
+
+def score_claims(optimized_markdown: str, source: SourceIndex) -> List[Claim]:
+    """Score the support of every claim of the optimized resume.
+
+    The candidate name and '##' section headings are structure, not claims.
+
+    Args:
+        optimized_markdown: The resume to verify.
+        source: Index of the original resume.
+
+    Returns:
+        One Claim per line below the first section heading.
+    """
+    claims: List[Claim] = []
+    in_sections = False
+
+    for line_index, line in enumerate(optimized_markdown.splitlines()):
+        if line.startswith("## "):
+            in_sections = True
+            continue
+        text = _visible_text(line)
+        if not in_sections or not text or not any(char.isalnum() for char in text):
+            continue
+
+        tokens = _tokens(text)
+        content = [t for t in tokens if t.lower() not in STOPWORDS and not t.isdigit()]
+        supported = [t for t in content if source.supports(t)]
+        claims.append(Claim(
+            claim_id=len(claims) + 1,
+            line_index=line_index,
+            text=text,
+            support=len(supported) / len(content) if content else 1.0,
+            unsupported_numbers=[q for q in _quantities(text) if not source.supports_quantity(q)],
+            unsupported_names=[
+                t for position, t in enumerate(tokens)
+                if _is_name(t, position) and not source.supports(t)
+            ],
+        ))
+
+    return claims
+
+
+def find_suspect_claims(original_markdown: str, optimized_markdown: str) -> List[Claim]:
+    """Return the claims of the optimized resume the original does not clearly support.
+
+    Suspect claims are numbered from 1, in resume order.
+    """
+    source = SourceIndex.build(original_markdown)
+    suspects = [claim for claim in score_claims(optimized_markdown, source) if claim.is_suspect]
+    for number, claim in enumerate(suspects, start=1):
+        claim.claim_id = number
+    return suspects
+
+
+def list_claims(optimized_markdown: str) -> List[Claim]:
+    """Every claim of the optimized resume, numbered from 1, as if none matched."""
+    return score_claims(optimized_markdown, SourceIndex.build(""))
+
+
+def format_claims_for_review(claims: Sequence[Claim], original_markdown: str) -> str:
+    """Describe suspect claims and their evidence for the fact checker."""
+    source = SourceIndex.build(original_markdown)
+    blocks = []
+    for claim in claims:
+        reasons = []
+        if claim.unsupported_numbers:
+            reasons.append(f"numbers not found: {', '.join(claim.unsupported_numbers)}")
+        if claim.unsupported_names:
+            reasons.append(f"names not found: {', '.join(claim.unsupported_names)}")
+        if claim.support < FACT_CHECK_MIN_SUPPORT:
+            reasons.append(f"{claim.support:.0%} of its words found")
+
+        evidence = "\n".join(f"    > {line}" for line in source.evidence(claim.text)) or "    > (none)"
+        blocks.append(
+            f"[{claim.claim_id}] {claim.text}\n"
+            f"  Why it was flagged: {'; '.join(reasons)}\n"
+            f"  Closest lines of the original resume:\n{evidence}"
+        )
+    return "CLAIMS TO VERIFY:\n\n" + "\n\n".join(blocks)
+
+
+class ClaimVerdict(BaseModel):
+    """Fact checker decision on a suspect claim."""
+
+    claim_id: int = Field(description="Number of the claim")
+    action: Literal["keep", "rewrite", "remove"] = Field(
+        description="keep if supported, rewrite to fix it, remove if unverifiable"
+    )
+    text: Optional[str] = Field(description="Corrected claim, for rewrite", default=None)
+
+
+class ClaimVerdicts(BaseModel):
+    verdicts: List[ClaimVerdict] = Field(default_factory=list)
+
+
+def parse_verdicts(response: str) -> List[ClaimVerdict]:
+    """Parse the fact checker's JSON answer.
+
+    Raises:
+        ValueError: If the answer is not a list of claim verdicts.
+    """
+    match = re.search(r"[\[{].*[\]}]", response, re.DOTALL)
+    if not match:
+        raise ValueError(f"Fact checker answer contains no JSON: {response[:200]}")
+    try:
+        data = json.loads(match.group())
+        if isinstance(data, list):
+            data = {"verdicts": data}
+        return ClaimVerdicts.model_validate(data).verdicts
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise ValueError(f"Invalid fact checker answer: {e}") from e
+
+
+def apply_verdicts(
+    optimized_markdown: str,
+    claims: Sequence[Claim],
+    verdicts: Sequence[ClaimVerdict]
+) -> str:
+    """Apply the fact checker's verdicts to the optimized resume.
+
+    Claims were sent because they could not be verified locally, so claims
+    the fact checker skipped are removed rather than kept unverified.
+
+    Returns:
+        The verified resume.
+    """
+    lines = optimized_markdown.splitlines()
+    claims_by_id: Dict[int, Claim] = {claim.claim_id: claim for claim in claims}
+    removed: Set[int] = set()
+
+    skipped = set(claims_by_id) - {verdict.claim_id for verdict in verdicts}
+    if skipped:
+        logger.warning(f"Fact check: no verdict for claims {sorted(skipped)}, removing them")
+        removed |= {claims_by_id[claim_id].line_index for claim_id in skipped}
+
+    for verdict in verdicts:
+        claim = claims_by_id.get(verdict.claim_id)
+        if claim is None or verdict.action == "keep":
+            continue
+        if verdict.action == "remove" or not (verdict.text or "").strip():
+            removed.add(claim.line_index)
+        else:
+            prefix = _PREFIX_RE.match(lines[claim.line_index]).group(1)
+            lines[claim.line_index] = f"{prefix}{verdict.text.strip()}"
+
+    return "\n".join(line for i, line in enumerate(lines) if i not in removed)
@@ -0,0 +1,235 @@
+"""Reuse of job analyses across near-duplicate job descriptions.
+
+The same posting often arrives many times: reposted, syndicated across job
+boards, or pasted with different whitespace. JobAnalysisIndex stores every
+job analysis with a MinHash signature of its job description, so a job
+description that nearly duplicates an analysed one reuses its extracted
+requirements, and the job analyzer only scores the candidate again:
+
+- job descriptions are normalised (unicode, case, punctuation, whitespace)
+  and split into overlapping JOB_DEDUP_SHINGLE_WORDS-word shingles
+- the signature holds, for each of JOB_DEDUP_PERMUTATIONS random hash
+  functions, the minimum hash of the shingles; the share of equal positions
+  of two signatures estimates the Jaccard similarity of their shingle sets
+- LSH buckets every signature by each of its JOB_DEDUP_BANDS bands, so only
+  entries sharing a bucket with the new signature are compared
+
+The index lives in JOB_ANALYSES_DIR, outside output/, so it survives
+setup_clean_storage() like the run checkpoints.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import uuid
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, TypedDict
+
+import numpy as np
+
+from .constants import (
+    JOB_ANALYSES_DIR,
+    JOB_ANALYSES_INDEX_FILENAME,
+    JOB_DEDUP_BANDS,
+    JOB_DEDUP_MAX_ENTRIES,
+    JOB_DEDUP_PERMUTATIONS,
+    JOB_DEDUP_SHINGLE_WORDS,
+    JOB_DEDUP_THRESHOLD,
+)
+from .job_description import normalize_whitespace
+
+logger = logging.getLogger(__name__)
+
+# Hash functions (a * x + b) mod p over 32-bit shingle hashes. The seed is
+# fixed: stored signatures are only comparable with the same functions.
+_HASH_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+_rng = np.random.default_rng(20251027)
+_HASH_A = _rng.integers(1, 2**32, size=JOB_DEDUP_PERMUTATIONS, dtype=np.uint64)
+_HASH_B = _rng.integers(0, 2**32, size=JOB_DEDUP_PERMUTATIONS, dtype=np.uint64)
+_ROWS_PER_BAND = JOB_DEDUP_PERMUTATIONS // JOB_DEDUP_BANDS
+
+
+class JobAnalysisEntry(TypedDict):
+    """Index entry of a stored job analysis."""
+
+    analysis_id: str
+    created_at: str
+    job_analysis_mode: str
+    resume_fingerprint: str
+    signature: List[int]
+
+
+class JobAnalysisMatch(TypedDict):
+    """Stored job analysis of a near-duplicate job description."""
+
+    analysis_id: str
+    similarity: float
+    resume_fingerprint: str
+    analysis: Dict[str, Any]
+
+
+def shingles(text: str) -> Set[str]:
+    """Overlapping word shingles of a normalised text."""
+    words = re.sub(r"[^\w]+", " ", normalize_whitespace(text).lower()).split()
+    if len(words) <= JOB_DEDUP_SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {
+        " ".join(words[i:i + JOB_DEDUP_SHINGLE_WORDS])
+        for i in range(len(words) - JOB_DEDUP_SHINGLE_WORDS + 1)
+    }
+
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """MinHash signature of a text, or None if it has no words."""
+    text_shingles = shingles(text)
+    if not text_shingles:
+        return None
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in text_shingles),
+        dtype=np.uint64, count=len(text_shingles)
+    )
+    return ((np.outer(hashes, _HASH_A) + _HASH_B) % _HASH_PRIME).min(axis=0)
+
+
+def fingerprint(text: str) -> str:
+    """Hash of a normalised text, to tell whether two texts are the same."""
+    return hashlib.sha256(normalize_whitespace(text).encode("utf-8")).hexdigest()
+
+
+def _band_keys(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+    return [
+        (band, signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND].tobytes())
+        for band in range(JOB_DEDUP_BANDS)
+    ]
+
+
+class JobAnalysisIndex:
+    """Persisted MinHash/LSH index of job analyses."""
+
+    def __init__(self, directory: Path = JOB_ANALYSES_DIR) -> None:
+        self.directory = Path(directory)
+        self.entries: List[JobAnalysisEntry] = []
+        index_path = self.directory / JOB_ANALYSES_INDEX_FILENAME
+        if index_path.exists():
+            try:
+                self.entries = json.loads(index_path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Job analysis index {index_path} is unreadable, starting a new one: {e}")
+
+        self._signatures = [np.array(e["signature"], dtype=np.uint64) for e in self.entries]
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        for position, signature in enumerate(self._signatures):
+            self._add_to_buckets(position, signature)
+
+    def _add_to_buckets(self, position: int, signature: np.ndarray) -> None:
+        for key in _band_keys(signature):
+            self._buckets.setdefault(key, []).append(position)
+
+    def find(self, job_description: str, job_analysis_mode: str) -> Optional[JobAnalysisMatch]:
+        """Find the stored analysis of a near-duplicate job description.
+
+        Args:
+            job_description: Job description text.
+            job_analysis_mode: Only analyses made in this mode are reused.
+
+        Returns:
+            The most similar stored analysis at or above JOB_DEDUP_THRESHOLD,
+            or None.
+        """
+        signature = minhash_signature(job_description)
+        if signature is None:
+            return None
+
+        candidates = {
+            position
+            for key in _band_keys(signature)
+            for position in self._buckets.get(key, ())
+            if self.entries[position]["job_analysis_mode"] == job_analysis_mode
+        }
+        best: Optional[Tuple[float, int]] = None
+        for position in candidates:
+            similarity = float(np.mean(self._signatures[position] == signature))
+            if similarity >= JOB_DEDUP_THRESHOLD and (best is None or similarity > best[0]):
+                best = (similarity, position)
+        if best is None:
+            return None
+
+        similarity, position = best
+        entry = self.entries[position]
+        analysis_path = self.directory / f"{entry['analysis_id']}.json"
+        try:
+            analysis = json.loads(analysis_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Stored job analysis {analysis_path} is unreadable: {e}")
+            return None
+
+        logger.info(
+            f"Job description matches stored analysis {entry['analysis_id']} "
+            f"(estimated similarity {similarity:.2f})"
+        )
+        return JobAnalysisMatch(
+            analysis_id=entry["analysis_id"],
+            similarity=round(similarity, 3),
+            resume_fingerprint=entry["resume_fingerprint"],
+            analysis=analysis,
+        )
+
+    def add(
+        self,
+        job_description: str,
+        analysis_json: str,
+        job_analysis_mode: str,
+        resume_text: str
+    ) -> Optional[str]:
+        """Store a job analysis, dropping the oldest beyond JOB_DEDUP_MAX_ENTRIES.
+
+        Args:
+            job_description: Analysed job description text.
+            analysis_json: Job analysis task output (JobRequirements JSON).
+            job_analysis_mode: Mode the analysis was made in.
+            resume_text: Resume the candidate was scored against.
+
+        Returns:
+            Identifier of the stored analysis, or None if the job description
+            has no words.
+        """
+        signature = minhash_signature(job_description)
+        if signature is None:
+            return None
+
+        analysis_id = uuid.uuid4().hex[:12]
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{analysis_id}.json").write_text(analysis_json, encoding="utf-8")
+        self.entries.append(JobAnalysisEntry(
+            analysis_id=analysis_id,
+            created_at=datetime.now().isoformat(timespec="seconds"),
+            job_analysis_mode=job_analysis_mode,
+            resume_fingerprint=fingerprint(resume_text),
+            signature=[int(value) for value in signature],
+        ))
+        self._signatures.append(signature)
+        self._add_to_buckets(len(self.entries) - 1, signature)
+
+        if len(self.entries) > JOB_DEDUP_MAX_ENTRIES:
+            self._drop_oldest(len(self.entries) - JOB_DEDUP_MAX_ENTRIES)
+        self._save()
+        logger.info(f"Stored job analysis {analysis_id} for reuse")
+        return analysis_id
+
+    def _drop_oldest(self, count: int) -> None:
+        for entry in self.entries[:count]:
+            (self.directory / f"{entry['analysis_id']}.json").unlink(missing_ok=True)
+        self.entries = self.entries[count:]
+        self._signatures = self._signatures[count:]
+        self._buckets = {}
+        for position, signature in enumerate(self._signatures):
+            self._add_to_buckets(position, signature)
+
+    def _save(self) -> None:
+        index_path = self.directory / JOB_ANALYSES_INDEX_FILENAME
+        tmp_path = index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.entries), encoding="utf-8")
+        tmp_path.replace(index_path)
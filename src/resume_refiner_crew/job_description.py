@@ -0,0 +1,190 @@
+"""Local cleanup of pasted job descriptions.
+
+Job descriptions copied from job boards carry equal opportunity statements,
+benefits lists, company histories and page chrome (cookie banners, "Apply
+now" buttons) that the job analyzer does not need. preprocess_job_description
+removes them with a keyword classifier before the job description is written
+to the knowledge folder:
+
+1. Whitespace is normalised and repeated paragraphs are dropped.
+2. A heading naming a boilerplate category ("Benefits", "About us", ...)
+   drops its whole section, up to the next heading, except the paragraphs
+   that contain requirement phrases.
+3. Other paragraphs, and long lines of prose inside kept paragraphs, are
+   dropped when they contain several phrases of a boilerplate category and
+   few requirement phrases; short lines of page chrome are dropped on a
+   single phrase.
+
+If the result is implausibly short, only the first step is applied.
+"""
+
+import logging
+import re
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple, TypedDict
+
+from .constants import (
+    JD_BOILERPLATE_HEADINGS,
+    JD_BOILERPLATE_MIN_HITS,
+    JD_BOILERPLATE_PHRASES,
+    JD_MIN_KEPT_RATIO,
+    JD_REQUIREMENT_PHRASES,
+    JD_WEB_JUNK_MAX_WORDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_INVISIBLE_RE = re.compile(r"[\u200b-\u200f\u2060\ufeff\u00ad]")
+_HEADING_WORDS = 8
+# Lines of at least this many words are classified on their own
+_PROSE_LINE_WORDS = 25
+_HEADING_MARKS = "#*_:-–— \t"
+
+
+class JobDescriptionStats(TypedDict):
+    """Effect of preprocessing on a job description."""
+
+    original_chars: int
+    reduced_chars: int
+    duplicate_paragraphs: int
+    removed_paragraphs: Dict[str, int]  # paragraphs and prose lines, by category
+
+
+def _phrase_pattern(phrases: Sequence[str], whole_words: bool = True) -> "re.Pattern[str]":
+    end = r"(?!\w)" if whole_words else ""
+    return re.compile(
+        "|".join(rf"(?<!\w){re.escape(phrase)}{end}" for phrase in phrases), re.IGNORECASE
+    )
+
+
+_CATEGORY_PATTERNS = {
+    category: _phrase_pattern(phrases) for category, phrases in JD_BOILERPLATE_PHRASES.items()
+}
+# Requirement phrases are word prefixes ("responsibilit" matches "responsibilities")
+_REQUIREMENT_PATTERN = _phrase_pattern(JD_REQUIREMENT_PHRASES, whole_words=False)
+
+
+def normalize_whitespace(text: str) -> str:
+    """Normalise unicode, spaces and blank lines."""
+    text = _INVISIBLE_RE.sub("", unicodedata.normalize("NFKC", text))
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in text.splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def _split_paragraphs(text: str) -> List[str]:
+    return [paragraph for paragraph in text.split("\n\n") if paragraph.strip()]
+
+
+def _hits(pattern: "re.Pattern[str]", text: str) -> int:
+    """Number of distinct phrases of a pattern found in a text."""
+    return len({match.lower() for match in pattern.findall(text)})
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    if len(stripped.split()) > _HEADING_WORDS or stripped.startswith(("-", "*", "•")):
+        return stripped.startswith("#")
+    if stripped.startswith("#") or stripped.endswith(":"):
+        return True
+    # An unpunctuated short line, alone or opening a block of lines
+    return stripped[-1:] not in ".!?;,"
+
+
+def _heading_category(line: str) -> Optional[str]:
+    heading = line.strip(_HEADING_MARKS).lower().replace("&", "and")
+    for category, headings in JD_BOILERPLATE_HEADINGS.items():
+        if any(heading == h or heading.startswith(h + " ") for h in headings):
+            return category
+    return None
+
+
+def classify_paragraph(paragraph: str) -> Optional[str]:
+    """Return the boilerplate category of a paragraph, or None to keep it."""
+    if len(paragraph.split()) <= JD_WEB_JUNK_MAX_WORDS and _hits(_CATEGORY_PATTERNS["web"], paragraph):
+        return "web"
+    if _hits(_REQUIREMENT_PATTERN, paragraph) >= JD_BOILERPLATE_MIN_HITS:
+        return None
+    hits = {category: _hits(pattern, paragraph) for category, pattern in _CATEGORY_PATTERNS.items()}
+    category, count = max(hits.items(), key=lambda item: item[1])
+    return category if count >= JD_BOILERPLATE_MIN_HITS else None
+
+
+def _classify_line(line: str) -> Optional[str]:
+    """Category of a line of a kept paragraph: page chrome, or boilerplate prose."""
+    category = classify_paragraph(line)
+    if category == "web" or len(line.split()) >= _PROSE_LINE_WORDS:
+        return category
+    return None
+
+
+def _remove_boilerplate(paragraphs: List[str]) -> Tuple[List[str], Dict[str, int]]:
+    kept: List[str] = []
+    removed: Dict[str, int] = {}
+    section: Optional[str] = None
+
+    for paragraph in paragraphs:
+        lines = paragraph.splitlines()
+        if _is_heading(lines[0]):
+            section = _heading_category(lines[0])
+
+        category = classify_paragraph(paragraph)
+        # A paragraph naming the job's requirements is not dropped for its section alone
+        if category is None and not _hits(_REQUIREMENT_PATTERN, paragraph):
+            category = section
+        if category is None:
+            kept_lines = []
+            for line in lines:
+                line_category = _classify_line(line)
+                if line_category is None:
+                    kept_lines.append(line)
+                else:
+                    removed[line_category] = removed.get(line_category, 0) + 1
+            if kept_lines:
+                kept.append("\n".join(kept_lines))
+            continue
+        removed[category] = removed.get(category, 0) + 1
+
+    return kept, removed
+
+
+def preprocess_job_description(text: str) -> Tuple[str, JobDescriptionStats]:
+    """Strip boilerplate from a job description.
+
+    Args:
+        text: Job description as pasted by the user.
+
+    Returns:
+        The cleaned job description and statistics of what was removed.
+    """
+    paragraphs: List[str] = []
+    seen = set()
+    duplicates = 0
+    for paragraph in _split_paragraphs(normalize_whitespace(text)):
+        key = re.sub(r"\W+", " ", paragraph.lower()).strip()
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        paragraphs.append(paragraph)
+
+    deduplicated = "\n\n".join(paragraphs)
+    kept, removed = _remove_boilerplate(paragraphs)
+    reduced = "\n\n".join(kept)
+    if len(reduced) < JD_MIN_KEPT_RATIO * len(deduplicated):
+        logger.warning(
+            "Boilerplate removal would keep too little of the job description; "
+            "only whitespace and duplicates were cleaned"
+        )
+        reduced, removed = deduplicated, {}
+
+    stats = JobDescriptionStats(
+        original_chars=len(text),
+        reduced_chars=len(reduced),
+        duplicate_paragraphs=duplicates,
+        removed_paragraphs=removed,
+    )
+    logger.info(
+        f"Job description preprocessed: {stats['original_chars']} -> {stats['reduced_chars']} chars "
+        f"({duplicates} duplicate paragraphs, removed: {removed or 'nothing'})"
+    )
+    return reduced, stats
@@ -0,0 +1,73 @@
+"""Knowledge sources of the agents: inlined in the prompt when small enough.
+
+A TextFileKnowledgeSource is chunked, embedded and stored in a vector store
+on every run, and the agent then receives the chunks a similarity search
+returns. The job description and the resume best practices easily fit in a
+prompt, so files up to KNOWLEDGE_INLINE_MAX_CHARS are sent verbatim in the
+task context instead: no embedding requests, no vector store, and the agent
+always sees the whole document. Larger files still go through the vector
+store.
+"""
+
+import logging
+import os
+from typing import List, Optional, Tuple
+
+from crewai.knowledge.source.base_knowledge_source import BaseKnowledgeSource
+from crewai.knowledge.source.text_file_knowledge_source import TextFileKnowledgeSource
+
+from .constants import KNOWLEDGE_DIR, KNOWLEDGE_INLINE_MAX_CHARS
+from .validation import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+
+def get_inline_max_chars() -> int:
+    """Read the inlining threshold from KNOWLEDGE_INLINE_MAX_CHARS.
+
+    Raises:
+        ConfigurationError: If the value is not a non-negative integer.
+    """
+    value = os.getenv("KNOWLEDGE_INLINE_MAX_CHARS", str(KNOWLEDGE_INLINE_MAX_CHARS))
+    try:
+        max_chars = int(value)
+    except ValueError:
+        max_chars = -1
+    if max_chars < 0:
+        raise ConfigurationError(
+            f"KNOWLEDGE_INLINE_MAX_CHARS must be a non-negative integer, got '{value}'"
+        )
+    return max_chars
+
+
+def load_knowledge(
+    file_path: str,
+    max_inline_chars: Optional[int] = None
+) -> Tuple[Optional[str], List[BaseKnowledgeSource]]:
+    """Load a knowledge file, inlined or as a vector store source.
+
+    Args:
+        file_path: Path relative to the knowledge folder, as for
+            TextFileKnowledgeSource.
+        max_inline_chars: Largest file inlined, in characters; defaults to
+            KNOWLEDGE_INLINE_MAX_CHARS. 0 sends every file to the vector store.
+
+    Returns:
+        (text, []) when the file is inlined, or (None, [knowledge source]).
+    """
+    if max_inline_chars is None:
+        max_inline_chars = get_inline_max_chars()
+
+    text = (KNOWLEDGE_DIR / file_path).read_text(encoding="utf-8").strip()
+
+    if len(text) <= max_inline_chars:
+        logger.info(f"Knowledge file {file_path} ({len(text)} chars) is sent in the prompt")
+        return text, []
+
+    logger.info(f"Knowledge file {file_path} ({len(text)} chars) is sent through the vector store")
+    return None, [TextFileKnowledgeSource(file_paths=[file_path])]
+
+
+def format_knowledge(title: str, text: Optional[str]) -> Optional[str]:
+    """Format an inlined knowledge file as a context block."""
+    return f"{title}:\n{text}" if text else None
@@ -0,0 +1,341 @@
+"""Hedged requests, model fallback and circuit breaking for LLM calls.
+
+A crew run is a chain of sequential LLM requests, so one stuck response holds
+up the whole run. Every OpenAI request of an agent goes through a
+ResilientCompletions proxy:
+
+- hedging: when no response has arrived after the agent's hedge delay, a
+  duplicate request is sent and the first response wins; the other one is
+  cancelled (a streamed response is closed, a pending request is dropped).
+  The hedge delay is the LLM_HEDGE_PERCENTILE latency of the agent's recent
+  requests on that model, capped by the agent's latency SLO
+  (LLM_LATENCY_SLO_SECONDS); until LLM_HEDGE_MIN_SAMPLES requests have been
+  measured it is the SLO itself. For streamed requests the latency is the
+  time to the start of the response. The percentile and the SLOs can be
+  overridden with the LLM_HEDGE_PERCENTILE and LLM_LATENCY_SLO_SECONDS
+  environment variables.
+- fallback: when a request times out or is rate limited, it is sent again on
+  the fallback model, if one is configured.
+- circuit breaker: after LLM_CIRCUIT_BREAKER_FAILURES consecutive timeouts or
+  rate-limit errors of a model, its requests go straight to the fallback
+  model for LLM_CIRCUIT_BREAKER_COOLDOWN_SECONDS; then one request probes
+  the model again.
+
+Latencies and breakers are process-wide; every run is a process of its own,
+so they are not shared between runs. Every request, hedged duplicates and
+fallbacks included, first takes its budget from the rate-limit scheduler,
+whose budgets are shared by every run on the machine (see rate_limiter); a
+hedged duplicate is only sent when budget is available at once.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from openai import APITimeoutError, RateLimitError
+
+from .constants import (
+    DEFAULT_REQUEST_PRIORITY,
+    LLM_CIRCUIT_BREAKER_COOLDOWN_SECONDS,
+    LLM_CIRCUIT_BREAKER_FAILURES,
+    LLM_DEFAULT_SLO_SECONDS,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_MIN_SECONDS,
+    LLM_HEDGE_PERCENTILE,
+    LLM_LATENCY_SLO_SECONDS,
+    LLM_LATENCY_WINDOW,
+    LLM_REQUEST_TIMEOUT_SECONDS,
+)
+from .rate_limiter import estimate_request_tokens, get_rate_limit_scheduler
+from .validation import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+# Errors that count against a model's circuit breaker and trigger the fallback
+FALLBACK_ERRORS = (APITimeoutError, RateLimitError)
+
+
+@dataclass(frozen=True)
+class RequestPolicy:
+    """How the requests of one agent are hedged, queued and where they fall back to."""
+
+    slo_seconds: float = LLM_DEFAULT_SLO_SECONDS
+    hedge_percentile: float = LLM_HEDGE_PERCENTILE
+    fallback_model: Optional[str] = None
+    hedging: bool = True
+    priority: str = DEFAULT_REQUEST_PRIORITY
+
+
+def request_policy(
+    agent_name: str,
+    fallback_model: Optional[str] = None,
+    hedging: bool = True,
+    priority: str = DEFAULT_REQUEST_PRIORITY
+) -> RequestPolicy:
+    """Request policy of an agent, with its latency SLO and hedge percentile.
+
+    Raises:
+        ConfigurationError: If LLM_HEDGE_PERCENTILE or LLM_LATENCY_SLO_SECONDS
+            is set to an invalid value.
+    """
+    return RequestPolicy(
+        slo_seconds=get_latency_slos().get(agent_name, LLM_DEFAULT_SLO_SECONDS),
+        hedge_percentile=get_hedge_percentile(),
+        fallback_model=fallback_model or None,
+        hedging=hedging,
+        priority=priority,
+    )
+
+
+def get_hedge_percentile() -> float:
+    """Return the latency percentile after which a request is hedged.
+
+    LLM_HEDGE_PERCENTILE, or the LLM_HEDGE_PERCENTILE environment variable.
+
+    Raises:
+        ConfigurationError: If the environment variable is not a number in
+            (0, 100].
+    """
+    env_percentile = os.getenv("LLM_HEDGE_PERCENTILE")
+    if not env_percentile:
+        return LLM_HEDGE_PERCENTILE
+    try:
+        percentile = float(env_percentile)
+    except ValueError as e:
+        raise ConfigurationError(f"LLM_HEDGE_PERCENTILE must be a number: {e}") from e
+    if not 0 < percentile <= 100:
+        raise ConfigurationError(f"LLM_HEDGE_PERCENTILE must be in (0, 100], got {percentile}")
+    return percentile
+
+
+def get_latency_slos() -> Dict[str, float]:
+    """Return the latency SLO in seconds per agent.
+
+    LLM_LATENCY_SLO_SECONDS updated with the LLM_LATENCY_SLO_SECONDS
+    environment variable.
+
+    Raises:
+        ConfigurationError: If the environment variable is not a JSON object
+            of positive seconds per agent.
+    """
+    slos = dict(LLM_LATENCY_SLO_SECONDS)
+    env_slos = os.getenv("LLM_LATENCY_SLO_SECONDS")
+    if env_slos:
+        try:
+            slos.update({agent: float(seconds) for agent, seconds in json.loads(env_slos).items()})
+        except (json.JSONDecodeError, TypeError, ValueError, AttributeError) as e:
+            raise ConfigurationError(
+                f"LLM_LATENCY_SLO_SECONDS must be a JSON object of seconds per agent: {e}"
+            ) from e
+    if any(seconds <= 0 for seconds in slos.values()):
+        raise ConfigurationError("LLM_LATENCY_SLO_SECONDS must be positive")
+    return slos
+
+
+class LatencyTracker:
+    """Recent request latencies per (agent, model, streamed)."""
+
+    def __init__(self, window: int = LLM_LATENCY_WINDOW) -> None:
+        self._window = window
+        self._samples: Dict[Tuple[str, str, bool], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: Tuple[str, str, bool], seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self._window)).append(seconds)
+
+    def hedge_delay(
+        self,
+        key: Tuple[str, str, bool],
+        slo_seconds: float,
+        percentile: float = LLM_HEDGE_PERCENTILE
+    ) -> float:
+        """Seconds to wait for a response before sending a hedged request."""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return slo_seconds
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return max(LLM_HEDGE_MIN_SECONDS, min(samples[index], slo_seconds))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker of a model."""
+
+    def __init__(
+        self,
+        failures: int = LLM_CIRCUIT_BREAKER_FAILURES,
+        cooldown_seconds: float = LLM_CIRCUIT_BREAKER_COOLDOWN_SECONDS
+    ) -> None:
+        self._max_failures = failures
+        self._cooldown_seconds = cooldown_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def allow(self) -> bool:
+        """Whether a request may be sent; after the cooldown, one probe is let through."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self._cooldown_seconds:
+                # Half-open: the probe's outcome closes or re-opens the breaker
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self._max_failures:
+                self._opened_at = time.monotonic()
+
+
+_latencies = LatencyTracker()
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(model: str) -> CircuitBreaker:
+    """Process-wide circuit breaker of a model."""
+    with _breakers_lock:
+        return _breakers.setdefault(model, CircuitBreaker())
+
+
+def _discard_response(future: Future) -> None:
+    """Close the response of a request that lost the race, when it arrives."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    close = getattr(future.result(), "close", None)
+    if callable(close):
+        close()
+
+
+class ResilientCompletions:
+    """Proxy of an OpenAI client that hedges, falls back and circuit-breaks requests.
+
+    Only chat.completions.create is intercepted; every other attribute is
+    read from the client.
+    """
+
+    def __init__(self, client: Any, agent_name: str, policy: RequestPolicy) -> None:
+        self._client = client
+        self._agent_name = agent_name
+        self._policy = policy
+        # With a fallback model, a timed out or rate limited request is sent to
+        # it at once instead of being retried on the same model
+        self._primary_client = client.with_options(
+            timeout=LLM_REQUEST_TIMEOUT_SECONDS,
+            max_retries=0 if policy.fallback_model else client.max_retries
+        )
+
+    @property
+    def chat(self) -> "ResilientCompletions":
+        return self
+
+    @property
+    def completions(self) -> "ResilientCompletions":
+        return self
+
+    def create(self, **params: Any) -> Any:
+        model = params["model"]
+        fallback_model = self._policy.fallback_model
+        if not fallback_model or fallback_model == model:
+            return self._hedged(self._primary_client, params)
+
+        breaker = get_circuit_breaker(model)
+        if not breaker.allow():
+            logger.info(f"{self._agent_name}: circuit of {model} is open, using {fallback_model}")
+            return self._hedged(self._client, {**params, "model": fallback_model})
+
+        try:
+            response = self._hedged(self._primary_client, params)
+        except FALLBACK_ERRORS as e:
+            breaker.record_failure()
+            logger.warning(
+                f"{self._agent_name}: {type(e).__name__} on {model}, retrying on {fallback_model}"
+                + (" (circuit opened)" if breaker.is_open else "")
+            )
+            return self._hedged(self._client, {**params, "model": fallback_model})
+        breaker.record_success()
+        return response
+
+    def _send(self, client: Any, params: Dict[str, Any], estimated_tokens: int) -> Any:
+        """Send a request whose rate budget is taken, and settle its token usage."""
+        scheduler = get_rate_limit_scheduler()
+        try:
+            response = client.chat.completions.create(**params)
+        except RateLimitError:
+            scheduler.rate_limited(client.api_key, params["model"])
+            raise
+        # Streamed responses report their usage at the end; their estimate stands
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            scheduler.settle(client.api_key, params["model"], estimated_tokens, usage.total_tokens)
+        return response
+
+    def _hedged(self, client: Any, params: Dict[str, Any]) -> Any:
+        """Send a request, and a duplicate if it is slower than the hedge delay."""
+        key = (self._agent_name, params["model"], bool(params.get("stream")))
+        scheduler = get_rate_limit_scheduler()
+        tokens = estimate_request_tokens(params)
+        scheduler.acquire(client.api_key, params["model"], tokens, self._policy.priority)
+        if not self._policy.hedging:
+            started = time.monotonic()
+            response = self._send(client, params, tokens)
+            _latencies.record(key, time.monotonic() - started)
+            return response
+
+        delay = _latencies.hedge_delay(key, self._policy.slo_seconds, self._policy.hedge_percentile)
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-hedge")
+        try:
+            started = time.monotonic()
+            pending = {executor.submit(self._send, client, params, tokens)}
+            done, _ = wait(pending, timeout=delay)
+            if not done:
+                if scheduler.try_acquire(client.api_key, params["model"], tokens):
+                    logger.info(
+                        f"{self._agent_name}: no response from {params['model']} after "
+                        f"{delay:.1f}s, sending a hedged request"
+                    )
+                    pending.add(executor.submit(self._send, client, params, tokens))
+                else:
+                    logger.info(
+                        f"{self._agent_name}: no response from {params['model']} after "
+                        f"{delay:.1f}s, and no rate budget for a hedged request"
+                    )
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                winner = next((future for future in done if future.exception() is None), None)
+                if winner is None:
+                    error = next(iter(done)).exception()
+                    continue
+                _latencies.record(key, time.monotonic() - started)
+                for other in (done | pending) - {winner}:
+                    other.cancel()
+                    other.add_done_callback(_discard_response)
+                return winner.result()
+            raise error
+        finally:
+            executor.shutdown(wait=False)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
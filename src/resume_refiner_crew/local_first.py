@@ -0,0 +1,102 @@
+"""Agents that try a deterministic local implementation before their LLM.
+
+Some tasks only restructure data the pipeline already produced. A
+LocalFirstAgent runs its local_handler first; when the handler returns a
+result, that result is the task output and no LLM request is made. When it
+returns None (or fails), the agent executes the task with its LLM as usual;
+a ConfigurationError of the handler is raised instead, since the LLM cannot
+make up for a broken installation.
+An optional context_handler can replace the context sent to the LLM (e.g.
+with only the part of the inputs the local pass could not settle), and an
+optional output_handler can turn the LLM result into the task output (e.g. to
+embed a short LLM-written paragraph in a locally rendered document). With a
+response_model, the LLM is asked for that schema instead of the task's
+output_pydantic, and the output_handler builds the task output from it. When
+the output_handler cannot use the answer (it raises ValueError), the LLM is
+asked again, up to output_retries times.
+
+The handler replaces Agent.execute_task, so everything around it (output
+files, output_pydantic conversion, guardrails, task callbacks, events) works
+the same for local and LLM results.
+"""
+
+import logging
+from typing import Any, Callable, Optional, Type
+
+from crewai import Agent, Task
+from pydantic import BaseModel, Field
+
+from .constants import LOCAL_FIRST_OUTPUT_RETRIES
+from .validation import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+
+class LocalFirstAgent(Agent):
+    """Agent that completes tasks locally when possible, falling back to its LLM."""
+
+    local_handler: Optional[Callable[[Task], Optional[str]]] = Field(
+        default=None,
+        exclude=True,
+        description="Returns the raw output of a task, or None to run the task on the LLM.",
+    )
+    context_handler: Optional[Callable[[Task, Optional[str]], Optional[str]]] = Field(
+        default=None,
+        exclude=True,
+        description="Builds the context sent to the LLM from the task context.",
+    )
+    output_handler: Optional[Callable[[Task, str], str]] = Field(
+        default=None,
+        exclude=True,
+        description="Builds the raw output of a task from the LLM result.",
+    )
+    response_model: Optional[Type[BaseModel]] = Field(
+        default=None,
+        exclude=True,
+        description="Output schema asked from the LLM instead of the task's output_pydantic.",
+    )
+    output_retries: int = Field(
+        default=LOCAL_FIRST_OUTPUT_RETRIES,
+        exclude=True,
+        description="Times the LLM is asked again when the output_handler cannot use its answer.",
+    )
+
+    def execute_task(self, task: Task, context: Optional[str] = None, tools: Any = None) -> Any:
+        """Execute a task locally, or with the LLM if the local handler gives up."""
+        if self.local_handler is not None:
+            try:
+                result = self.local_handler(task)
+            except ConfigurationError:
+                raise
+            except Exception as e:
+                logger.warning(f"Local execution of {task.name} failed, using the LLM: {e}")
+                result = None
+
+            if result is not None:
+                logger.info(f"{task.name} completed locally without an LLM request")
+                return result
+
+        if self.context_handler is not None:
+            context = self.context_handler(task, context)
+        for attempt in range(self.output_retries + 1):
+            result = self._execute_on_llm(task, context, tools)
+            if self.output_handler is None:
+                return result
+            try:
+                return self.output_handler(task, str(result))
+            except ValueError as e:
+                if attempt == self.output_retries:
+                    raise
+                logger.warning(f"Unusable LLM answer for {task.name}, asking again: {e}")
+
+    def _execute_on_llm(self, task: Task, context: Optional[str], tools: Any) -> Any:
+        if self.response_model is None:
+            return super().execute_task(task, context, tools)
+        # The task output format is only read to build the prompt here;
+        # the task converts the handled result with its own output_pydantic
+        output_pydantic = task.output_pydantic
+        task.output_pydantic = self.response_model
+        try:
+            return super().execute_task(task, context, tools)
+        finally:
+            task.output_pydantic = output_pydantic
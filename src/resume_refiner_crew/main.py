@@ -6,17 +6,45 @@ import logging
 import os
 import sys
 import warnings
-from typing import Dict
+from pathlib import Path
+from typing import Dict, Optional
 
+from pypdf import PdfReader
+
+from resume_refiner_crew.async_runner import load_batch_manifest, run_batch
+from resume_refiner_crew.ats_coverage import write_ats_coverage
+from resume_refiner_crew.checkpoint import (
+    find_parsed_resume,
+    fork_run,
+    load_manifest,
+    mark_run_status,
+    restore_run_outputs,
+    start_run,
+)
 from resume_refiner_crew.constants import (
+    ASYNC_MAX_CONCURRENCY,
+    BATCH_RESULTS_FILE,
+    COMPARE_MAX_PARALLEL,
     DEFAULT_TARGET_WORDS,
     DEFAULT_RESUME_PATH,
     DEFAULT_JOB_DESC_PATH,
     DEFAULT_RESUME_LANGUAGE,
+    DEFAULT_MODEL_PRESET,
+    DEFAULT_OPENAI_MODEL,
+    DEFAULT_PIPELINE_PROFILE,
+    DEFAULT_PRESCREEN_TOP_K,
+    KNOWLEDGE_DIR,
+    MODEL_COMPARISON_FILE,
+    MODEL_PRESETS,
+    PIPELINE_PROFILES,
+    PRESCREEN_FILE,
 )
 from resume_refiner_crew.crew import ResumeRefinerCrew
+from resume_refiner_crew.model_compare import compare_models, format_comparison, parse_model_list
+from resume_refiner_crew.prescreen import load_job_descriptions, rank_job_descriptions, save_shortlist
+from resume_refiner_crew.run_config import RunConfig
 from resume_refiner_crew.tools.latex_generator import generate_resume_pdf_from_json
-from resume_refiner_crew.utils import setup_clean_storage, simulate_crew_execution
+from resume_refiner_crew.utils import reset_crew_memories, setup_clean_storage, simulate_crew_execution
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -61,6 +89,21 @@ def parse_args() -> argparse.Namespace:
         default=os.getenv("DEFAULT_RESUME_LANGUAGE", str(DEFAULT_RESUME_LANGUAGE)),
         help="Target language for resume (e.g. 'English', 'Spanish', 'Auto')"
     )
+    parser.add_argument(
+        "--model-preset",
+        dest="model_preset",
+        choices=list(MODEL_PRESETS),
+        default=os.getenv("MODEL_PRESET", DEFAULT_MODEL_PRESET),
+        help="Model routing preset: which model each agent tier runs on"
+    )
+    parser.add_argument(
+        "--pipeline",
+        dest="pipeline_profile",
+        choices=list(PIPELINE_PROFILES),
+        default=os.getenv("PIPELINE_PROFILE", DEFAULT_PIPELINE_PROFILE),
+        help="Pipeline profile: 'fast' has the resume writer verify its own claims "
+             "instead of running a separate fact check"
+    )
     parser.add_argument(
         "--developer-mode",
         dest="developer_mode",
@@ -68,6 +111,66 @@ def parse_args() -> argparse.Namespace:
         default=os.getenv("DEVELOPER_MODE", "false").lower() == "true",
         help="Use fixture data instead of running API calls"
     )
+    parser.add_argument(
+        "--resume-run",
+        dest="resume_run",
+        default=None,
+        metavar="RUN_ID",
+        help="Resume a failed run from its last completed task (see .runs/)"
+    )
+    parser.add_argument(
+        "--rerun-from",
+        dest="rerun_from",
+        default=None,
+        metavar="RUN_ID",
+        help="Re-run a previous run with the given --target-words/--language, "
+             "executing only the tasks affected by the changed parameters"
+    )
+    parser.add_argument(
+        "--prescreen",
+        dest="prescreen",
+        default=None,
+        metavar="DIR",
+        help="Rank the .txt job descriptions of DIR against the resume locally, "
+             f"without running the crew, and write the shortlist to {PRESCREEN_FILE}"
+    )
+    parser.add_argument(
+        "--top-k",
+        dest="top_k",
+        type=int,
+        default=DEFAULT_PRESCREEN_TOP_K,
+        help="Number of job descriptions kept in the --prescreen shortlist"
+    )
+    parser.add_argument(
+        "--compare-models",
+        dest="compare_models",
+        default=None,
+        metavar="MODELS",
+        help="Run the crew on each of the comma-separated MODELS concurrently, each in "
+             f"its own workspace, and write the comparison to {MODEL_COMPARISON_FILE}"
+    )
+    parser.add_argument(
+        "--parallel",
+        dest="parallel",
+        type=int,
+        default=COMPARE_MAX_PARALLEL,
+        help="Maximum number of concurrent --compare-models runs"
+    )
+    parser.add_argument(
+        "--batch",
+        dest="batch",
+        default=None,
+        metavar="MANIFEST",
+        help="Run every resume and job description pair of the JSON MANIFEST from one "
+             f"event loop, each in its own workspace, and write the results to {BATCH_RESULTS_FILE}"
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        dest="max_concurrency",
+        type=int,
+        default=ASYNC_MAX_CONCURRENCY,
+        help="Maximum number of concurrent --batch runs"
+    )
     return parser.parse_args()
 
 
@@ -90,22 +193,137 @@ def run_developer_mode() -> None:
     logger.info("Simulation complete. Output files are ready.")
 
 
-def run_production_mode(inputs: Dict[str, str]) -> None:
+def run_production_mode(
+    inputs: Dict[str, str],
+    resume_run: Optional[str] = None,
+    model_preset: Optional[str] = None,
+    pipeline_profile: Optional[str] = None
+) -> None:
     """Run in production mode with actual API calls.
 
     Args:
         inputs: Dictionary containing crew execution inputs.
+        resume_run: Identifier of a previous run to resume. Its completed
+            tasks are restored from checkpoints and only the rest are executed.
+        model_preset: Model routing preset (see model_routing).
+        pipeline_profile: Pipeline profile ('standard' or 'fast').
     """
+    run_id = start_run(
+        inputs,
+        options={'model_preset': model_preset, 'pipeline_profile': pipeline_profile},
+        input_files=[
+            Path(inputs['RESUME_PDF_PATH']),
+            KNOWLEDGE_DIR / inputs['JOB_DESCRIPTION_PATH']
+        ],
+        resume_run=resume_run
+    )
     setup_clean_storage()
-    logger.info("Starting Resume Refiner Crew...")
+    if resume_run:
+        restore_run_outputs(run_id)
+
+    logger.info(f"Starting Resume Refiner Crew (run {run_id})...")
     crew = ResumeRefinerCrew(
         job_description_path=inputs['JOB_DESCRIPTION_PATH'],
-        resume_pdf_path=inputs['RESUME_PDF_PATH']
+        resume_pdf_path=inputs['RESUME_PDF_PATH'],
+        run_id=run_id,
+        run_config=RunConfig.from_env(
+            target_words=int(inputs['TARGET_RESUME_WORDS']),
+            model_preset=model_preset,
+            pipeline_profile=pipeline_profile
+        )
     ).crew()
-    crew.reset_memories(command_type='knowledge')
-    crew.reset_memories(command_type='all')
-    crew.reset_memories(command_type='agent_knowledge')
-    crew.kickoff(inputs=inputs)
+    reset_crew_memories(crew)
+
+    try:
+        if crew.tasks:
+            crew.kickoff(inputs=inputs)
+        else:
+            logger.info("All tasks already completed, nothing left to resume")
+    except Exception as e:
+        mark_run_status(run_id, 'failed', str(e))
+        logger.error(f"Run {run_id} failed; resume it with --resume-run {run_id}")
+        raise
+    mark_run_status(run_id, 'completed')
+
+
+def read_resume_text(resume_pdf_path: str) -> str:
+    """Return the resume text: the parsed resume of a run of this PDF, or the text of the PDF."""
+    parsed_resume = find_parsed_resume(Path(resume_pdf_path))
+    if parsed_resume is not None:
+        return parsed_resume
+    reader = PdfReader(resume_pdf_path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def run_prescreen(resume_pdf_path: str, job_descriptions_dir: str, top_k: int) -> None:
+    """Rank a directory of job descriptions against the resume, without LLM requests.
+
+    Args:
+        resume_pdf_path: Path of the resume PDF; the parsed resume of an earlier
+            run of the same PDF is used when there is one.
+        job_descriptions_dir: Directory of .txt job descriptions.
+        top_k: Number of best postings written to the shortlist.
+    """
+    job_descriptions = load_job_descriptions(Path(job_descriptions_dir))
+    shortlist = rank_job_descriptions(read_resume_text(resume_pdf_path), job_descriptions, top_k)
+    for posting in shortlist:
+        logger.info(
+            f"{posting['rank']:>3}. {posting['posting']}: score {posting['score']:.3f} "
+            f"(similarity {posting['similarity']:.3f}, "
+            f"keyword coverage {posting['keyword_coverage']:.0%})"
+        )
+    save_shortlist(shortlist, PRESCREEN_FILE)
+    logger.info(
+        f"Ranked {len(job_descriptions)} job descriptions; run the crew on the shortlisted "
+        "ones with --job-description"
+    )
+
+
+def run_compare(args: argparse.Namespace) -> None:
+    """Run the crew on every model of --compare-models and log the comparison.
+
+    Args:
+        args: Parsed command line arguments.
+    """
+    summaries = compare_models(
+        parse_model_list(args.compare_models),
+        resume_pdf_path=args.resume,
+        job_description_path=args.job_description,
+        target_words=args.target_words,
+        language=args.language,
+        model_preset=args.model_preset,
+        pipeline_profile=args.pipeline_profile,
+        max_parallel=args.parallel
+    )
+    logger.info(f"Model comparison (saved to {MODEL_COMPARISON_FILE}):\n{format_comparison(summaries)}")
+
+
+def run_batch_mode(args: argparse.Namespace) -> None:
+    """Run every entry of the --batch manifest and log the outcome of each run.
+
+    Args:
+        args: Parsed command line arguments; their values are the defaults
+            of the manifest's entries.
+    """
+    results = run_batch(
+        load_batch_manifest(args.batch),
+        defaults={
+            'api_key': os.getenv("OPENAI_API_KEY"),
+            'model': os.getenv("OPENAI_MODEL", DEFAULT_OPENAI_MODEL),
+            'target_words': args.target_words,
+            'language': args.language,
+            'model_preset': args.model_preset,
+            'pipeline_profile': args.pipeline_profile
+        },
+        max_concurrency=args.max_concurrency
+    )
+    for result in results:
+        outcome = result['pdf_path'] if result['success'] else f"failed: {result['error']}"
+        logger.info(f"Batch: {result['resume']} / {result['job_description']}: {outcome}")
+    logger.info(
+        f"Batch: {sum(result['success'] for result in results)}/{len(results)} runs "
+        f"succeeded (saved to {BATCH_RESULTS_FILE})"
+    )
 
 
 def generate_pdf() -> None:
@@ -121,8 +339,17 @@ def generate_pdf() -> None:
 
 def run() -> None:
     """Run the resume refiner crew."""
-    validate_environment()
     args = parse_args()
+    if args.prescreen:
+        run_prescreen(args.resume, args.prescreen, args.top_k)
+        return
+    validate_environment()
+    if args.compare_models:
+        run_compare(args)
+        return
+    if args.batch:
+        run_batch_mode(args)
+        return
 
     inputs = {
         'TARGET_RESUME_WORDS': str(args.target_words),
@@ -135,8 +362,31 @@ def run() -> None:
         if args.developer_mode:
             run_developer_mode()
         else:
-            run_production_mode(inputs)
+            resume_run = args.resume_run
+            if args.rerun_from:
+                # Keep the previous run's input files, apply the new parameters
+                resume_run = fork_run(
+                    args.rerun_from,
+                    inputs={
+                        'TARGET_RESUME_WORDS': inputs['TARGET_RESUME_WORDS'],
+                        'TARGET_LANGUAGE': inputs['TARGET_LANGUAGE']
+                    },
+                    options={
+                        'model_preset': args.model_preset,
+                        'pipeline_profile': args.pipeline_profile
+                    }
+                )
+            if resume_run:
+                # Resumed runs reuse the inputs they were started with
+                inputs = {**inputs, **load_manifest(resume_run)['inputs']}
+            run_production_mode(
+                inputs,
+                resume_run=resume_run,
+                model_preset=args.model_preset,
+                pipeline_profile=args.pipeline_profile
+            )
 
+        write_ats_coverage()
         generate_pdf()
 
     except KeyboardInterrupt:
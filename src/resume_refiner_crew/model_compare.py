@@ -0,0 +1,321 @@
+"""Compare mode: run the same resume and job description on several models.
+
+Each model runs the full crew in a separate process, in its own workspace
+under COMPARE_DIR (a copy of the knowledge and templates folders), so runs
+do not share outputs, checkpoints, stored job analyses or environment
+variables; they only share the rate-limit budget of their API key (see
+rate_limiter). Up to COMPARE_MAX_PARALLEL runs execute at once.
+
+When all runs are finished, every workspace is summarized from the files the
+run left behind:
+
+- per-task latency, tokens and cost from its stage metrics
+- match score from the job analysis
+- word count of the final resume and its ratio to the target
+- fact-check edits: lines of the optimized resume the fact check changed or
+  removed in the verified resume
+
+The summaries are written to MODEL_COMPARISON_FILE and rendered as tables.
+"""
+
+import difflib
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, TypedDict
+
+from .constants import (
+    COMPARE_DIR,
+    COMPARE_MAX_PARALLEL,
+    COMPARE_RUN_LOG_FILENAME,
+    JOB_ANALYSIS_FILE,
+    KNOWLEDGE_DIR,
+    MODEL_COMPARISON_FILE,
+    OPTIMIZED_RESUME_FILE,
+    STAGE_METRICS_FILE,
+    TEMPLATES_DIR,
+    VERIFIED_RESUME_FILE,
+    WORD_COUNT_TOLERANCE_MAX,
+    WORD_COUNT_TOLERANCE_MIN,
+)
+from .rate_limiter import get_rate_limit_store
+from .stage_metrics import StageMetrics, load_stage_metrics
+from .tools.word_counter_tool import count_words
+from .validation import InvalidInputError
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRunSummary(TypedDict):
+    """Measured outcome of one model's run."""
+
+    model: str
+    workspace: str
+    status: str
+    wall_seconds: float
+    stages: List[StageMetrics]
+    latency_seconds: float
+    prompt_tokens: int
+    completion_tokens: int
+    cost_usd: Optional[float]
+    match_score: Optional[float]
+    word_count: Optional[int]
+    word_count_ratio: Optional[float]
+    within_word_target: Optional[bool]
+    fact_check_edits: Optional[int]
+
+
+def parse_model_list(models: str) -> List[str]:
+    """Split a comma-separated model list, without duplicates.
+
+    Raises:
+        InvalidInputError: If fewer than two models are given.
+    """
+    names = list(dict.fromkeys(name.strip() for name in models.split(",") if name.strip()))
+    if len(names) < 2:
+        raise InvalidInputError("Compare mode needs at least two comma-separated models")
+    return names
+
+
+def workspace_name(model: str) -> str:
+    """Folder name of a model's workspace ('openai/gpt-4o' -> 'openai_gpt-4o')."""
+    return re.sub(r"[^\w.-]+", "_", model)
+
+
+def prepare_workspace(workspace: Path) -> None:
+    """Create a clean workspace with copies of the knowledge and templates folders."""
+    if workspace.exists():
+        shutil.rmtree(workspace)
+    workspace.mkdir(parents=True)
+    shutil.copytree(KNOWLEDGE_DIR, workspace / KNOWLEDGE_DIR)
+    shutil.copytree(TEMPLATES_DIR, workspace / TEMPLATES_DIR)
+
+
+def count_fact_check_edits(optimized_markdown: str, verified_markdown: str) -> int:
+    """Number of lines of the optimized resume changed or removed by the fact check."""
+    matcher = difflib.SequenceMatcher(
+        None, optimized_markdown.splitlines(), verified_markdown.splitlines(), autojunk=False
+    )
+    return sum(
+        i2 - i1
+        for tag, i1, i2, _, _ in matcher.get_opcodes()
+        if tag in ("replace", "delete")
+    )
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding='utf-8')
+    except OSError:
+        return None
+
+
+def _match_score(job_analysis_file: Path) -> Optional[float]:
+    try:
+        with open(job_analysis_file, 'r', encoding='utf-8') as f:
+            return json.load(f)["match_score"]["overall_match"]
+    except (OSError, json.JSONDecodeError, KeyError, TypeError):
+        return None
+
+
+def summarize_workspace(
+    model: str,
+    workspace: Path,
+    status: str,
+    wall_seconds: float,
+    target_words: int
+) -> ModelRunSummary:
+    """Summarize the outputs a run left in its workspace."""
+    stages = load_stage_metrics(workspace / STAGE_METRICS_FILE)
+    costs = [stage['cost_usd'] for stage in stages]
+
+    optimized = _read_text(workspace / OPTIMIZED_RESUME_FILE)
+    verified = _read_text(workspace / VERIFIED_RESUME_FILE)
+    final_resume = verified if verified is not None else optimized
+    word_count = count_words(final_resume) if final_resume is not None else None
+    word_count_ratio = round(word_count / target_words, 3) if word_count is not None else None
+
+    return ModelRunSummary(
+        model=model,
+        workspace=str(workspace),
+        status=status,
+        wall_seconds=round(wall_seconds, 2),
+        stages=stages,
+        latency_seconds=round(sum(stage['latency_seconds'] or 0.0 for stage in stages), 2),
+        prompt_tokens=sum(stage['prompt_tokens'] for stage in stages),
+        completion_tokens=sum(stage['completion_tokens'] for stage in stages),
+        cost_usd=sum(costs) if stages and None not in costs else None,
+        match_score=_match_score(workspace / JOB_ANALYSIS_FILE),
+        word_count=word_count,
+        word_count_ratio=word_count_ratio,
+        within_word_target=(
+            WORD_COUNT_TOLERANCE_MIN <= word_count_ratio <= WORD_COUNT_TOLERANCE_MAX
+            if word_count_ratio is not None else None
+        ),
+        fact_check_edits=(
+            count_fact_check_edits(optimized, verified)
+            if optimized is not None and verified is not None else None
+        ),
+    )
+
+
+def run_model(model: str, workspace: Path, crew_args: Sequence[str], target_words: int) -> ModelRunSummary:
+    """Run the crew on one model in its workspace and summarize the run.
+
+    Args:
+        model: Main model of the run (OPENAI_MODEL).
+        workspace: Prepared workspace; the run's output is logged to its
+            COMPARE_RUN_LOG_FILENAME.
+        crew_args: Command line arguments of the crew run.
+        target_words: Target word count of the run.
+    """
+    env = {
+        **os.environ,
+        "OPENAI_MODEL": model,
+        # Resolved here: a relative store path would point into the workspace
+        "LLM_RATE_LIMIT_STORE": str(get_rate_limit_store().resolve()),
+    }
+    logger.info(f"Compare: starting {model} in {workspace}")
+    started = time.monotonic()
+    with open(workspace / COMPARE_RUN_LOG_FILENAME, 'w', encoding='utf-8') as log:
+        process = subprocess.run(
+            [sys.executable, "-m", "resume_refiner_crew.main", *crew_args],
+            cwd=workspace,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    wall_seconds = time.monotonic() - started
+
+    status = "completed" if process.returncode == 0 else "failed"
+    if status == "failed":
+        logger.warning(
+            f"Compare: {model} failed (exit code {process.returncode}), "
+            f"see {workspace / COMPARE_RUN_LOG_FILENAME}"
+        )
+    else:
+        logger.info(f"Compare: {model} completed in {wall_seconds:.1f}s")
+    return summarize_workspace(model, workspace, status, wall_seconds, target_words)
+
+
+def compare_models(
+    models: Sequence[str],
+    resume_pdf_path: str,
+    job_description_path: str,
+    target_words: int,
+    language: str,
+    model_preset: Optional[str] = None,
+    pipeline_profile: Optional[str] = None,
+    max_parallel: int = COMPARE_MAX_PARALLEL,
+    compare_dir: Path = COMPARE_DIR,
+    output_file: Path = MODEL_COMPARISON_FILE
+) -> List[ModelRunSummary]:
+    """Run the crew on several models concurrently and compare the runs.
+
+    Args:
+        models: Main models to compare (OPENAI_MODEL of each run).
+        resume_pdf_path: Path of the resume PDF.
+        job_description_path: Job description file, relative to the knowledge folder.
+        target_words: Target word count of the resume.
+        language: Target language of the resume.
+        model_preset: Model routing preset of every run. Agents of the fast
+            tier keep the preset's model; use 'single' to run every agent on
+            the compared model.
+        pipeline_profile: Pipeline profile of every run.
+        max_parallel: Maximum number of concurrent runs.
+        compare_dir: Folder of the workspaces.
+        output_file: JSON file the summaries are written to.
+
+    Returns:
+        One summary per model, in the order of models.
+
+    Raises:
+        InvalidInputError: If the resume or the job description does not exist.
+    """
+    resume = Path(resume_pdf_path).resolve()
+    if not resume.is_file():
+        raise InvalidInputError(f"Resume not found: {resume_pdf_path}")
+    if not (KNOWLEDGE_DIR / job_description_path).is_file():
+        raise InvalidInputError(f"Job description not found: {KNOWLEDGE_DIR / job_description_path}")
+    crew_args = [
+        "--resume", str(resume),
+        "--job-description", job_description_path,
+        "--target-words", str(target_words),
+        "--language", language,
+    ]
+    if model_preset:
+        crew_args += ["--model-preset", model_preset]
+    if pipeline_profile:
+        crew_args += ["--pipeline", pipeline_profile]
+
+    workspaces = [compare_dir / workspace_name(model) for model in models]
+    for workspace in workspaces:
+        prepare_workspace(workspace)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(models)))) as executor:
+        summaries = list(executor.map(
+            lambda run: run_model(run[0], run[1], crew_args, target_words),
+            zip(models, workspaces)
+        ))
+
+    try:
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Failed to write the model comparison: {e}")
+    return summaries
+
+
+def _format_optional(value: Optional[float], template: str) -> str:
+    return template.format(value) if value is not None else "-"
+
+
+def format_comparison(summaries: Sequence[ModelRunSummary]) -> str:
+    """Render the summaries as markdown tables: one row per model, then per-task latency."""
+    lines = [
+        "| Model | Status | Latency | Tokens (in/out) | Cost | Match | Words (of target) | Fact-check edits |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    for summary in summaries:
+        lines.append(
+            f"| {summary['model']} | {summary['status']} "
+            f"| {summary['latency_seconds']:.1f}s "
+            f"| {summary['prompt_tokens']:,}/{summary['completion_tokens']:,} "
+            f"| {_format_optional(summary['cost_usd'], '${:.4f}')} "
+            f"| {_format_optional(summary['match_score'], '{:.0f}%')} "
+            f"| {_format_optional(summary['word_count'], '{}')} "
+            f"({_format_optional(summary['word_count_ratio'], '{:.0%}')}) "
+            f"| {_format_optional(summary['fact_check_edits'], '{}')} |"
+        )
+
+    stages: Dict[str, Dict[str, StageMetrics]] = {}
+    for summary in summaries:
+        for stage in summary['stages']:
+            stages.setdefault(stage['task'], {})[summary['model']] = stage
+    if stages:
+        models = [summary['model'] for summary in summaries]
+        lines += [
+            "",
+            "| Task | " + " | ".join(models) + " |",
+            "|---|" + "---|" * len(models),
+        ]
+        for task, by_model in stages.items():
+            cells = []
+            for model in models:
+                stage = by_model.get(model)
+                cells.append(
+                    f"{_format_optional(stage['latency_seconds'], '{:.1f}s')}, "
+                    f"{stage['prompt_tokens'] + stage['completion_tokens']:,} tok, "
+                    f"{_format_optional(stage['cost_usd'], '${:.4f}')}"
+                    if stage else "-"
+                )
+            lines.append(f"| {task} | " + " | ".join(cells) + " |")
+    return "\n".join(lines)
@@ -0,0 +1,85 @@
+"""Per-agent model routing.
+
+Mechanical stages (PDF parsing, JSON structuring) do not need the model used
+for analysis and writing. Every agent declares a model_tier in agents.yaml and
+the active preset maps tiers to models. The model of an agent is resolved as:
+
+1. <AGENT_NAME>_MODEL environment variable (e.g. RESUME_PARSER_MODEL)
+2. model key of the agent in agents.yaml
+3. <TIER>_MODEL environment variable (e.g. FAST_MODEL)
+4. model of the agent's tier in the active preset
+5. the main model (OPENAI_MODEL)
+
+The active preset is taken from the MODEL_PRESET environment variable.
+"""
+
+import os
+from typing import Any, Dict, Mapping, Optional
+
+from .constants import DEFAULT_MODEL_PRESET, DEFAULT_MODEL_TIER, MODEL_PRESETS
+from .validation import ConfigurationError
+
+
+def get_model_preset(preset: Optional[str] = None) -> str:
+    """Return the name of the active model preset.
+
+    Args:
+        preset: Preset name; defaults to MODEL_PRESET or DEFAULT_MODEL_PRESET.
+
+    Raises:
+        ConfigurationError: If the preset is unknown.
+    """
+    preset = preset or os.getenv("MODEL_PRESET", DEFAULT_MODEL_PRESET)
+    if preset not in MODEL_PRESETS:
+        raise ConfigurationError(
+            f"Unknown model preset '{preset}'. Available: {', '.join(MODEL_PRESETS)}"
+        )
+    return preset
+
+
+def resolve_agent_model(
+    agent_name: str,
+    agent_config: Mapping[str, Any],
+    main_model: str,
+    preset: Optional[str] = None
+) -> str:
+    """Resolve the model an agent should run on.
+
+    Args:
+        agent_name: Agent key in agents.yaml (e.g. 'resume_parser').
+        agent_config: Agent configuration from agents.yaml.
+        main_model: Model selected for the run (OPENAI_MODEL).
+        preset: Model preset name; defaults to the active preset.
+
+    Returns:
+        Model name for the agent.
+
+    Raises:
+        ConfigurationError: If the preset or the agent's tier is unknown.
+    """
+    agent_override = os.getenv(f"{agent_name.upper()}_MODEL") or agent_config.get("model")
+    if agent_override:
+        return agent_override
+
+    tier = agent_config.get("model_tier", DEFAULT_MODEL_TIER)
+    tier_models = MODEL_PRESETS[get_model_preset(preset)]
+    if tier not in tier_models:
+        raise ConfigurationError(f"Unknown model tier '{tier}' for agent {agent_name}")
+
+    return os.getenv(f"{tier.upper()}_MODEL") or tier_models[tier] or main_model
+
+
+def resolve_agent_models(
+    agents_config: Mapping[str, Mapping[str, Any]],
+    main_model: str,
+    preset: Optional[str] = None
+) -> Dict[str, str]:
+    """Resolve the model of every agent in agents.yaml.
+
+    Returns:
+        Mapping of agent name to model name.
+    """
+    return {
+        agent_name: resolve_agent_model(agent_name, agent_config, main_model, preset)
+        for agent_name, agent_config in agents_config.items()
+    }
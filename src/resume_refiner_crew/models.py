@@ -1,5 +1,8 @@
-from typing import List, Dict, Optional, Union, Any
-from pydantic import BaseModel, Field
+from typing import List, Dict, Literal, Optional, Union, Any
+from pydantic import BaseModel, Field, PrivateAttr, computed_field, field_validator, model_validator
+
+from .scoring import ASSESSED_FACTORS, compute_match_scores, get_scoring_factors
+from .skill_taxonomy import canonicalize_skills, get_skill_taxonomy
 
 # Type alias for sections that can contain mixed content (paragraphs and lists)
 # Each section is a list of "content blocks" where each block is either:
@@ -9,6 +12,10 @@ MixedContent = List[Union[str, List[str]]]
 
 class SkillScore(BaseModel):
     skill_name: str = Field(description="Name of the skill being scored")
+    category: Literal["technical", "soft"] = Field(
+        description="Whether this is a technical or a soft skill",
+        default="technical"
+    )
     required: bool = Field(description="Whether this skill is required or nice-to-have")
     match_level: float = Field(ge=0, le=1, description="How well the candidate's experience matches (0-1)")
     years_experience: Optional[float] = Field(description="Years of experience with this skill", default=None)
@@ -18,34 +25,33 @@ class SkillScore(BaseModel):
         default=0.5
     )
 
+    @field_validator("skill_name")
+    @classmethod
+    def _canonical_skill_name(cls, value: str) -> str:
+        return get_skill_taxonomy().canonical_skill(value)
+
 class JobMatchScore(BaseModel):
-    overall_match: float = Field(
-        ge=0, le=100,
-        description="Overall match percentage (0-100)"
-    )
-    technical_skills_match: float = Field(
-        ge=0, le=100,
-        description="Technical skills match percentage"
-    )
-    soft_skills_match: float = Field(
-        ge=0, le=100,
-        description="Soft skills match percentage"
-    )
-    experience_match: float = Field(
-        ge=0, le=100,
-        description="Experience level match percentage"
+    """Candidate fit scoring.
+
+    The job analyzer fills in the judgements (skill scores and raw category
+    assessments); the match percentages are computed locally by scoring.py and
+    are not part of the schema the LLM has to fill.
+    """
+    skill_details: List[SkillScore] = Field(
+        description="Detailed scoring for each technical and soft skill",
+        default_factory=list
     )
-    education_match: float = Field(
-        ge=0, le=100,
-        description="Education requirements match percentage"
+    experience_assessment: float = Field(
+        ge=0, le=1,
+        description="How well years, role similarity and project scope meet the experience requirements (0-1)"
     )
-    industry_match: float = Field(
-        ge=0, le=100,
-        description="Industry experience match percentage"
+    education_assessment: float = Field(
+        ge=0, le=1,
+        description="How well degree level, field of study and certifications meet the education requirements (0-1)"
     )
-    skill_details: List[SkillScore] = Field(
-        description="Detailed scoring for each skill",
-        default_factory=list
+    industry_assessment: float = Field(
+        ge=0, le=1,
+        description="How well domain expertise and years in similar industries meet the requirements (0-1)"
     )
     strengths: List[str] = Field(
         description="List of areas where candidate exceeds requirements",
@@ -55,16 +61,77 @@ class JobMatchScore(BaseModel):
         description="List of areas needing improvement",
         default_factory=list
     )
-    scoring_factors: Dict[str, float] = Field(
-        description="Weights used for different scoring components",
-        default_factory=lambda: {
-            "technical_skills": 0.35,
-            "soft_skills": 0.20,
-            "experience": 0.25,
-            "education": 0.10,
-            "industry": 0.10
-        }
-    )
+
+    _scoring_factors: Dict[str, float] = PrivateAttr(default_factory=dict)
+    _scores: Dict[str, Optional[float]] = PrivateAttr(default_factory=dict)
+
+    @model_validator(mode='before')
+    @classmethod
+    def _migrate_match_percentages(cls, data: Any) -> Any:
+        """Read scores written before the assessments were introduced.
+
+        Checkpoints, stored job analyses and fixtures of that shape carry
+        experience_match, education_match and industry_match instead of the
+        0-1 assessments; values up to 1 are taken as fractions, larger ones
+        as percentages.
+        """
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        for factor in ASSESSED_FACTORS:
+            match = data.get(f"{factor}_match")
+            if f"{factor}_assessment" not in data and isinstance(match, (int, float)):
+                data[f"{factor}_assessment"] = match / 100 if match > 1 else match
+        return data
+
+    @model_validator(mode='after')
+    def _compute_scores(self) -> 'JobMatchScore':
+        self._scoring_factors = get_scoring_factors()
+        self._scores = compute_match_scores(
+            self.skill_details,
+            {
+                "experience": self.experience_assessment,
+                "education": self.education_assessment,
+                "industry": self.industry_assessment,
+            },
+            self._scoring_factors
+        )
+        return self
+
+    @computed_field(description="Overall match percentage (0-100)")
+    @property
+    def overall_match(self) -> float:
+        return self._scores["overall_match"]
+
+    @computed_field(description="Technical skills match percentage (None without technical skills)")
+    @property
+    def technical_skills_match(self) -> Optional[float]:
+        return self._scores["technical_skills_match"]
+
+    @computed_field(description="Soft skills match percentage (None without soft skills)")
+    @property
+    def soft_skills_match(self) -> Optional[float]:
+        return self._scores["soft_skills_match"]
+
+    @computed_field(description="Experience level match percentage")
+    @property
+    def experience_match(self) -> float:
+        return self._scores["experience_match"]
+
+    @computed_field(description="Education requirements match percentage")
+    @property
+    def education_match(self) -> float:
+        return self._scores["education_match"]
+
+    @computed_field(description="Industry experience match percentage")
+    @property
+    def industry_match(self) -> float:
+        return self._scores["industry_match"]
+
+    @computed_field(description="Weights used for different scoring components")
+    @property
+    def scoring_factors(self) -> Dict[str, float]:
+        return self._scoring_factors
 
 class JobRequirements(BaseModel):
     technical_skills: List[str] = Field(
@@ -199,6 +266,44 @@ class JobRequirements(BaseModel):
         default="English"
     )
 
+    @field_validator("technical_skills", "soft_skills", "nice_to_have", "tools_and_technologies")
+    @classmethod
+    def _canonical_skills(cls, value: List[str]) -> List[str]:
+        return canonicalize_skills(value)
+
+class JobRequirementsLite(BaseModel):
+    """Compact job analysis with only the fields used downstream.
+
+    Used instead of JobRequirements when JOB_ANALYSIS_MODE is 'compact': a
+    smaller schema in the prompt and a shorter completion. Keeps every field
+    the optimizer reads (see CONTEXT_FIELDS) and the ATS coverage check uses.
+    """
+    job_title: str = Field(
+        description="Core role name, 2-3 words, no seniority/team/location (e.g. 'Data Scientist')",
+        default=""
+    )
+    language: str = Field(
+        description="Language of the job description (e.g. 'English', 'Spanish')",
+        default="English"
+    )
+    technical_skills: List[str] = Field(description="Required technical skills", default_factory=list)
+    soft_skills: List[str] = Field(description="Required soft skills", default_factory=list)
+    nice_to_have: List[str] = Field(description="Preferred, not required skills", default_factory=list)
+    experience_requirements: List[str] = Field(description="Experience requirements", default_factory=list)
+    key_responsibilities: List[str] = Field(description="Key job responsibilities", default_factory=list)
+    education_requirements: List[str] = Field(description="Education requirements", default_factory=list)
+    tools_and_technologies: List[str] = Field(
+        description="Specific tools, software or technologies", default_factory=list
+    )
+    industry_knowledge: List[str] = Field(description="Required industry-specific knowledge", default_factory=list)
+    certifications_required: List[str] = Field(description="Required certifications or licenses", default_factory=list)
+    match_score: JobMatchScore = Field(description="Candidate fit scoring")
+
+    @field_validator("technical_skills", "soft_skills", "nice_to_have", "tools_and_technologies")
+    @classmethod
+    def _canonical_skills(cls, value: List[str]) -> List[str]:
+        return canonicalize_skills(value)
+
 class ResumeOptimization(BaseModel):
     content_suggestions: List[Dict[str, Any]] = Field(
         description="List of content optimization suggestions with 'before' and 'after' examples"
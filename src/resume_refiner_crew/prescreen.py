@@ -0,0 +1,174 @@
+"""Local pre-screen that ranks many job descriptions against one resume.
+
+A crew run costs minutes and several LLM requests per job description. To
+triage a batch of postings, rank_job_descriptions scores all of them against
+the resume at once, without any LLM request, so the crew only runs on the
+best matches:
+
+- every document (the resume and each job description) becomes a vector of
+  BM25-weighted term frequencies over words and word pairs
+- similarity is the cosine between the resume vector and each posting vector
+- keyword coverage is the weighted share of each posting's top
+  PRESCREEN_KEYWORDS terms that appear in the resume
+
+The score blends both with PRESCREEN_SIMILARITY_WEIGHT. All postings are
+scored with a few matrix operations (dense NumPy arrays: a batch of postings
+has a vocabulary of a few thousand terms).
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple, TypedDict
+
+import numpy as np
+
+from .constants import (
+    PRESCREEN_BM25_B,
+    PRESCREEN_BM25_K1,
+    PRESCREEN_KEYWORDS,
+    PRESCREEN_SIMILARITY_WEIGHT,
+)
+from .fact_check import STOPWORDS
+from .validation import InvalidInputError
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[^\W\d_][\w+#.]*[\w+#]|[^\W\d_]", re.UNICODE)
+
+
+class PostingScore(TypedDict):
+    """Pre-screen result of a job description."""
+
+    rank: int
+    posting: str
+    score: float
+    similarity: float
+    keyword_coverage: float
+    matched_keywords: List[str]
+    missing_keywords: List[str]
+
+
+def extract_terms(text: str) -> List[str]:
+    """Words and adjacent word pairs of a text, lowercased, without stopwords."""
+    terms: List[str] = []
+    for line in text.lower().splitlines():
+        words = [w for w in _TOKEN_RE.findall(line) if len(w) > 1 and w not in STOPWORDS]
+        terms.extend(words)
+        terms.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return terms
+
+
+def _term_counts(documents: List[List[str]]) -> Tuple[np.ndarray, List[str]]:
+    """Document x term count matrix of tokenized documents, and its vocabulary."""
+    vocabulary: Dict[str, int] = {}
+    rows: List[int] = []
+    columns: List[int] = []
+    for row, terms in enumerate(documents):
+        for term in terms:
+            rows.append(row)
+            columns.append(vocabulary.setdefault(term, len(vocabulary)))
+
+    counts = np.zeros((len(documents), len(vocabulary)), dtype=np.float32)
+    np.add.at(counts, (np.array(rows, dtype=int), np.array(columns, dtype=int)), 1)
+    return counts, list(vocabulary)
+
+
+def bm25_weights(counts: np.ndarray, corpus_rows: slice = slice(None)) -> np.ndarray:
+    """BM25 term weights of every document of a count matrix.
+
+    Args:
+        counts: Document x term count matrix.
+        corpus_rows: Documents the term rarity (IDF) is computed over.
+    """
+    document_lengths = counts.sum(axis=1, keepdims=True)
+    average_length = max(float(document_lengths.mean()), 1.0)
+    document_frequency = (counts[corpus_rows] > 0).sum(axis=0)
+    n_documents = counts[corpus_rows].shape[0]
+
+    idf = np.log(1 + (n_documents - document_frequency + 0.5) / (document_frequency + 0.5))
+    saturation = counts * (PRESCREEN_BM25_K1 + 1) / (
+        counts + PRESCREEN_BM25_K1 * (1 - PRESCREEN_BM25_B + PRESCREEN_BM25_B * document_lengths / average_length)
+    )
+    return saturation * idf
+
+
+def rank_job_descriptions(
+    resume_text: str,
+    job_descriptions: Mapping[str, str],
+    top_k: Optional[int] = None
+) -> List[PostingScore]:
+    """Rank job descriptions by how well a resume matches them.
+
+    Args:
+        resume_text: Resume as plain text or markdown.
+        job_descriptions: Job description text by posting name.
+        top_k: Number of best postings returned; None returns all.
+
+    Returns:
+        PostingScore of the postings, best first.
+
+    Raises:
+        InvalidInputError: If the resume or every job description is empty.
+    """
+    names = list(job_descriptions)
+    documents = [extract_terms(resume_text)] + [extract_terms(job_descriptions[n]) for n in names]
+    if not documents[0] or not any(documents[1:]):
+        raise InvalidInputError("The resume and at least one job description must contain text")
+
+    counts, vocabulary = _term_counts(documents)
+    # Term rarity is measured over the postings: a term shared by the resume
+    # and a posting must not lose weight for it
+    weights = bm25_weights(counts, corpus_rows=slice(1, None))
+    resume, postings = weights[0], weights[1:]
+
+    norms = np.linalg.norm(postings, axis=1) * np.linalg.norm(resume)
+    similarity = np.divide(postings @ resume, norms, out=np.zeros(len(names)), where=norms > 0)
+
+    # Top keywords of every posting, and the weighted share found in the resume
+    n_keywords = min(PRESCREEN_KEYWORDS, weights.shape[1])
+    top_terms = np.argsort(-postings, axis=1)[:, :n_keywords]
+    top_weights = np.take_along_axis(postings, top_terms, axis=1)
+    in_resume = counts[0][top_terms] > 0
+    total = top_weights.sum(axis=1)
+    coverage = np.divide((top_weights * in_resume).sum(axis=1), total, out=np.zeros(len(names)), where=total > 0)
+
+    scores = PRESCREEN_SIMILARITY_WEIGHT * similarity + (1 - PRESCREEN_SIMILARITY_WEIGHT) * coverage
+    order = np.argsort(-scores, kind="stable")[:top_k]
+
+    return [
+        PostingScore(
+            rank=rank,
+            posting=names[i],
+            score=round(float(scores[i]), 4),
+            similarity=round(float(similarity[i]), 4),
+            keyword_coverage=round(float(coverage[i]), 4),
+            matched_keywords=[
+                vocabulary[t] for t, found, w in zip(top_terms[i], in_resume[i], top_weights[i]) if found and w > 0
+            ],
+            missing_keywords=[
+                vocabulary[t] for t, found, w in zip(top_terms[i], in_resume[i], top_weights[i]) if not found and w > 0
+            ],
+        )
+        for rank, i in enumerate(order, start=1)
+    ]
+
+
+def load_job_descriptions(directory: Path) -> Dict[str, str]:
+    """Read every .txt job description of a directory, by file name.
+
+    Raises:
+        InvalidInputError: If the directory has no .txt files.
+    """
+    files = sorted(Path(directory).glob("*.txt"))
+    if not files:
+        raise InvalidInputError(f"No .txt job descriptions found in {directory}")
+    return {path.name: path.read_text(encoding="utf-8") for path in files}
+
+
+def save_shortlist(shortlist: List[PostingScore], path: Path) -> None:
+    """Write a ranked shortlist as JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(shortlist, indent=2, ensure_ascii=False), encoding="utf-8")
+    logger.info(f"Pre-screen shortlist of {len(shortlist)} postings written to {path}")
@@ -0,0 +1,213 @@
+"""Prompt layout and usage tracking for provider-side prompt caching.
+
+OpenAI caches prompt prefixes automatically: a request is billed at the cached
+rate for the longest prefix it shares with a recent request. CrewAI builds
+each prompt as agent backstory, task description, expected output and output
+schema, followed by the context of previous tasks. To keep everything up to
+the context byte-identical across runs:
+
+- task descriptions in tasks.yaml contain no run inputs; inputs such as
+  {TARGET_RESUME_WORDS} live in a separate run_parameters block, which
+  StablePrefixTask sends at the start of the context, after the static prompt
+- inlined knowledge files (see knowledge.py) are sent in the context too,
+  before the run parameters
+- the outputs of upstream tasks are assembled by context_assembly, which
+  compacts them to the fields the task needs
+- every agent sends a stable prompt_cache_key, so its requests are routed to
+  the same cache
+
+The native OpenAI client in CrewAI does not record cached tokens, and records
+no usage at all for streamed completions. CacheAwareOpenAICompletion fills in
+both, so the per-stage metrics report the cache hit rate of every task. Its
+requests are hedged and fall back per the agent's RequestPolicy (see
+llm_resilience).
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from crewai import LLM, Task
+from crewai.llms.base_llm import BaseLLM
+from crewai.llms.providers.openai.completion import OpenAICompletion
+from crewai.utilities.formatter import aggregate_raw_outputs_from_tasks
+from crewai.utilities.string_utils import interpolate_only
+from pydantic import Field, PrivateAttr
+
+from .context_assembly import assemble_context, log_prompt_size
+from .llm_resilience import RequestPolicy, ResilientCompletions
+
+logger = logging.getLogger(__name__)
+
+PROMPT_CACHE_KEY_PREFIX = "resume-refiner"
+
+
+class StablePrefixTask(Task):
+    """Task that sends its run inputs after all static prompt content."""
+
+    run_parameters: Optional[str] = Field(
+        default=None,
+        description="Template of the run inputs, sent at the start of the task context.",
+    )
+    inline_knowledge: List[str] = Field(
+        default_factory=list,
+        description="Knowledge files sent verbatim at the start of the task context.",
+    )
+    context_fields: Dict[str, List[str]] = Field(
+        default_factory=dict,
+        description="Fields kept from the JSON output of each context task, by task name.",
+    )
+    _original_run_parameters: Optional[str] = PrivateAttr(default=None)
+
+    def interpolate_inputs_and_add_conversation_history(self, inputs: Dict[str, Any]) -> None:
+        """Interpolate inputs into the task, including its run parameters."""
+        super().interpolate_inputs_and_add_conversation_history(inputs)
+        if self.run_parameters is None:
+            return
+        if self._original_run_parameters is None:
+            self._original_run_parameters = self.run_parameters
+        self.run_parameters = interpolate_only(self._original_run_parameters, inputs)
+
+    def _with_run_parameters(self, context: Optional[str]) -> Optional[str]:
+        blocks = list(self.inline_knowledge)
+        if self.run_parameters:
+            blocks.append(f"Run parameters:\n{self.run_parameters.strip()}")
+        if context:
+            blocks.append(context)
+        return "\n\n".join(blocks) if blocks else context
+
+    def _build_context(self, context: Optional[str]) -> Optional[str]:
+        """Assemble the context of the context tasks, and prepend the run inputs.
+
+        A context other than the one the crew aggregates from self.context
+        (e.g. passed explicitly) is kept as is.
+        """
+        assembled = context
+        if isinstance(self.context, list) and context == aggregate_raw_outputs_from_tasks(self.context):
+            assembled = assemble_context(self.context, self.context_fields)
+
+        full_context = self._with_run_parameters(assembled) or ""
+        log_prompt_size(
+            self.name or self.description[:40],
+            self.prompt(),
+            full_context,
+            len(context or "") - len(assembled or "")
+        )
+        return full_context or context
+
+    def execute_sync(self, agent=None, context=None, tools=None):
+        """Execute the task with its assembled context, after the run parameters."""
+        return super().execute_sync(agent, self._build_context(context), tools)
+
+    def execute_async(self, agent=None, context=None, tools=None):
+        """Execute the task asynchronously with its assembled context, after the run parameters."""
+        return super().execute_async(agent, self._build_context(context), tools)
+
+
+class _StreamUsageClient:
+    """Proxy of an OpenAI client that reports the usage chunk of streamed completions."""
+
+    def __init__(self, client: Any, on_usage: Callable[[Any], None]) -> None:
+        self._client = client
+        self._on_usage = on_usage
+
+    @property
+    def chat(self) -> "_StreamUsageClient":
+        return self
+
+    @property
+    def completions(self) -> "_StreamUsageClient":
+        return self
+
+    def create(self, **params: Any) -> Any:
+        response = self._client.chat.completions.create(**params)
+        return self._iter_stream(response) if params.get("stream") else response
+
+    def _iter_stream(self, stream: Iterator[Any]) -> Iterator[Any]:
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                self._on_usage(chunk.usage)
+            yield chunk
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+class CacheAwareOpenAICompletion(OpenAICompletion):
+    """OpenAI completion that records cached prompt tokens, also when streaming."""
+
+    def __init__(
+        self,
+        *args: Any,
+        request_key: str = "",
+        policy: Optional[RequestPolicy] = None,
+        **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        client = self.client
+        if policy is not None:
+            client = ResilientCompletions(client, request_key or self.model, policy)
+        self.client = _StreamUsageClient(client, self._track_stream_usage)
+
+    @staticmethod
+    def _usage_to_dict(usage: Any) -> Dict[str, Any]:
+        details = getattr(usage, "prompt_tokens_details", None)
+        return {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+            "cached_tokens": (getattr(details, "cached_tokens", 0) or 0) if details else 0,
+        }
+
+    def _extract_openai_token_usage(self, response: Any) -> Dict[str, Any]:
+        """Extract token usage, including cached prompt tokens."""
+        if getattr(response, "usage", None):
+            return self._usage_to_dict(response.usage)
+        return {"total_tokens": 0}
+
+    def _track_stream_usage(self, usage: Any) -> None:
+        self._track_token_usage_internal(self._usage_to_dict(usage))
+
+    def _prepare_completion_params(self, messages: Any, tools: Any = None) -> Dict[str, Any]:
+        """Ask for a usage chunk at the end of streamed completions."""
+        params = super()._prepare_completion_params(messages, tools)
+        if params.get("stream"):
+            params["stream_options"] = {"include_usage": True}
+        return params
+
+
+def create_llm(
+    model: str,
+    cache_key: Optional[str] = None,
+    policy: Optional[RequestPolicy] = None,
+    api_key: Optional[str] = None,
+    **kwargs: Any
+) -> BaseLLM:
+    """Create an LLM that records cached prompt tokens.
+
+    OpenAI models get a CacheAwareOpenAICompletion with a prompt_cache_key;
+    other providers fall back to CrewAI's LLM factory (without hedging or
+    fallback).
+
+    Args:
+        model: Model name, optionally prefixed with its provider ('openai/gpt-4o').
+        cache_key: Stable key that groups requests sharing a prompt prefix;
+            also the key of the requests' latency history.
+        policy: Hedging and fallback of the requests (see llm_resilience).
+        api_key: OpenAI API key of the requests; OPENAI_API_KEY is used
+            when omitted (and by other providers' own variables).
+        **kwargs: Extra LLM parameters (e.g. stream).
+
+    Returns:
+        The LLM instance.
+    """
+    provider, _, model_name = model.rpartition("/")
+    if provider not in ("", "openai"):
+        return LLM(model=model, **kwargs)
+
+    if api_key:
+        kwargs["api_key"] = api_key
+    if cache_key:
+        kwargs["prompt_cache_key"] = f"{PROMPT_CACHE_KEY_PREFIX}-{cache_key}"
+    return CacheAwareOpenAICompletion(
+        model=model_name, provider="openai", request_key=cache_key or "", policy=policy, **kwargs
+    )
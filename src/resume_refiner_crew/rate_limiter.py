@@ -0,0 +1,429 @@
+"""Machine-wide rate-limit scheduler for LLM requests.
+
+Crew runs that share an API key (several web sessions, a batch of runs, a
+model comparison) share the provider's rate limits, and every run executes
+in a process of its own. Rather than letting every run discover the limits
+through 429 errors and retries, each LLM request first takes one request and
+its estimated tokens from a pair of token buckets per (API key, model),
+sized by the requests-per-minute and tokens-per-minute budgets in
+LLM_RATE_LIMITS (or LLM_DEFAULT_RATE_LIMIT):
+
+- the buckets and queues are kept in a SQLite file (LLM_RATE_LIMIT_STORE)
+  that every process opens, so all runs on one key draw from one budget
+- requests wait in a priority queue per bucket pair: interactive requests
+  (the web interface) go before batch requests, then first come first served,
+  whichever process they come from
+- the token estimate of a request is settled against its actual usage once
+  the response arrives
+- a 429 from the provider empties the buckets of that key and model, so the
+  queued requests back off together
+
+Every change is one IMMEDIATE transaction, which SQLite serializes across
+processes. A queued request polls the store until it is first in its queue
+and its budget is available; a queued request that stops polling for
+LLM_RATE_LIMIT_STALE_SECONDS belongs to a process that died, and is dropped.
+
+The budgets can be overridden with the LLM_RATE_LIMITS environment variable
+(JSON object of model to [requests per minute, tokens per minute]).
+queue_metrics reports the queue depth and waiting time of every bucket pair.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, TypedDict
+
+from .constants import (
+    LLM_CHARS_PER_TOKEN,
+    LLM_COMPLETION_TOKENS_ESTIMATE,
+    LLM_DEFAULT_RATE_LIMIT,
+    LLM_RATE_LIMIT_POLL_SECONDS,
+    LLM_RATE_LIMIT_STALE_SECONDS,
+    LLM_RATE_LIMIT_STORE,
+    LLM_RATE_LIMITS,
+    REQUEST_PRIORITIES,
+)
+from .validation import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+BucketKey = Tuple[str, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    requests REAL NOT NULL,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    sent INTEGER NOT NULL DEFAULT 0,
+    waited INTEGER NOT NULL DEFAULT 0,
+    wait_seconds REAL NOT NULL DEFAULT 0,
+    rate_limited INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (key_id, model)
+);
+CREATE TABLE IF NOT EXISTS queue (
+    ticket INTEGER PRIMARY KEY AUTOINCREMENT,
+    key_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    seen REAL NOT NULL
+);
+"""
+
+
+class QueueMetrics(TypedDict):
+    """Queue depth and budget of the requests of one API key and model."""
+
+    api_key: str
+    model: str
+    queued: Dict[str, int]
+    requests_available: float
+    tokens_available: float
+    requests_sent: int
+    requests_waited: int
+    wait_seconds: float
+    rate_limited: int
+
+
+class TokenBucket:
+    """Token bucket refilled continuously up to its capacity.
+
+    The level is kept with the (wall clock) time it was computed at, so a
+    bucket can be loaded from the store, used and saved by any process.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        per_minute: float,
+        level: Optional[float] = None,
+        updated: Optional[float] = None
+    ) -> None:
+        self.capacity = capacity
+        self._refill_per_second = per_minute / 60
+        self._level = capacity if level is None else level
+        self.updated = time.time() if updated is None else updated
+
+    @property
+    def level(self) -> float:
+        now = time.time()
+        elapsed = max(0.0, now - self.updated)
+        self._level = min(self.capacity, self._level + elapsed * self._refill_per_second)
+        self.updated = max(now, self.updated)
+        return self._level
+
+    def seconds_until(self, amount: float) -> float:
+        """Seconds until the bucket holds amount (0 if it already does)."""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self._refill_per_second)
+
+    def take(self, amount: float) -> None:
+        """Take amount from the bucket; the level may go negative (a debt)."""
+        self._level = self.level - amount
+
+    def empty(self) -> None:
+        self._level = min(self.level, 0.0)
+
+
+def get_rate_limit_store() -> Path:
+    """Path of the SQLite store shared by every process (LLM_RATE_LIMIT_STORE)."""
+    return Path(os.getenv("LLM_RATE_LIMIT_STORE") or LLM_RATE_LIMIT_STORE)
+
+
+def get_rate_limits() -> Dict[str, Tuple[int, int]]:
+    """Return the (requests, tokens) per minute budgets per model.
+
+    LLM_RATE_LIMITS updated with the LLM_RATE_LIMITS environment variable.
+
+    Raises:
+        ConfigurationError: If the environment variable is not a JSON object
+            of positive [requests, tokens] pairs.
+    """
+    limits = dict(LLM_RATE_LIMITS)
+    env_limits = os.getenv("LLM_RATE_LIMITS")
+    if env_limits:
+        try:
+            limits.update({
+                model: (int(requests), int(tokens))
+                for model, (requests, tokens) in json.loads(env_limits).items()
+            })
+        except (json.JSONDecodeError, TypeError, ValueError, AttributeError) as e:
+            raise ConfigurationError(
+                f"LLM_RATE_LIMITS must be a JSON object of [requests, tokens] per minute: {e}"
+            ) from e
+    if any(requests <= 0 or tokens <= 0 for requests, tokens in limits.values()):
+        raise ConfigurationError("LLM_RATE_LIMITS budgets must be positive")
+    return limits
+
+
+def estimate_request_tokens(params: Mapping[str, Any]) -> int:
+    """Estimate the tokens of a chat completion request (prompt and completion)."""
+    prompt_chars = sum(
+        len(message.get("content") or "") if isinstance(message.get("content"), str)
+        else len(json.dumps(message.get("content")))
+        for message in params.get("messages") or []
+    )
+    completion_tokens = (
+        params.get("max_completion_tokens")
+        or params.get("max_tokens")
+        or LLM_COMPLETION_TOKENS_ESTIMATE
+    )
+    return prompt_chars // LLM_CHARS_PER_TOKEN + completion_tokens
+
+
+def _key_id(api_key: Optional[str]) -> str:
+    """Short hash of an API key, so keys are never kept or reported in clear."""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:8]
+
+
+class RateLimitScheduler:
+    """Token-bucket scheduler of LLM requests per API key and model.
+
+    Every scheduler opened on the same store shares its buckets and queues,
+    within a process or across processes.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Mapping[str, Tuple[int, int]]] = None,
+        store: Optional[Path] = None
+    ) -> None:
+        """Open (and create if needed) the store.
+
+        Raises:
+            ConfigurationError: If the rate limits are invalid or the store
+                cannot be opened.
+        """
+        self._limits = dict(limits) if limits is not None else get_rate_limits()
+        self.store = Path(store) if store is not None else get_rate_limit_store()
+        try:
+            self.store.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.store, timeout=30)
+            try:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.executescript(_SCHEMA)
+            finally:
+                db.close()
+        except (OSError, sqlite3.Error) as e:
+            raise ConfigurationError(f"Rate limit store {self.store} cannot be opened: {e}") from e
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Connection holding the store's write lock until the block ends."""
+        db = sqlite3.connect(self.store, timeout=30, isolation_level=None)
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    def _limit(self, model: str) -> Tuple[int, int]:
+        name = model.split("/")[-1]
+        if name in self._limits:
+            return self._limits[name]
+        candidates = [base for base in self._limits if name.startswith(f"{base}-")]
+        return self._limits[max(candidates, key=len)] if candidates else LLM_DEFAULT_RATE_LIMIT
+
+    def _load_buckets(self, db: sqlite3.Connection, key: BucketKey) -> Tuple[TokenBucket, TokenBucket]:
+        """Request and token buckets of a key and model, created full on first use."""
+        requests, tokens = self._limit(key[1])
+        row = db.execute(
+            "SELECT requests, tokens, updated FROM buckets WHERE key_id = ? AND model = ?", key
+        ).fetchone()
+        if row is None:
+            request_bucket, token_bucket = TokenBucket(requests, requests), TokenBucket(tokens, tokens)
+            db.execute(
+                "INSERT INTO buckets (key_id, model, requests, tokens, updated) VALUES (?, ?, ?, ?, ?)",
+                (*key, request_bucket.capacity, token_bucket.capacity, request_bucket.updated)
+            )
+            return request_bucket, token_bucket
+        return (
+            TokenBucket(requests, requests, level=row[0], updated=row[2]),
+            TokenBucket(tokens, tokens, level=row[1], updated=row[2]),
+        )
+
+    @staticmethod
+    def _save_buckets(
+        db: sqlite3.Connection,
+        key: BucketKey,
+        buckets: Tuple[TokenBucket, TokenBucket],
+        **counters: float
+    ) -> None:
+        """Store bucket levels, adding counters (sent, waited, ...) to the statistics."""
+        request_bucket, token_bucket = buckets
+        increments = "".join(f", {name} = {name} + ?" for name in counters)
+        db.execute(
+            f"UPDATE buckets SET requests = ?, tokens = ?, updated = ?{increments} "
+            "WHERE key_id = ? AND model = ?",
+            (request_bucket.level, token_bucket.level, request_bucket.updated, *counters.values(), *key)
+        )
+
+    @staticmethod
+    def _drop_stale_requests(db: sqlite3.Connection) -> None:
+        db.execute("DELETE FROM queue WHERE seen < ?", (time.time() - LLM_RATE_LIMIT_STALE_SECONDS,))
+
+    @staticmethod
+    def _seconds_until_available(buckets: Tuple[TokenBucket, TokenBucket], tokens: int) -> float:
+        request_bucket, token_bucket = buckets
+        return max(request_bucket.seconds_until(1), token_bucket.seconds_until(tokens))
+
+    def _poll(self, key: BucketKey, rank: int, ticket: int, tokens: int, started: float) -> float:
+        """Take the budget if the ticket is first in its queue and the budget is available.
+
+        Returns:
+            0 if the budget was taken, otherwise the seconds to wait before polling again.
+        """
+        with self._transaction() as db:
+            now = time.time()
+            if not db.execute("UPDATE queue SET seen = ? WHERE ticket = ?", (now, ticket)).rowcount:
+                # Dropped as stale while this process was not polling: queue it again in place
+                db.execute(
+                    "INSERT INTO queue (ticket, key_id, model, priority, seen) VALUES (?, ?, ?, ?, ?)",
+                    (ticket, *key, rank, now)
+                )
+            self._drop_stale_requests(db)
+            head = db.execute(
+                "SELECT ticket FROM queue WHERE key_id = ? AND model = ? ORDER BY priority, ticket LIMIT 1", key
+            ).fetchone()
+            if head[0] != ticket:
+                return LLM_RATE_LIMIT_POLL_SECONDS
+
+            buckets = self._load_buckets(db, key)
+            wait_seconds = self._seconds_until_available(buckets, tokens)
+            if wait_seconds > 0:
+                return min(wait_seconds, LLM_RATE_LIMIT_POLL_SECONDS)
+
+            buckets[0].take(1)
+            buckets[1].take(tokens)
+            waited = now - started
+            counters = {"sent": 1, "waited": 1, "wait_seconds": waited} if waited >= 0.1 else {"sent": 1}
+            self._save_buckets(db, key, buckets, **counters)
+            db.execute("DELETE FROM queue WHERE ticket = ?", (ticket,))
+            return 0.0
+
+    def acquire(self, api_key: Optional[str], model: str, tokens: int, priority: str = "batch") -> None:
+        """Wait until a request of the given tokens fits the budget, and take it.
+
+        Args:
+            api_key: API key the request is sent with.
+            model: Model of the request.
+            tokens: Estimated tokens of the request.
+            priority: 'interactive' or 'batch' (see REQUEST_PRIORITIES).
+        """
+        key = (_key_id(api_key), model)
+        rank = REQUEST_PRIORITIES.get(priority, max(REQUEST_PRIORITIES.values()))
+        started = time.time()
+        with self._transaction() as db:
+            ticket = db.execute(
+                "INSERT INTO queue (key_id, model, priority, seen) VALUES (?, ?, ?, ?)",
+                (*key, rank, started)
+            ).lastrowid
+
+        try:
+            while True:
+                wait_seconds = self._poll(key, rank, ticket, tokens, started)
+                if wait_seconds <= 0:
+                    break
+                time.sleep(wait_seconds)
+        except BaseException:
+            with self._transaction() as db:
+                db.execute("DELETE FROM queue WHERE ticket = ?", (ticket,))
+            raise
+
+        waited = time.time() - started
+        if waited >= 1:
+            logger.info(f"Rate limit: {priority} request to {model} waited {waited:.1f}s")
+
+    def try_acquire(self, api_key: Optional[str], model: str, tokens: int) -> bool:
+        """Take the budget of a request only if it is available now and nobody is queued."""
+        key = (_key_id(api_key), model)
+        with self._transaction() as db:
+            self._drop_stale_requests(db)
+            queued = db.execute("SELECT 1 FROM queue WHERE key_id = ? AND model = ? LIMIT 1", key).fetchone()
+            buckets = self._load_buckets(db, key)
+            if queued or self._seconds_until_available(buckets, tokens) > 0:
+                return False
+            buckets[0].take(1)
+            buckets[1].take(tokens)
+            self._save_buckets(db, key, buckets, sent=1)
+            return True
+
+    def settle(self, api_key: Optional[str], model: str, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token budget of a request with its actual usage."""
+        key = (_key_id(api_key), model)
+        with self._transaction() as db:
+            buckets = self._load_buckets(db, key)
+            buckets[1].take(actual_tokens - estimated_tokens)
+            self._save_buckets(db, key, buckets)
+
+    def rate_limited(self, api_key: Optional[str], model: str) -> None:
+        """Empty the budget of a key and model after the provider rejected a request."""
+        key = (_key_id(api_key), model)
+        with self._transaction() as db:
+            buckets = self._load_buckets(db, key)
+            for bucket in buckets:
+                bucket.empty()
+            self._save_buckets(db, key, buckets, rate_limited=1)
+        logger.warning(f"Rate limit: provider rejected a request to {model}, pausing its queue")
+
+    def queue_metrics(self) -> List[QueueMetrics]:
+        """Queue depth, remaining budget and waiting statistics per API key and model."""
+        with self._transaction() as db:
+            self._drop_stale_requests(db)
+            queued: Dict[Tuple[str, str, int], int] = {
+                (key_id, model, rank): count
+                for key_id, model, rank, count in db.execute(
+                    "SELECT key_id, model, priority, COUNT(*) FROM queue GROUP BY key_id, model, priority"
+                )
+            }
+            rows = db.execute(
+                "SELECT key_id, model, sent, waited, wait_seconds, rate_limited FROM buckets ORDER BY key_id, model"
+            ).fetchall()
+            metrics = []
+            for key_id, model, sent, waited, wait_seconds, rate_limited in rows:
+                request_bucket, token_bucket = self._load_buckets(db, (key_id, model))
+                metrics.append(QueueMetrics(
+                    api_key=key_id,
+                    model=model,
+                    queued={
+                        priority: queued.get((key_id, model, value), 0)
+                        for priority, value in REQUEST_PRIORITIES.items()
+                    },
+                    requests_available=round(request_bucket.level, 1),
+                    tokens_available=round(token_bucket.level),
+                    requests_sent=sent,
+                    requests_waited=waited,
+                    wait_seconds=round(wait_seconds, 2),
+                    rate_limited=rate_limited,
+                ))
+            return metrics
+
+
+_scheduler: Optional[RateLimitScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_rate_limit_scheduler() -> RateLimitScheduler:
+    """The scheduler of this process, on the shared store, created on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RateLimitScheduler()
+        return _scheduler
+
+
+def queue_metrics() -> List[QueueMetrics]:
+    """Queue metrics of every process sharing the store (see RateLimitScheduler.queue_metrics)."""
+    return get_rate_limit_scheduler().queue_metrics()
@@ -0,0 +1,121 @@
+"""Templated final report.
+
+The report restates the job analysis (match scores, strengths, gaps) and the
+resume optimization as markdown, so it is rendered locally from the
+package's templates/final_report.md.j2 instead of being written by an LLM. The report
+mode selects how generate_report_task runs:
+
+- 'off': no report
+- 'local': template only, no LLM request
+- 'llm': template, opened by a short narrative paragraph written by the
+  report generator agent
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from jinja2 import Environment, FileSystemLoader
+from pydantic import BaseModel
+
+from .constants import DEFAULT_REPORT_MODE, REPORT_MODES, REPORT_TEMPLATE
+from .validation import ConfigurationError
+
+# Keys holding the text of a suggestion, in order of preference
+_SUGGESTION_TEXT_KEYS = ("recommended_change", "description", "suggestion", "change", "text")
+
+
+def get_report_mode(value: Union[bool, str, None] = None) -> str:
+    """Return the report mode for an enable_report setting.
+
+    Args:
+        value: A report mode, or a boolean (True selects DEFAULT_REPORT_MODE).
+            Defaults to the ENABLE_REPORTS environment variable.
+
+    Raises:
+        ConfigurationError: If the mode is unknown.
+    """
+    if value is None:
+        value = os.getenv("ENABLE_REPORTS", "true")
+    if isinstance(value, bool):
+        return DEFAULT_REPORT_MODE if value else "off"
+
+    mode = {"true": DEFAULT_REPORT_MODE, "false": "off"}.get(value.lower(), value.lower())
+    if mode not in REPORT_MODES:
+        raise ConfigurationError(
+            f"Unknown report mode '{value}'. Available: {', '.join(REPORT_MODES)}"
+        )
+    return mode
+
+
+def describe(item: Any) -> str:
+    """Text of a suggestion, which the analyzer returns as a string or a dict."""
+    if not isinstance(item, dict):
+        return str(item)
+    for key in _SUGGESTION_TEXT_KEYS:
+        if item.get(key):
+            return str(item[key])
+    return "; ".join(str(v) for k, v in item.items() if k != "section" and isinstance(v, str))
+
+
+def _ats_keywords(optimization: BaseModel) -> List[str]:
+    keywords = []
+    for keyword in optimization.keywords_for_ats:
+        if isinstance(keyword, dict):
+            keyword = keyword.get("keyword")
+        if isinstance(keyword, str) and keyword not in keywords:
+            keywords.append(keyword)
+    return keywords
+
+
+def _score_rows(score: BaseModel) -> List[Dict[str, Any]]:
+    """One table row per scoring factor: label, match percentage and weight."""
+    return [
+        {
+            "label": factor.replace("_", " ").capitalize(),
+            "match": getattr(score, f"{factor}_match"),
+            "weight": weight,
+        }
+        for factor, weight in score.scoring_factors.items()
+    ]
+
+
+def render_report(
+    job_analysis: Optional[BaseModel],
+    optimization: Optional[BaseModel],
+    narrative: Optional[str] = None,
+    template_path: Path = REPORT_TEMPLATE
+) -> str:
+    """Render the final report markdown.
+
+    Args:
+        job_analysis: JobRequirements or JobRequirementsLite of the run.
+        optimization: ResumeOptimization of the run.
+        narrative: Optional paragraph opening the report.
+        template_path: Jinja template of the report.
+
+    Returns:
+        The report in markdown.
+
+    Raises:
+        ConfigurationError: If the template does not exist.
+    """
+    if not template_path.is_file():
+        raise ConfigurationError(f"Report template not found: {template_path}")
+    environment = Environment(
+        loader=FileSystemLoader(str(template_path.parent)),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+    )
+    environment.filters["describe"] = describe
+
+    score = job_analysis.match_score if job_analysis is not None else None
+    return environment.get_template(template_path.name).render(
+        job_title=getattr(job_analysis, "job_title", ""),
+        narrative=narrative.strip() if narrative else None,
+        score=score,
+        score_rows=_score_rows(score) if score is not None else [],
+        optimization=optimization,
+        ats_keywords=_ats_keywords(optimization) if optimization is not None else [],
+    )
@@ -0,0 +1,568 @@
+"""Deterministic parser of the generated markdown resume.
+
+The resume writer follows fixed markdown conventions (see generate_resume_task
+in tasks.yaml), so the verified resume can be structured into a
+HarvardFormattedResume without an LLM:
+
+    # Full Name
+    contact line(s)
+
+    ## Summary
+    paragraph
+
+    ## Work Experience
+    ### Company — Location
+    - Role, Role — July 2022 – Present
+      - achievement
+
+    ## Education
+    ### Institution — Location
+    - Degree — 2013 – 2022
+      - additional info (GPA, honors, thesis)
+
+    ## Certifications
+    - Name — Provider (Grade), 2025
+
+    ## Skills
+    ### Category
+    - skill, skill; skill
+
+Languages, projects and any other section are kept as mixed content
+(paragraphs and bullet lists). Anything the parser cannot map with confidence
+(unknown line shapes, unparseable dates, ambiguous locations, unknown
+language) raises ResumeParseError, so the caller can fall back to the LLM
+formatter instead of producing a lossy result.
+"""
+
+import re
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+
+from .constants import MAX_KEYWORDS_TO_BOLD, RESUME_SECTION_HEADINGS
+from .models import HarvardFormattedResume, MixedContent
+from .skill_taxonomy import get_skill_taxonomy
+
+
+class ResumeParseError(ValueError):
+    """Raised when the markdown resume cannot be structured with confidence."""
+
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_BULLET_RE = re.compile(r"^(\s*)(?:[-*+•]|\d+[.)])\s+(.*)$")
+_LINK_RE = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+_EMPHASIS_RE = re.compile(r"(\*\*|__)(.+?)\1")
+# Separators between fields of a line: em dash or pipe
+_FIELD_SEPARATOR_RE = re.compile(r"\s+[—|]\s+")
+
+_MONTHS = (
+    "january|february|march|april|may|june|july|august|september|october|november|december|"
+    "jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec|"
+    "enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|setiembre|octubre|"
+    "noviembre|diciembre|ene|abr|ago|dic"
+)
+_DATE = (
+    rf"(?:(?:{_MONTHS})\.?(?:\s+de)?\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}}|"
+    r"present|current|now|presente|actualidad|actual|hoy)"
+)
+_DATE_RANGE_RE = re.compile(
+    rf"^(?P<start>{_DATE})(?:\s*(?:–|—|-|to|a|hasta)\s*(?P<end>{_DATE}))?$",
+    re.IGNORECASE
+)
+_TRAILING_DATE_RANGE_RE = re.compile(
+    rf"^(?P<body>.+?)\s*(?:,|—|\|)\s*(?P<dates>{_DATE}(?:\s*(?:–|—|-|to|a|hasta)\s*{_DATE})?)$",
+    re.IGNORECASE
+)
+_YEAR_RE = re.compile(r"\b\d{4}\b")
+_GRADE_RE = re.compile(r"^(?P<provider>.+?)\s*\((?P<grade>[^()]+)\)$")
+
+
+def _clean_inline(text: str) -> str:
+    """Remove markdown emphasis and flatten links, keeping their URL."""
+    text = _LINK_RE.sub(
+        lambda m: m.group(2) if m.group(1) in m.group(2) else f"{m.group(1)} ({m.group(2)})",
+        text
+    )
+    text = _EMPHASIS_RE.sub(r"\2", text)
+    return text.strip().strip("*_").strip()
+
+
+def _normalize_heading(title: str) -> str:
+    title = title.lower().replace("&", " and ")
+    title = re.sub(r"[^\w\s/]", "", title)
+    return re.sub(r"\s+", " ", title).strip()
+
+
+_HEADING_LOOKUP: Dict[str, Tuple[str, str]] = {
+    _normalize_heading(alias): (language, field)
+    for language, fields in RESUME_SECTION_HEADINGS.items()
+    for field, aliases in fields.items()
+    for alias in aliases
+}
+
+
+def _parse_date_range(text: str) -> Optional[Tuple[str, str]]:
+    """Parse 'Start – End' (or a single date) into (start, end)."""
+    match = _DATE_RANGE_RE.match(_clean_inline(text).strip("()"))
+    if not match:
+        return None
+    start = match.group("start")
+    return start, match.group("end") or start
+
+
+def _split_last_field(text: str) -> Tuple[str, Optional[str]]:
+    """Split 'head — last' at the last field separator."""
+    parts = _FIELD_SEPARATOR_RE.split(text)
+    if len(parts) < 2:
+        return text, None
+    return " — ".join(parts[:-1]), parts[-1]
+
+
+def _split_institution(
+    header: str,
+    known_locations: Collection[str] = ()
+) -> Tuple[str, Optional[str]]:
+    """Split an 'Institution — Location' header.
+
+    'Institution, Location' is accepted as long as it has a single comma.
+    With more commas the boundary between institution and location is a
+    guess, unless the trailing part is a location the resume already uses
+    elsewhere (contact line or another heading).
+    """
+    institution, location = _split_last_field(header)
+    if location is not None:
+        return institution, location
+
+    parts = [part.strip() for part in header.split(",")]
+    if len(parts) == 1:
+        return header, None
+    if len(parts) == 2:
+        return parts[0], parts[1]
+
+    known = {location.casefold() for location in known_locations}
+    for split in range(1, len(parts)):
+        location = ", ".join(parts[split:])
+        if location.casefold() in known:
+            return ", ".join(parts[:split]), location
+    raise ResumeParseError(f"Ambiguous location in heading: {header}")
+
+
+def _split_items(text: str) -> List[str]:
+    """Split a comma/semicolon separated list, ignoring separators inside parentheses."""
+    items, current, depth = [], [], 0
+    for char in text:
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth = max(depth - 1, 0)
+        if char in ",;" and depth == 0:
+            items.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    items.append("".join(current))
+    return [item.strip().rstrip(".") for item in items if item.strip()]
+
+
+class _Line:
+    """A non-empty markdown line, classified as heading, bullet or text."""
+
+    def __init__(self, raw: str) -> None:
+        self.heading_level = 0
+        self.indent = 0
+        self.is_bullet = False
+
+        expanded = raw.replace("\t", "    ").rstrip()
+        heading = _HEADING_RE.match(expanded)
+        bullet = _BULLET_RE.match(expanded)
+        if heading:
+            self.heading_level = len(heading.group(1))
+            self.text = _clean_inline(heading.group(2))
+        elif bullet:
+            self.is_bullet = True
+            self.indent = len(bullet.group(1))
+            self.text = _clean_inline(bullet.group(2))
+        else:
+            self.indent = len(expanded) - len(expanded.lstrip())
+            self.text = _clean_inline(expanded)
+
+
+def _split_lines(markdown: str) -> List[Optional[_Line]]:
+    """Classify the lines of a document; blank lines are kept as None."""
+    text = markdown.strip()
+    # The LLM occasionally wraps its answer in a code fence
+    text = re.sub(r"^```\w*\n|\n```$", "", text).strip()
+    return [_Line(line) if line.strip() else None for line in text.splitlines()]
+
+
+def _parse_mixed_content(lines: Sequence[Optional[_Line]]) -> MixedContent:
+    """Group lines into paragraphs (str) and bullet lists (List[str])."""
+    blocks: MixedContent = []
+    paragraph: List[str] = []
+    bullets: List[str] = []
+
+    def flush() -> None:
+        if paragraph:
+            blocks.append(" ".join(paragraph))
+            paragraph.clear()
+        if bullets:
+            blocks.append(list(bullets))
+            bullets.clear()
+
+    for line in lines:
+        if line is None:
+            flush()
+        elif line.is_bullet:
+            if paragraph:
+                flush()
+            bullets.append(line.text)
+        elif bullets and line.indent > 0:
+            # Continuation of a wrapped bullet
+            bullets[-1] = f"{bullets[-1]} {line.text}"
+        else:
+            if bullets:
+                flush()
+            paragraph.append(line.text)
+    flush()
+    return blocks
+
+
+def _parse_summary(lines: Sequence[Optional[_Line]]) -> Optional[str]:
+    parts = [line.text for line in lines if line is not None]
+    return " ".join(parts) or None
+
+
+def _parse_work_experience(
+    lines: Sequence[Optional[_Line]],
+    known_locations: Collection[str] = ()
+) -> List[Dict[str, Any]]:
+    entries: List[Dict[str, Any]] = []
+    institution: Optional[str] = None
+    location: Optional[str] = None
+    current: Optional[Dict[str, Any]] = None
+
+    for line in lines:
+        if line is None:
+            continue
+        if line.heading_level:
+            institution, location = _split_institution(line.text, known_locations)
+            current = None
+            continue
+
+        roles, dates_text = _split_last_field(line.text)
+        dates = _parse_date_range(dates_text) if dates_text and line.indent == 0 else None
+        if dates:
+            if institution is None:
+                raise ResumeParseError(f"Role without a company heading: {line.text}")
+            current = {
+                "institution": institution,
+                "location": location,
+                "roles": _split_items(roles),
+                "date_start": dates[0],
+                "date_end": dates[1],
+                "achievements": [],
+            }
+            entries.append(current)
+        elif current is not None:
+            if line.is_bullet or not current["achievements"]:
+                current["achievements"].append(line.text)
+            else:
+                current["achievements"][-1] = f"{current['achievements'][-1]} {line.text}"
+        else:
+            raise ResumeParseError(f"Unrecognized work experience line: {line.text}")
+
+    if not entries:
+        raise ResumeParseError("No work experience entries found")
+    return entries
+
+
+def _parse_single_line_education(text: str) -> Dict[str, Any]:
+    """Parse '- Institution — Degree[; details], Years'."""
+    parts = _FIELD_SEPARATOR_RE.split(text, maxsplit=1)
+    if len(parts) < 2:
+        raise ResumeParseError(f"Unrecognized education line: {text}")
+    institution, rest = parts
+
+    years: Optional[Tuple[str, str]] = None
+    trailing = _TRAILING_DATE_RANGE_RE.match(rest)
+    if trailing:
+        years = _parse_date_range(trailing.group("dates"))
+        rest = trailing.group("body")
+
+    degree, _, details = rest.partition(";")
+    return {
+        "institution": institution,
+        "location": None,
+        "degree": degree.strip(),
+        "year_start": years[0] if years else None,
+        "year_end": years[1] if years else None,
+        "additional_info": details.strip() or None,
+    }
+
+
+def _parse_education(
+    lines: Sequence[Optional[_Line]],
+    known_locations: Collection[str] = ()
+) -> List[Dict[str, Any]]:
+    entries: List[Dict[str, Any]] = []
+    institution: Optional[str] = None
+    location: Optional[str] = None
+    current: Optional[Dict[str, Any]] = None
+
+    for line in lines:
+        if line is None:
+            continue
+        if line.heading_level:
+            institution, location = _split_institution(line.text, known_locations)
+            current = None
+            continue
+
+        if institution is None:
+            if line.indent > 0 and current is not None:
+                current["additional_info"] = "; ".join(
+                    filter(None, [current["additional_info"], line.text])
+                )
+            else:
+                current = _parse_single_line_education(line.text)
+                entries.append(current)
+            continue
+
+        if line.indent == 0 or current is None:
+            degree, dates_text = _split_last_field(line.text)
+            years = _parse_date_range(dates_text) if dates_text else None
+            if not years:
+                degree = line.text
+            current = {
+                "institution": institution,
+                "location": location,
+                "degree": degree,
+                "year_start": years[0] if years else None,
+                "year_end": years[1] if years else None,
+                "additional_info": None,
+            }
+            entries.append(current)
+        else:
+            current["additional_info"] = "; ".join(
+                filter(None, [current["additional_info"], line.text])
+            )
+
+    if not entries:
+        raise ResumeParseError("No education entries found")
+    return entries
+
+
+def _parse_certification(text: str) -> Dict[str, Any]:
+    """Parse '- Name — Provider (Grade), Year' or '- Year | Name | Provider | Grade'."""
+    if " | " in text:
+        parts = [part.strip() for part in text.split(" | ")]
+        year = next((part for part in parts if _YEAR_RE.fullmatch(part)), None)
+        fields = [part for part in parts if part != year]
+        if year is None or len(fields) < 2:
+            raise ResumeParseError(f"Unrecognized certification line: {text}")
+        return {
+            "year": year,
+            "name": fields[0],
+            "provider": fields[1],
+            "grade": ", ".join(fields[2:]) or None,
+        }
+
+    parts = _FIELD_SEPARATOR_RE.split(text, maxsplit=1)
+    details = _split_items(parts[1]) if len(parts) == 2 else []
+    if len(details) < 2 or not _YEAR_RE.search(details[-1]):
+        raise ResumeParseError(f"Unrecognized certification line: {text}")
+
+    provider, grade = details[0], ", ".join(details[1:-1]) or None
+    with_grade = _GRADE_RE.match(provider)
+    if with_grade and not grade:
+        provider, grade = with_grade.group("provider"), with_grade.group("grade")
+    return {"year": details[-1], "name": parts[0], "provider": provider, "grade": grade}
+
+
+def _parse_certifications(lines: Sequence[Optional[_Line]]) -> List[Dict[str, Any]]:
+    certifications = []
+    for line in lines:
+        if line is None or line.heading_level:
+            continue
+        if line.indent > 0:
+            raise ResumeParseError(f"Unexpected nested certification line: {line.text}")
+        certifications.append(_parse_certification(line.text))
+    return certifications
+
+
+def _parse_skills(lines: Sequence[Optional[_Line]], section_title: str) -> Dict[str, List[str]]:
+    skills: Dict[str, List[str]] = {}
+    category = section_title
+
+    for line in lines:
+        if line is None:
+            continue
+        if line.heading_level:
+            category = line.text
+            continue
+
+        label, colon, items = line.text.partition(":")
+        # '- Category: skill, skill' lines carry their own category
+        if colon and items.strip() and len(label) <= 40 and "," not in label:
+            skills.setdefault(label.strip(), []).extend(_split_items(items))
+        else:
+            skills.setdefault(category, []).extend(_split_items(line.text))
+
+    return {name: items for name, items in skills.items() if items}
+
+
+def _split_sections(
+    lines: Sequence[Optional[_Line]]
+) -> Tuple[str, List[str], List[Tuple[str, List[Optional[_Line]]]]]:
+    """Split a document into candidate name, contact lines and '##' sections."""
+    content = [line for line in lines if line is not None]
+    if not content or content[0].heading_level != 1:
+        raise ResumeParseError("The resume does not start with '# Candidate Name'")
+
+    name = content[0].text
+    start = lines.index(content[0]) + 1
+    contact: List[str] = []
+    sections: List[Tuple[str, List[Optional[_Line]]]] = []
+
+    for line in lines[start:]:
+        if line is not None and line.heading_level in (1, 2):
+            if line.heading_level == 1:
+                raise ResumeParseError(f"Unexpected top-level heading: {line.text}")
+            sections.append((line.text, []))
+        elif sections:
+            sections[-1][1].append(line)
+        elif line is not None:
+            contact.append(line.text)
+
+    return name, contact, sections
+
+
+def _collect_known_locations(
+    contact: Sequence[str],
+    sections: Sequence[Tuple[str, Sequence[Optional[_Line]]]]
+) -> List[str]:
+    """Locations the resume states unambiguously, to resolve comma-separated headings."""
+    locations: List[str] = []
+    for line in contact:
+        for field in re.split(r"\s*[•|]\s*", line):
+            # Skip emails, URLs and labelled fields ('LinkedIn: ...')
+            if field and not re.search(r"[@:/\d]", field):
+                locations.append(field)
+                locations.append(field.split(",")[0].strip())
+
+    for _, lines in sections:
+        for line in lines:
+            if line is None or not line.heading_level:
+                continue
+            _, location = _split_last_field(line.text)
+            parts = line.text.split(",")
+            if location is None and len(parts) == 2:
+                location = parts[1].strip()
+            if location:
+                locations.append(location)
+    return locations
+
+
+def _detect_language(headings: Sequence[str]) -> str:
+    votes: Dict[str, int] = {}
+    for heading in headings:
+        known = _HEADING_LOOKUP.get(_normalize_heading(heading))
+        if known:
+            votes[known[0]] = votes.get(known[0], 0) + 1
+
+    ranked = sorted(votes.items(), key=lambda item: item[1], reverse=True)
+    if not ranked or (len(ranked) > 1 and ranked[0][1] == ranked[1][1]):
+        raise ResumeParseError("Could not determine the resume language from its headings")
+    return ranked[0][0]
+
+
+def select_keywords_to_bold(
+    achievements: Sequence[str],
+    candidates: Sequence[str],
+    limit: int = MAX_KEYWORDS_TO_BOLD
+) -> List[str]:
+    """Pick the candidate keywords that appear in a list of achievements.
+
+    Candidates and their skill taxonomy aliases are found in one pass over
+    each achievement. Longer keywords are preferred, and each is returned
+    as it is written in the achievements.
+
+    Args:
+        achievements: Achievement bullets of a work experience.
+        candidates: Keywords worth emphasizing (e.g. the job's skills).
+        limit: Maximum number of keywords.
+
+    Returns:
+        Keywords to bold, longest first.
+    """
+    matcher = get_skill_taxonomy().matcher(k.strip() for k in candidates if k.strip())
+    written: Dict[str, str] = {}
+    for achievement in achievements:
+        for match in matcher.find(achievement):
+            written.setdefault(match.value, match.text)
+    return sorted(written.values(), key=len, reverse=True)[:limit]
+
+
+def parse_resume_markdown(
+    markdown: str,
+    bold_candidates: Sequence[str] = ()
+) -> HarvardFormattedResume:
+    """Structure a markdown resume written with the writer's conventions.
+
+    Args:
+        markdown: The generated (or verified) markdown resume.
+        bold_candidates: Keywords to bold in work experience achievements.
+
+    Returns:
+        The structured resume.
+
+    Raises:
+        ResumeParseError: If any part of the resume cannot be mapped with confidence.
+    """
+    name, contact, sections = _split_sections(_split_lines(markdown))
+    if not contact:
+        raise ResumeParseError("No contact information below the candidate name")
+
+    language = _detect_language([title for title, _ in sections])
+    known_locations = _collect_known_locations(contact, sections)
+    data: Dict[str, Any] = {
+        "candidate_name": name,
+        "contact_info": " • ".join(contact),
+        "language": language,
+    }
+    additional_sections: Dict[str, MixedContent] = {}
+
+    for title, lines in sections:
+        known = _HEADING_LOOKUP.get(_normalize_heading(title))
+        field = known[1] if known else None
+        if field in data:
+            raise ResumeParseError(f"Duplicate section: {title}")
+
+        if field == "summary":
+            data[field] = _parse_summary(lines)
+        elif field == "work_experience":
+            entries = _parse_work_experience(lines, known_locations)
+            for entry in entries:
+                entry["keywords_to_bold"] = select_keywords_to_bold(
+                    entry["achievements"], bold_candidates
+                )
+            data[field] = entries
+        elif field == "education":
+            data[field] = _parse_education(lines, known_locations)
+        elif field == "certifications":
+            data[field] = _parse_certifications(lines)
+        elif field == "skills":
+            data[field] = _parse_skills(lines, title)
+        elif field in ("languages", "projects"):
+            data[field] = _parse_mixed_content(lines)
+        else:
+            additional_sections[title] = _parse_mixed_content(lines)
+
+    if "work_experience" not in data and "education" not in data:
+        raise ResumeParseError("Neither a work experience nor an education section was found")
+    if additional_sections:
+        data["additional_sections"] = additional_sections
+
+    try:
+        return HarvardFormattedResume.model_validate(data)
+    except ValidationError as e:
+        raise ResumeParseError(f"Parsed resume does not match the schema: {e}") from e
@@ -0,0 +1,138 @@
+"""Per-run configuration of the crew.
+
+The API key, main model, word target and pipeline options of a run are
+carried by a RunConfig that is passed to the crew, which hands them to its
+LLMs, tools and embedders. Nothing is read back from os.environ while the
+run executes, so a run never picks up the key, model or word target of
+another run configured in the same process.
+
+RunConfig does not isolate the files of a run: the knowledge inputs,
+output/, .crewai_temp/ (live output, stage metrics) and CrewAI's storage
+are per working directory, and stage timings are per process. Runs that
+execute at the same time need a process and working directory of their
+own, as batch runs (async_runner) and model comparisons (model_compare) do.
+
+Environment variables remain the defaults: RunConfig.from_env reads them
+once, when the run is configured. Deployment-wide settings (model routing
+overrides such as FAST_MODEL, rate limits, knowledge inlining) are still
+read from the environment.
+"""
+
+import os
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Optional
+
+from .constants import (
+    DEFAULT_FACT_CHECK_MODE,
+    DEFAULT_JOB_ANALYSIS_MODE,
+    DEFAULT_MODEL_PRESET,
+    DEFAULT_OPENAI_MODEL,
+    DEFAULT_PIPELINE_PROFILE,
+    DEFAULT_REQUEST_PRIORITY,
+    DEFAULT_TARGET_WORDS,
+    FACT_CHECK_MODES,
+    JOB_ANALYSIS_MODES,
+    PIPELINE_PROFILES,
+    REQUEST_PRIORITIES,
+)
+from .model_routing import get_model_preset
+from .validation import ConfigurationError, validate_target_words
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() == "true"
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    """Settings of one crew run.
+
+    Attributes:
+        api_key: OpenAI API key; None lets the OpenAI client read OPENAI_API_KEY.
+        model: Main model of the run (see model_routing).
+        target_words: Target word count of the resume.
+        model_preset: Model routing preset.
+        pipeline_profile: 'standard' or 'fast'.
+        job_analysis_mode: 'compact' or 'full'.
+        fact_check_mode: 'targeted' or 'full'.
+        reuse_job_analyses: Reuse the analysis of near-duplicate job descriptions.
+        enable_hedging: Send a duplicate of slow LLM requests.
+        fallback_model: Model of timed out and rate limited requests.
+        request_priority: 'interactive' or 'batch' queue priority under
+            shared rate limits.
+    """
+
+    api_key: Optional[str] = field(default=None, repr=False)
+    model: str = DEFAULT_OPENAI_MODEL
+    target_words: int = DEFAULT_TARGET_WORDS
+    model_preset: str = DEFAULT_MODEL_PRESET
+    pipeline_profile: str = DEFAULT_PIPELINE_PROFILE
+    job_analysis_mode: str = DEFAULT_JOB_ANALYSIS_MODE
+    fact_check_mode: str = DEFAULT_FACT_CHECK_MODE
+    reuse_job_analyses: bool = True
+    enable_hedging: bool = True
+    fallback_model: Optional[str] = None
+    request_priority: str = DEFAULT_REQUEST_PRIORITY
+
+    def __post_init__(self) -> None:
+        """Validate the settings.
+
+        Raises:
+            ConfigurationError: If a preset, profile, mode or priority is unknown.
+            InvalidInputError: If the word target is out of range.
+        """
+        get_model_preset(self.model_preset)
+        validate_target_words(self.target_words)
+        choices = {
+            "pipeline profile": (self.pipeline_profile, PIPELINE_PROFILES),
+            "job analysis mode": (self.job_analysis_mode, JOB_ANALYSIS_MODES),
+            "fact check mode": (self.fact_check_mode, FACT_CHECK_MODES),
+            "request priority": (self.request_priority, tuple(REQUEST_PRIORITIES)),
+        }
+        for label, (value, available) in choices.items():
+            if value not in available:
+                raise ConfigurationError(
+                    f"Unknown {label} '{value}'. Available: {', '.join(available)}"
+                )
+
+    @classmethod
+    def from_env(cls, **overrides: Any) -> "RunConfig":
+        """Build a config from the environment, with overrides taking precedence.
+
+        Args:
+            **overrides: Field values; None values are ignored.
+
+        Raises:
+            ConfigurationError: If a setting is unknown or invalid.
+            InvalidInputError: If the word target is out of range.
+        """
+        names = {setting.name for setting in fields(cls)}
+        unknown = set(overrides) - names
+        if unknown:
+            raise ConfigurationError(f"Unknown run settings: {', '.join(sorted(unknown))}")
+
+        values: Dict[str, Any] = {
+            "api_key": os.getenv("OPENAI_API_KEY") or None,
+            "model": os.getenv("OPENAI_MODEL", DEFAULT_OPENAI_MODEL),
+            "target_words": int(os.getenv("TARGET_RESUME_WORDS", str(DEFAULT_TARGET_WORDS))),
+            "model_preset": os.getenv("MODEL_PRESET", DEFAULT_MODEL_PRESET),
+            "pipeline_profile": os.getenv("PIPELINE_PROFILE", DEFAULT_PIPELINE_PROFILE),
+            "job_analysis_mode": os.getenv("JOB_ANALYSIS_MODE", DEFAULT_JOB_ANALYSIS_MODE),
+            "fact_check_mode": os.getenv("FACT_CHECK_MODE", DEFAULT_FACT_CHECK_MODE),
+            "reuse_job_analyses": _env_flag("REUSE_JOB_ANALYSES", True),
+            "enable_hedging": _env_flag("ENABLE_REQUEST_HEDGING", True),
+            "fallback_model": os.getenv("LLM_FALLBACK_MODEL") or None,
+        }
+        values.update({name: value for name, value in overrides.items() if value is not None})
+        return cls(**values)
+
+    @property
+    def embedder(self) -> Optional[Dict[str, Any]]:
+        """Embedder config of knowledge sources and RAG tools, with the run's API key."""
+        if not self.api_key:
+            return None
+        return {"provider": "openai", "config": {"api_key": self.api_key}}
+
+
+# Settings that can also be passed to the crew as keyword arguments
+RUN_CONFIG_OPTIONS = tuple(setting.name for setting in fields(RunConfig))
@@ -0,0 +1,155 @@
+"""Deterministic job match scoring.
+
+The job analyzer only makes judgements: a SkillScore for every technical and
+soft skill of the job description, and a raw 0-1 assessment of the candidate's
+experience, education and industry knowledge. The category percentages and
+the overall match are computed here, so scores are reproducible and the
+weights can be changed without touching the prompt.
+
+Skill score = match_level * ((1 - c) + c * context_score), with c =
+SKILL_CONTEXT_WEIGHT. A skill category's match is the importance-weighted mean
+of its skill scores (required skills weigh more than nice-to-have ones). A
+category without skills is not scored (None): the overall match is the
+weighted mean of the scored categories only, so a job description that lists
+no soft skills neither rewards nor penalizes the candidate for them.
+"""
+
+import json
+import os
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from crewai.tasks.task_output import TaskOutput
+
+from .constants import DEFAULT_SCORING_FACTORS, SKILL_CONTEXT_WEIGHT, SKILL_IMPORTANCE_WEIGHTS
+from .validation import ConfigurationError
+
+# SkillScore.category -> scoring factor
+SKILL_CATEGORY_FACTORS: Dict[str, str] = {
+    "technical": "technical_skills",
+    "soft": "soft_skills",
+}
+# Scoring factors assessed as a whole by the job analyzer
+ASSESSED_FACTORS = ("experience", "education", "industry")
+
+
+def get_scoring_factors(overrides: Optional[Mapping[str, float]] = None) -> Dict[str, float]:
+    """Return the normalized category weights of the overall match.
+
+    Weights are DEFAULT_SCORING_FACTORS, updated with the SCORING_FACTORS
+    environment variable (JSON object) and then with overrides.
+
+    Args:
+        overrides: Weights that take precedence over defaults and environment.
+
+    Returns:
+        Weights per scoring factor, summing to 1.
+
+    Raises:
+        ConfigurationError: If a weight is unknown or negative, or all are zero.
+    """
+    factors = dict(DEFAULT_SCORING_FACTORS)
+
+    env_factors = os.getenv("SCORING_FACTORS")
+    if env_factors:
+        try:
+            factors.update(json.loads(env_factors))
+        except (json.JSONDecodeError, TypeError, ValueError) as e:
+            raise ConfigurationError(f"SCORING_FACTORS must be a JSON object: {e}") from e
+    factors.update(overrides or {})
+
+    unknown = set(factors) - set(DEFAULT_SCORING_FACTORS)
+    if unknown:
+        raise ConfigurationError(f"Unknown scoring factors: {', '.join(sorted(unknown))}")
+    if any(weight < 0 for weight in factors.values()):
+        raise ConfigurationError("Scoring factors must not be negative")
+
+    total = sum(factors.values())
+    if total <= 0:
+        raise ConfigurationError("At least one scoring factor must be positive")
+    return {name: weight / total for name, weight in factors.items()}
+
+
+def compute_skill_category_matches(skill_details: Sequence[Any]) -> Dict[str, Optional[float]]:
+    """Compute the match percentage of every skill category at once.
+
+    Args:
+        skill_details: SkillScore judgements of all skills.
+
+    Returns:
+        Match percentage (0-100) per skill scoring factor; None for a
+        category without skills.
+    """
+    factor_names = list(SKILL_CATEGORY_FACTORS.values())
+    if not skill_details:
+        return {name: None for name in factor_names}
+
+    category_index = {category: i for i, category in enumerate(SKILL_CATEGORY_FACTORS)}
+    categories = np.array([category_index[s.category] for s in skill_details])
+    match_levels = np.array([s.match_level for s in skill_details], dtype=float)
+    context_scores = np.array([s.context_score for s in skill_details], dtype=float)
+    importance = np.where(
+        np.array([s.required for s in skill_details]),
+        SKILL_IMPORTANCE_WEIGHTS["required"],
+        SKILL_IMPORTANCE_WEIGHTS["nice_to_have"],
+    )
+
+    scores = match_levels * ((1 - SKILL_CONTEXT_WEIGHT) + SKILL_CONTEXT_WEIGHT * context_scores)
+    n_categories = len(factor_names)
+    weighted_sums = np.bincount(categories, weights=importance * scores, minlength=n_categories)
+    weight_totals = np.bincount(categories, weights=importance, minlength=n_categories)
+
+    matches = np.divide(
+        weighted_sums, weight_totals,
+        out=np.zeros(n_categories), where=weight_totals > 0
+    ) * 100
+    return {
+        name: round(float(match), 1) if total > 0 else None
+        for name, match, total in zip(factor_names, matches, weight_totals)
+    }
+
+
+def compute_match_scores(
+    skill_details: Sequence[Any],
+    assessments: Mapping[str, float],
+    factors: Optional[Mapping[str, float]] = None
+) -> Dict[str, Optional[float]]:
+    """Compute category match percentages and the overall match.
+
+    Args:
+        skill_details: SkillScore judgements of all skills.
+        assessments: Raw 0-1 assessment per ASSESSED_FACTORS entry.
+        factors: Category weights; defaults to get_scoring_factors().
+
+    Returns:
+        '<factor>_match' percentages (None for a skill category without
+        skills) and 'overall_match', the weighted mean of the scored
+        categories; all 0-100.
+    """
+    factors = factors or get_scoring_factors()
+
+    matches = compute_skill_category_matches(skill_details)
+    for name in ASSESSED_FACTORS:
+        matches[name] = round(float(assessments[name]) * 100, 1)
+
+    scored = [name for name in factors if matches[name] is not None]
+    total_weight = sum(factors[name] for name in scored)
+    overall = (
+        sum(factors[name] * matches[name] for name in scored) / total_weight
+        if total_weight > 0 else 0.0
+    )
+
+    scores = {f"{name}_match": match for name, match in matches.items()}
+    scores["overall_match"] = round(overall, 1)
+    return scores
+
+
+def include_computed_scores(output: TaskOutput) -> Tuple[bool, Any]:
+    """Task guardrail that adds the computed match scores to the raw output.
+
+    Later tasks receive the raw LLM output as context, which lacks the
+    percentages computed here; re-serializing the validated model adds them.
+    """
+    if output.pydantic is None:
+        return True, output.raw
+    return True, output.pydantic.model_dump_json()
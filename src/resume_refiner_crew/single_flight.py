@@ -0,0 +1,92 @@
+"""Single-flight coalescing of identical crew submissions.
+
+A double click on "Process Resume", a refresh and resubmit, or a batch
+manifest that lists the same resume and job description twice would each
+start a full crew run. A submission is identified by a content hash of
+everything that determines the run's output: the resume bytes, the job
+description text, the model, target words, language and every other option,
+and the API key (so one user's key is never billed for another user's
+submission). A submission whose key is already in flight joins that
+execution instead of starting a new one, and every waiter receives its
+CrewResult.
+
+SingleFlight is the registry of in-flight executions by key; the async
+runner (see async_runner) and the web interface keep one each.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def submission_key(resume_pdf_bytes: bytes, job_description: str, api_key: str, **params: Any) -> str:
+    """Content hash of a crew submission.
+
+    Args:
+        resume_pdf_bytes: PDF file content as bytes.
+        job_description: Job description text.
+        api_key: OpenAI API key of the run.
+        **params: Every other parameter of the run (model, target_words,
+            language, report and fact check flags, header items, ...).
+
+    Returns:
+        Hex digest that is equal for submissions producing the same run.
+    """
+    digest = hashlib.sha256()
+    digest.update(hashlib.sha256(resume_pdf_bytes).digest())
+    digest.update(json.dumps(
+        {
+            'job_description': job_description,
+            'api_key': hashlib.sha256((api_key or "").encode('utf-8')).hexdigest(),
+            **params
+        },
+        sort_keys=True,
+        default=str
+    ).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SingleFlight(Generic[T]):
+    """Thread-safe registry of in-flight executions by submission key."""
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, T] = {}
+        self._lock = threading.Lock()
+
+    def join(
+        self,
+        key: str,
+        start: Callable[[], T],
+        alive: Optional[Callable[[T], bool]] = None
+    ) -> Tuple[T, bool]:
+        """Return the in-flight execution of key, starting one if there is none.
+
+        Args:
+            key: Submission key (see submission_key).
+            start: Starts the execution and returns its handle.
+            alive: Whether an execution can still be joined; an execution
+                that finished without being collected is replaced.
+
+        Returns:
+            The execution and whether this call started it.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and (alive is None or alive(flight)):
+                return flight, False
+            flight = start()
+            self._flights[key] = flight
+            return flight, True
+
+    def finish(self, key: str, flight: T) -> None:
+        """Forget a finished execution, so the next submission of key starts a new one."""
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._flights)
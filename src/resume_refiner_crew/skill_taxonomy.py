@@ -0,0 +1,155 @@
+"""Skill taxonomy: canonical skill names and their aliases.
+
+The job analyzer and the formatter write skills as free-form strings, so the
+same skill shows up as "PyTorch", "pytorch" or "Torch", or as "CV" and
+"Computer Vision". SkillTaxonomy indexes SKILL_TAXONOMY once in a token trie:
+
+- canonical_skill renames a skill written as any of its aliases to its
+  canonical name (JobRequirements and SkillScore are normalised with it)
+- matcher builds a SkillTrie of some keywords and every alias of them, which
+  finds them all in a single left-to-right pass over a text, preferring the
+  longest match (used to pick and bold keywords in achievements)
+
+Tokens are compared lowercased and stemmed (see ats_coverage.stem). Aliases
+written in capitals are acronyms and only match capitalized text, so "cv" in
+a sentence is not read as Computer Vision.
+"""
+
+import functools
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .ats_coverage import stem, token_spans
+from .constants import SKILL_TAXONOMY
+
+
+@dataclass(frozen=True)
+class SkillMatch:
+    """Occurrence of a trie entry in a text."""
+
+    value: str
+    text: str
+    start: int
+    end: int
+
+
+@dataclass
+class _TrieNode:
+    children: Dict[str, "_TrieNode"] = field(default_factory=dict)
+    # (value, whether the entry is an acronym)
+    terminals: List[Tuple[str, bool]] = field(default_factory=list)
+
+
+def _in_capitals(token: str) -> bool:
+    """Whether a token is written like an acronym ('CV', 'LLMs')."""
+    if len(token) > 2 and token.endswith("s"):
+        token = token[:-1]
+    return token.isupper()
+
+
+class SkillTrie:
+    """Token trie of names, each mapped to a value."""
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+
+    def add(self, name: str, value: str, acronym: bool = False) -> None:
+        """Add a name; an acronym only matches text written in capitals."""
+        tokens = [stem(token) for token, _, _ in token_spans(name)]
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.children.setdefault(token, _TrieNode())
+        if (value, acronym) not in node.terminals:
+            node.terminals.append((value, acronym))
+
+    def _longest_match(
+        self,
+        spans: Sequence[Tuple[str, int, int]],
+        stems: Sequence[str],
+        start: int
+    ) -> Optional[Tuple[int, str]]:
+        """Last token index and value of the longest entry starting at a token."""
+        node = self._root
+        longest: Optional[Tuple[int, str]] = None
+        for index in range(start, len(stems)):
+            node = node.children.get(stems[index])
+            if node is None:
+                break
+            for value, acronym in node.terminals:
+                if not acronym or all(_in_capitals(token) for token, _, _ in spans[start:index + 1]):
+                    longest = (index, value)
+                    break
+        return longest
+
+    def find(self, text: str) -> List[SkillMatch]:
+        """Find the entries in a text, leftmost-longest and without overlaps."""
+        spans = token_spans(text)
+        stems = [stem(token) for token, _, _ in spans]
+        matches: List[SkillMatch] = []
+        index = 0
+        while index < len(spans):
+            found = self._longest_match(spans, stems, index)
+            if found is None:
+                index += 1
+                continue
+            last, value = found
+            start, end = spans[index][1], spans[last][2]
+            matches.append(SkillMatch(value=value, text=text[start:end], start=start, end=end))
+            index = last + 1
+        return matches
+
+
+class SkillTaxonomy:
+    """Index of canonical skill names and their aliases."""
+
+    def __init__(self, taxonomy: Mapping[str, Sequence[str]] = SKILL_TAXONOMY) -> None:
+        self.names: Dict[str, List[Tuple[str, bool]]] = {}
+        self._trie = SkillTrie()
+        for canonical, aliases in taxonomy.items():
+            names = [(canonical, False)] + [(alias, alias.isupper()) for alias in aliases]
+            self.names[canonical] = names
+            for name, acronym in names:
+                self._trie.add(name, canonical, acronym)
+
+    def canonical_skill(self, skill: str) -> str:
+        """Canonical name of a skill, or the skill as given if it is not in the taxonomy."""
+        skill = skill.strip()
+        spans = token_spans(skill)
+        matches = self._trie.find(skill)
+        if len(matches) == 1 and spans and (matches[0].start, matches[0].end) == (spans[0][1], spans[-1][2]):
+            return matches[0].value
+        return skill
+
+    def canonicalize(self, skills: Iterable[str]) -> List[str]:
+        """Canonical names of skills, without duplicates, in their original order."""
+        canonical: Dict[str, str] = {}
+        for skill in skills:
+            name = self.canonical_skill(skill)
+            if name:
+                canonical.setdefault(name.lower(), name)
+        return list(canonical.values())
+
+    def matcher(self, keywords: Iterable[str]) -> SkillTrie:
+        """Trie of keywords and all aliases of them, valued by canonical keyword."""
+        trie = SkillTrie()
+        for keyword in keywords:
+            value = self.canonical_skill(keyword)
+            if not value:
+                continue
+            trie.add(keyword, value)
+            for name, acronym in self.names.get(value, ()):
+                trie.add(name, value, acronym)
+        return trie
+
+
+@functools.lru_cache(maxsize=1)
+def get_skill_taxonomy() -> SkillTaxonomy:
+    """The SKILL_TAXONOMY index, built on first use."""
+    return SkillTaxonomy()
+
+
+def canonicalize_skills(skills: Iterable[str]) -> List[str]:
+    """Canonical names of skills, without duplicates (see SkillTaxonomy.canonicalize)."""
+    return get_skill_taxonomy().canonicalize(skills)
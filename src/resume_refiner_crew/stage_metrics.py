@@ -0,0 +1,170 @@
+"""Per-stage latency, token usage and cost metrics.
+
+Every agent runs on its own LLM instance, so the token usage of that instance
+is the usage of the agent's task. Start times are taken from CrewAI's
+TaskStartedEvent; when a task completes, its latency, tokens, estimated cost
+and tool call counts are written to .crewai_temp/stage_metrics.json, which
+the Streamlit sidebar renders as a per-stage breakdown.
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TypedDict
+
+from crewai import Task
+from crewai.events import TaskStartedEvent, crewai_event_bus
+from crewai.tasks.task_output import TaskOutput
+
+from .constants import MODEL_PRICING, STAGE_METRICS_FILE
+
+logger = logging.getLogger(__name__)
+
+_task_start_times: Dict[str, datetime] = {}
+_listener_registered = False
+_lock = threading.Lock()
+
+
+class StageMetrics(TypedDict):
+    """Latency and usage of a completed task."""
+
+    task: str
+    agent: str
+    model: str
+    latency_seconds: Optional[float]
+    requests: int
+    prompt_tokens: int
+    cached_prompt_tokens: int
+    completion_tokens: int
+    cost_usd: Optional[float]
+    tool_calls: Dict[str, int]
+
+
+def _on_task_started(source: object, event: TaskStartedEvent) -> None:
+    if event.task is not None:
+        with _lock:
+            _task_start_times[str(event.task.id)] = event.timestamp
+
+
+def register_stage_metrics_listener() -> None:
+    """Subscribe to task start events. Safe to call more than once."""
+    global _listener_registered
+    with _lock:
+        if not _listener_registered:
+            crewai_event_bus.register_handler(TaskStartedEvent, _on_task_started)
+            _listener_registered = True
+
+
+def get_model_pricing(model: str) -> Optional[Tuple[float, float, float]]:
+    """Look up the (input, cached input, output) price per 1M tokens of a model.
+
+    Provider prefixes ('openai/') and dated snapshots ('gpt-4o-2024-08-06')
+    resolve to the base model.
+
+    Returns:
+        The pricing tuple, or None if the model is not in MODEL_PRICING.
+    """
+    name = model.split("/")[-1]
+    if name in MODEL_PRICING:
+        return MODEL_PRICING[name]
+
+    candidates = [base for base in MODEL_PRICING if name.startswith(f"{base}-")]
+    return MODEL_PRICING[max(candidates, key=len)] if candidates else None
+
+
+def estimate_cost(
+    model: str,
+    prompt_tokens: int,
+    cached_prompt_tokens: int,
+    completion_tokens: int
+) -> Optional[float]:
+    """Estimate the USD cost of a token usage, or None for unknown models."""
+    pricing = get_model_pricing(model)
+    if pricing is None:
+        return None
+
+    input_price, cached_price, output_price = pricing
+    uncached_tokens = max(prompt_tokens - cached_prompt_tokens, 0)
+    return (
+        uncached_tokens * input_price
+        + cached_prompt_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1_000_000
+
+
+def load_stage_metrics(metrics_file: Path = STAGE_METRICS_FILE) -> List[StageMetrics]:
+    """Load the recorded stage metrics, in completion order."""
+    if not metrics_file.exists():
+        return []
+    try:
+        with open(metrics_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Failed to read stage metrics: {e}")
+        return []
+
+
+def record_stage_metrics(
+    task: Task,
+    output: TaskOutput,
+    metrics_file: Path = STAGE_METRICS_FILE
+) -> StageMetrics:
+    """Record the latency and usage of a completed task.
+
+    Args:
+        task: The completed task. Its agent must have a dedicated LLM and
+            dedicated instances of the tools whose calls are counted.
+        output: Output of the completed task.
+        metrics_file: JSON file the metrics are appended to.
+
+    Returns:
+        The recorded metrics.
+    """
+    llm = task.agent.llm
+    usage = llm.get_token_usage_summary()
+
+    with _lock:
+        started_at = _task_start_times.pop(str(task.id), None)
+    latency = (
+        round((datetime.now(timezone.utc) - started_at).total_seconds(), 2)
+        if started_at else None
+    )
+
+    metrics = StageMetrics(
+        task=output.name or task.name,
+        agent=output.agent,
+        model=llm.model,
+        latency_seconds=latency,
+        requests=usage.successful_requests,
+        prompt_tokens=usage.prompt_tokens,
+        cached_prompt_tokens=usage.cached_prompt_tokens,
+        completion_tokens=usage.completion_tokens,
+        cost_usd=estimate_cost(
+            llm.model, usage.prompt_tokens, usage.cached_prompt_tokens, usage.completion_tokens
+        ),
+        # Tools that count their own runs (e.g. the word counter)
+        tool_calls={
+            tool.name: tool.call_count
+            for tool in task.agent.tools or []
+            if hasattr(tool, 'call_count')
+        }
+    )
+
+    all_metrics = [m for m in load_stage_metrics(metrics_file) if m['task'] != metrics['task']]
+    all_metrics.append(metrics)
+    try:
+        metrics_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(metrics_file, 'w', encoding='utf-8') as f:
+            json.dump(all_metrics, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Failed to write stage metrics: {e}")
+
+    logger.info(
+        f"{metrics['task']} on {metrics['model']}: {latency}s, "
+        f"{usage.prompt_tokens}+{usage.completion_tokens} tokens "
+        f"({usage.cached_prompt_tokens} prompt tokens cached)"
+        + "".join(f", {name}: {calls} calls" for name, calls in metrics['tool_calls'].items())
+    )
+    return metrics
@@ -0,0 +1,101 @@
+"""Live output relay for streamed agent completions.
+
+CrewAI emits an LLMStreamChunkEvent for every token received from a streaming
+LLM. The relay collects the chunks of the streamed tasks (resume writer and
+fact checker) and mirrors them to .crewai_temp/live_output.md, which the
+Streamlit page polls to render the resume while the task is still running.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+
+from .constants import LIVE_OUTPUT_FILE, STREAMED_TASKS, STREAM_FINAL_ANSWER_MARKER
+
+logger = logging.getLogger(__name__)
+
+_relay: Optional["LiveOutputRelay"] = None
+_relay_lock = threading.Lock()
+
+
+class LiveOutputRelay:
+    """Mirror streamed LLM tokens of selected tasks to a file.
+
+    The file is truncated whenever chunks start arriving for a different task,
+    so it always holds the stream of the task currently running; every chunk
+    is appended to it.
+    """
+
+    def __init__(
+        self,
+        output_file: Path = LIVE_OUTPUT_FILE,
+        task_names: Iterable[str] = STREAMED_TASKS
+    ) -> None:
+        """Initialize the relay.
+
+        Args:
+            output_file: File the streamed text is written to.
+            task_names: Names of the tasks whose stream should be relayed.
+        """
+        self.output_file = output_file
+        self.task_names = frozenset(task_names)
+        self._task_name: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def register(self) -> None:
+        """Subscribe the relay to CrewAI's stream chunk events."""
+        crewai_event_bus.register_handler(LLMStreamChunkEvent, self._on_chunk)
+
+    def _on_chunk(self, source: object, event: LLMStreamChunkEvent) -> None:
+        """Append a streamed chunk to the file, starting it over for a new task."""
+        task_name = getattr(event, "task_name", None)
+        if task_name not in self.task_names or not event.chunk:
+            return
+
+        with self._lock:
+            new_task = task_name != self._task_name
+            self._task_name = task_name
+            try:
+                self.output_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.output_file, 'w' if new_task else 'a', encoding='utf-8') as f:
+                    f.write(event.chunk)
+            except OSError as e:
+                logger.warning(f"Failed to write live output: {e}")
+
+
+def register_live_output_relay() -> LiveOutputRelay:
+    """Register the process-wide live output relay.
+
+    Safe to call more than once; the relay is only subscribed the first time.
+
+    Returns:
+        The registered LiveOutputRelay instance.
+    """
+    global _relay
+    with _relay_lock:
+        if _relay is None:
+            _relay = LiveOutputRelay()
+            _relay.register()
+        return _relay
+
+
+def extract_live_markdown(stream_text: str) -> Optional[str]:
+    """Extract the renderable markdown from a raw agent stream.
+
+    Agents stream their reasoning ("Thought:", "Action:") before the final
+    answer. Once the final answer marker has been streamed, everything after
+    it is the resume markdown.
+
+    Args:
+        stream_text: Raw streamed text of the current task.
+
+    Returns:
+        Markdown following the final answer marker, or None if the agent has
+        not started its final answer yet.
+    """
+    if STREAM_FINAL_ANSWER_MARKER not in stream_text:
+        return None
+    return stream_text.rsplit(STREAM_FINAL_ANSWER_MARKER, 1)[1].strip()
@@ -4,15 +4,32 @@ Provides a wrapper function to run the crew with custom parameters.
 Logs are written to .crewai_temp/crew_logs.txt by CrewAI's output_log_file feature.
 """
 
+import json
 import os
 import shutil
 from pathlib import Path
-from typing import Optional, TypedDict
+from typing import Any, Dict, Optional, Tuple, TypedDict, Union
 
-from resume_refiner_crew.constants import KNOWLEDGE_DIR, CREWAI_TEMP_DIR, FIXTURES_DIR
+from resume_refiner_crew.ats_coverage import write_ats_coverage
+from resume_refiner_crew.checkpoint import (
+    fork_run,
+    mark_run_status,
+    read_run_input,
+    restore_run_outputs,
+    start_run,
+)
+from resume_refiner_crew.constants import (
+    KNOWLEDGE_DIR,
+    CREWAI_TEMP_DIR,
+    FIXTURES_DIR,
+    JOB_DESCRIPTION_STATS_FILE,
+)
 from resume_refiner_crew.crew import ResumeRefinerCrew
+from resume_refiner_crew.job_description import preprocess_job_description
+from resume_refiner_crew.report import get_report_mode
+from resume_refiner_crew.run_config import RunConfig
 from resume_refiner_crew.tools.latex_generator import generate_resume_pdf_from_json
-from resume_refiner_crew.utils import setup_clean_storage, simulate_crew_execution, temporary_env
+from resume_refiner_crew.utils import setup_clean_storage, simulate_crew_execution
 from resume_refiner_crew.validation import (
     validate_api_key,
     validate_model_name,
@@ -22,6 +39,10 @@ from resume_refiner_crew.validation import (
 )
 
 
+RESUME_INPUT_FILENAME = "CV.pdf"
+JOB_DESCRIPTION_INPUT_FILENAME = "job_description.txt"
+
+
 class CrewResult(TypedDict):
     """Result of crew execution."""
 
@@ -29,6 +50,7 @@ class CrewResult(TypedDict):
     error: Optional[str]
     pdf_path: Optional[str]
     output_dir: str
+    run_id: Optional[str]
 
 
 def _validate_inputs(
@@ -75,32 +97,54 @@ def _run_developer_mode() -> None:
     simulate_crew_execution()
 
 
+def _write_knowledge_inputs(resume_pdf_bytes: bytes, job_description: str) -> Tuple[Path, Path]:
+    """Write the resume PDF and job description to the knowledge folder.
+
+    Unless PREPROCESS_JOB_DESCRIPTION is false, boilerplate is stripped from
+    the job description first, and the original and reduced sizes are
+    written to JOB_DESCRIPTION_STATS_FILE.
+
+    Returns:
+        Paths of the written resume PDF and job description.
+    """
+    KNOWLEDGE_DIR.mkdir(exist_ok=True)
+    resume_path = KNOWLEDGE_DIR / RESUME_INPUT_FILENAME
+    job_desc_path = KNOWLEDGE_DIR / JOB_DESCRIPTION_INPUT_FILENAME
+
+    if os.getenv("PREPROCESS_JOB_DESCRIPTION", "true").lower() == "true":
+        job_description, stats = preprocess_job_description(job_description)
+        JOB_DESCRIPTION_STATS_FILE.write_text(json.dumps(stats, indent=2), encoding='utf-8')
+
+    resume_path.write_bytes(resume_pdf_bytes)
+    job_desc_path.write_text(job_description, encoding='utf-8')
+    return resume_path, job_desc_path
+
+
 def _run_production_mode(
-    resume_pdf_bytes: bytes,
-    job_description: str,
-    target_words: int,
-    enable_report: bool,
+    resume_path: Path,
+    job_desc_path: Path,
+    run_config: RunConfig,
+    enable_report: Union[bool, str],
     enable_fact_check: bool,
-    language: str
+    language: str,
+    run_id: str,
+    resume: bool = False
 ) -> None:
     """Execute crew in production mode with actual data.
 
     Args:
-        resume_pdf_bytes: PDF file content as bytes.
-        job_description: Job description text.
-        target_words: Target resume word count.
-        enable_report: Whether to generate a report.
+        resume_path: Path of the resume PDF in the knowledge folder.
+        job_desc_path: Path of the job description in the knowledge folder.
+        run_config: API key, model, word target and pipeline options of the run.
+        enable_report: Report mode ('off', 'local' or 'llm'), or a boolean.
         enable_fact_check: Whether to run fact checker.
+        language: Target language for the resume.
+        run_id: Run whose checkpoints record every completed task.
+        resume: Whether to restore the run's completed tasks instead of
+            executing them again.
     """
-    KNOWLEDGE_DIR.mkdir(exist_ok=True)
-    resume_path = KNOWLEDGE_DIR / "CV.pdf"
-    job_desc_path = KNOWLEDGE_DIR / "job_description.txt"
-
-    resume_path.write_bytes(resume_pdf_bytes)
-    job_desc_path.write_text(job_description, encoding='utf-8')
-
     inputs = {
-        'TARGET_RESUME_WORDS': str(target_words),
+        'TARGET_RESUME_WORDS': str(run_config.target_words),
         'RESUME_PDF_PATH': str(resume_path),
         'JOB_DESCRIPTION_PATH': str(job_desc_path),
         'TARGET_LANGUAGE': language
@@ -108,6 +152,8 @@ def _run_production_mode(
 
     setup_clean_storage()
     CREWAI_TEMP_DIR.mkdir(parents=True, exist_ok=True)
+    if resume:
+        restore_run_outputs(run_id)
 
     # Note: TextFileKnowledgeSource prepends "knowledge/" to job_description_path
     # but PDFSearchTool does not prepend to resume_pdf_path
@@ -115,9 +161,37 @@ def _run_production_mode(
         job_description_path="job_description.txt",
         resume_pdf_path="knowledge/CV.pdf",
         enable_report=enable_report,
-        enable_fact_check=enable_fact_check
+        enable_fact_check=enable_fact_check,
+        run_id=run_id,
+        run_config=run_config
     ).crew()
-    crew.kickoff(inputs=inputs)
+    if crew.tasks:
+        crew.kickoff(inputs=inputs)
+
+
+def _run_inputs(target_words: int, language: str) -> Dict[str, str]:
+    """Kickoff parameters recorded in the run manifest."""
+    return {
+        'TARGET_RESUME_WORDS': str(target_words),
+        'TARGET_LANGUAGE': language
+    }
+
+
+def _run_options(
+    model: str,
+    enable_report: Union[bool, str],
+    enable_fact_check: bool,
+    model_preset: Optional[str],
+    pipeline_profile: Optional[str]
+) -> Dict[str, Any]:
+    """Crew options recorded in the run manifest."""
+    return {
+        'model': model,
+        'model_preset': model_preset,
+        'pipeline_profile': pipeline_profile,
+        'enable_report': get_report_mode(enable_report),
+        'enable_fact_check': enable_fact_check
+    }
 
 
 def run_crew_with_params(
@@ -126,12 +200,16 @@ def run_crew_with_params(
     api_key: str,
     model: str,
     target_words: int,
-    enable_report: bool = True,
+    enable_report: Union[bool, str] = True,
     enable_fact_check: bool = True,
     include_summary: bool = True,
     language: str = "Auto",
     header_override: bool = False,
-    header_items: list = None
+    header_items: list = None,
+    resume_run: Optional[str] = None,
+    model_preset: Optional[str] = None,
+    pipeline_profile: Optional[str] = None,
+    request_priority: str = 'interactive'
 ) -> CrewResult:
     """Run the Resume Refiner Crew with custom parameters.
 
@@ -143,61 +221,173 @@ def run_crew_with_params(
         api_key: OpenAI API key.
         model: OpenAI model name (e.g., 'gpt-5-mini').
         target_words: Target resume word count.
-        enable_report: Whether to generate a report.
+        enable_report: Report mode ('off', 'local' or 'llm'), or a boolean.
         enable_fact_check: Whether to run fact checker.
         include_summary: Whether to include summary section in output.
         language: Target language for the resume ("Auto", "English", "Spanish").
         header_override: Whether to override the contact info header.
         header_items: List of custom header items (prefix, text, url).
+        resume_run: Identifier of a failed run to resume. Tasks it already
+            completed are reloaded from checkpoints instead of re-executed.
+        model_preset: Model routing preset ("single", "balanced", "turbo");
+            defaults to MODEL_PRESET.
+        pipeline_profile: Pipeline profile ("standard" or "fast");
+            defaults to PIPELINE_PROFILE.
+        request_priority: Rate-limit queue priority of the run's requests
+            ('interactive' for the web interface, 'batch' for batch runs).
 
     Returns:
         CrewResult dictionary with execution results.
     """
+    run_id = resume_run
     try:
         _validate_inputs(resume_pdf_bytes, job_description, api_key, model, target_words)
 
-        with temporary_env(
-            OPENAI_API_KEY=api_key,
-            OPENAI_MODEL=model,
-            TARGET_RESUME_WORDS=str(target_words)
-        ):
-            if _is_developer_mode():
-                _run_developer_mode()
-            else:
+        # The key, model and word target are passed to the crew rather than
+        # set in os.environ, so concurrent sessions keep their own settings
+        run_config = RunConfig.from_env(
+            api_key=api_key,
+            model=model,
+            target_words=target_words,
+            model_preset=model_preset,
+            pipeline_profile=pipeline_profile,
+            request_priority=request_priority
+        )
+
+        if _is_developer_mode():
+            _run_developer_mode()
+        else:
+            resume_path, job_desc_path = _write_knowledge_inputs(
+                resume_pdf_bytes, job_description
+            )
+            run_id = start_run(
+                inputs=_run_inputs(target_words, language),
+                options=_run_options(
+                    model, enable_report, enable_fact_check, model_preset, pipeline_profile
+                ),
+                input_files=[resume_path, job_desc_path],
+                resume_run=resume_run
+            )
+            try:
                 _run_production_mode(
-                    resume_pdf_bytes,
-                    job_description,
-                    target_words,
+                    resume_path,
+                    job_desc_path,
+                    run_config,
                     enable_report,
                     enable_fact_check,
-                    language
+                    language,
+                    run_id=run_id,
+                    resume=resume_run is not None
                 )
+            except Exception as e:
+                mark_run_status(run_id, 'failed', str(e))
+                raise
+            mark_run_status(run_id, 'completed')
+
+        write_ats_coverage()
+        pdf_path = generate_resume_pdf_from_json(
+            include_summary=include_summary,
+            header_override=header_override,
+            header_items=header_items
+        )
 
-            pdf_path = generate_resume_pdf_from_json(
-                include_summary=include_summary,
-                header_override=header_override,
-                header_items=header_items
+        if pdf_path:
+            return CrewResult(
+                success=True,
+                error=None,
+                pdf_path=pdf_path,
+                output_dir='output',
+                run_id=run_id
+            )
+        else:
+            return CrewResult(
+                success=False,
+                error='PDF generation failed',
+                pdf_path=None,
+                output_dir='output',
+                run_id=run_id
             )
 
-            if pdf_path:
-                return CrewResult(
-                    success=True,
-                    error=None,
-                    pdf_path=pdf_path,
-                    output_dir='output'
-                )
-            else:
-                return CrewResult(
-                    success=False,
-                    error='PDF generation failed',
-                    pdf_path=None,
-                    output_dir='output'
-                )
+    except Exception as e:
+        return CrewResult(
+            success=False,
+            error=f"An error occurred: {str(e)}",
+            pdf_path=None,
+            output_dir='output',
+            run_id=run_id
+        )
+
+
+def rerun_crew_with_params(
+    previous_run_id: str,
+    api_key: str,
+    model: str,
+    target_words: int,
+    enable_report: Union[bool, str] = True,
+    enable_fact_check: bool = True,
+    include_summary: bool = True,
+    language: str = "Auto",
+    header_override: bool = False,
+    header_items: list = None,
+    model_preset: Optional[str] = None,
+    pipeline_profile: Optional[str] = None
+) -> CrewResult:
+    """Re-run a previous run with changed parameters, executing only affected tasks.
+
+    The resume PDF and job description are taken from the previous run. Tasks
+    that do not depend on the changed parameters (e.g. parsing, job analysis and
+    optimization when only the word target or language changes) are reused from
+    its checkpoints; the rest of the pipeline is executed in a new run.
+
+    Args:
+        previous_run_id: Identifier of the run to start from.
+        api_key: OpenAI API key.
+        model: OpenAI model name, used for the re-executed tasks.
+        target_words: Target resume word count.
+        enable_report: Report mode ('off', 'local' or 'llm'), or a boolean.
+        enable_fact_check: Whether to run fact checker.
+        include_summary: Whether to include summary section in output.
+        language: Target language for the resume ("Auto", "English", "Spanish").
+        header_override: Whether to override the contact info header.
+        header_items: List of custom header items (prefix, text, url).
+        model_preset: Model routing preset, used for the re-executed tasks.
+        pipeline_profile: Pipeline profile, used for the re-executed tasks.
 
+    Returns:
+        CrewResult dictionary with execution results.
+    """
+    try:
+        run_id = fork_run(
+            previous_run_id,
+            inputs=_run_inputs(target_words, language),
+            options=_run_options(
+                model, enable_report, enable_fact_check, model_preset, pipeline_profile
+            )
+        )
+        resume_pdf_bytes = read_run_input(run_id, RESUME_INPUT_FILENAME)
+        job_description = read_run_input(run_id, JOB_DESCRIPTION_INPUT_FILENAME).decode('utf-8')
     except Exception as e:
         return CrewResult(
             success=False,
             error=f"An error occurred: {str(e)}",
             pdf_path=None,
-            output_dir='output'
+            output_dir='output',
+            run_id=None
         )
+
+    return run_crew_with_params(
+        resume_pdf_bytes=resume_pdf_bytes,
+        job_description=job_description,
+        api_key=api_key,
+        model=model,
+        target_words=target_words,
+        enable_report=enable_report,
+        enable_fact_check=enable_fact_check,
+        include_summary=include_summary,
+        language=language,
+        header_override=header_override,
+        header_items=header_items,
+        resume_run=run_id,
+        model_preset=model_preset,
+        pipeline_profile=pipeline_profile
+    )
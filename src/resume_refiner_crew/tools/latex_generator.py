@@ -21,6 +21,7 @@ from ..constants import (
     JOB_ANALYSIS_FILE,
     LATEX_VSPACE_SECTION,
 )
+from ..skill_taxonomy import SkillTrie, get_skill_taxonomy
 from ..utils import sanitize_for_filename
 
 logger = logging.getLogger(__name__)
@@ -126,18 +127,37 @@ def format_section_title(title: str) -> str:
     return formatted
 
 
-def bold_keywords(text: str, keywords: List[str]) -> str:
+def _symbol_span(text: str, start: int, end: int, keyword: str, position: int) -> Tuple[int, int]:
+    """Widen a keyword match over the symbols the keyword starts or ends with.
+
+    Matches cover words only, so '40%' or '$2M' would be bolded without
+    their '%' or '$'.
+    """
+    prefix = re.match(r"[^\w\s]*", keyword).group()
+    suffix = re.search(r"[^\w\s]*$", keyword).group()
+    if prefix and start - len(prefix) >= position and text[start - len(prefix):start] == prefix:
+        start -= len(prefix)
+    if suffix and text[end:end + len(suffix)] == suffix:
+        end += len(suffix)
+    return start, end
+
+
+def bold_keywords(text: str, keywords: List[str], matcher: Optional[SkillTrie] = None) -> str:
     """
     Apply bold formatting to specific keywords in text.
 
-    Uses a placeholder approach to avoid regex/escaping issues:
-    1. Find keywords in original text and replace with placeholders
-    2. Escape the entire text (placeholders remain safe)
-    3. Replace placeholders with \\textbf{escaped_keyword}
+    Keywords are found in a single pass over the text with a skill taxonomy
+    matcher, so aliases of a keyword are bolded too ("pytorch" or "Torch" for
+    "PyTorch", "CV" for "Computer Vision") and the longest keyword wins where
+    two overlap. Each keyword is bolded at its first occurrence, with the
+    symbols it is written with around its words ("40%", "$2M"); the text
+    around the matches and the matches themselves are escaped separately.
 
     Args:
         text: The text to process
         keywords: List of keywords to make bold
+        matcher: Matcher of the keywords, to reuse across texts; built from
+            keywords when omitted
 
     Returns:
         Text with keywords wrapped in \\textbf{}
@@ -145,42 +165,21 @@ def bold_keywords(text: str, keywords: List[str]) -> str:
     if not keywords:
         return escape_latex(text)
 
-    # Work with original unescaped text
-    result = text
-
-    # Sort keywords by length (longest first) to avoid partial matches
-    sorted_keywords = sorted(keywords, key=len, reverse=True)
-
-    # Replace keywords with unique placeholders
-    placeholders = {}
-    for i, keyword in enumerate(sorted_keywords):
-        placeholder = f"<<<BOLD{i}>>>"
-
-        # Find keyword (case-insensitive)
-        pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-        match = pattern.search(result)
-
-        if match:
-            # Get the actual matched text (preserves original case)
-            matched_text = match.group()
-            # Replace with placeholder (only first occurrence)
-            result = result.replace(matched_text, placeholder, 1)
-            # Store mapping
-            placeholders[placeholder] = matched_text
-
-    # Now escape the entire text (placeholders are safe from escaping)
-    result = escape_latex(result)
-
-    # Replace placeholders with bolded, escaped keywords
-    for placeholder, original_keyword in placeholders.items():
-        # Escape the original keyword
-        escaped_keyword = escape_latex(original_keyword)
-        # Create bold version
-        bolded = f"\\textbf{{{escaped_keyword}}}"
-        # Replace placeholder
-        result = result.replace(placeholder, bolded)
+    matcher = matcher or get_skill_taxonomy().matcher(keywords)
+    parts = []
+    position = 0
+    bolded = set()
+    for match in matcher.find(text):
+        if match.value in bolded:
+            continue
+        bolded.add(match.value)
+        start, end = _symbol_span(text, match.start, match.end, match.value, position)
+        parts.append(escape_latex(text[position:start]))
+        parts.append(f"\\textbf{{{escape_latex(text[start:end])}}}")
+        position = end
+    parts.append(escape_latex(text[position:]))
 
-    return result
+    return "".join(parts)
 
 
 def generate_work_experience_section(experiences: List[Dict], language: str = "English") -> str:
@@ -217,10 +216,11 @@ def generate_work_experience_section(experiences: List[Dict], language: str = "E
 
         # Achievements as bullet points
         if achievements:
+            matcher = get_skill_taxonomy().matcher(keywords)
             latex += r"\begin{itemize}[noitemsep, topsep=0pt, partopsep=0pt, parsep=0pt]" + "\n"
             for achievement in achievements:
                 # Apply bold to keywords
-                formatted_achievement = bold_keywords(achievement, keywords)
+                formatted_achievement = bold_keywords(achievement, keywords, matcher)
                 latex += f"    \\item {formatted_achievement}\n"
             latex += r"\end{itemize}" + "\n"
 
@@ -1,15 +1,22 @@
 """Word Counter Tool for Resume Writer.
 
 This tool counts words in text and checks if the count is within an acceptable
-range of the target word count. The target is automatically read from the
-TARGET_RESUME_WORDS environment variable.
+range of the target word count. The target is the word target of the run,
+set when the tool is created (see run_config).
+
+Markdown syntax (heading marks, bullets, emphasis, link targets) is not
+counted. Besides the total, the tool reports the word count of every '##'
+section and bullet, and proposes a per-section budget that adds up to the
+target, so agents can adjust only the sections that need it instead of
+rewriting the whole resume on every iteration.
 """
 
-import os
-from typing import Any, Dict, Type
+import logging
+import re
+from typing import Any, Dict, List, Tuple, Type
 
 from crewai.tools import BaseTool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from ..constants import (
     DEFAULT_TARGET_WORDS,
@@ -18,6 +25,67 @@ from ..constants import (
 )
 from ..validation import validate_target_words
 
+logger = logging.getLogger(__name__)
+
+# Section holding the lines above the first '##' heading (name and contact)
+HEADER_SECTION = "Header"
+# Number of longest bullets listed as candidates to shorten
+LONGEST_BULLETS_SHOWN = 5
+
+_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_MARKUP_RE = re.compile(r"^\s*(?:#{1,6}\s+|[-*+]\s+|\d+[.)]\s+|>\s*)")
+_BULLET_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+_WORD_RE = re.compile(r"\w")
+
+
+def strip_markdown(line: str) -> str:
+    """Remove markdown syntax from a line, keeping its visible text."""
+    line = _LINK_RE.sub(r"\1", line)
+    line = _MARKUP_RE.sub("", line)
+    return re.sub(r"[*_`|]+", " ", line)
+
+
+def count_words(text: str) -> int:
+    """Count the visible words of markdown text; symbols alone are not words."""
+    return sum(
+        1
+        for line in text.splitlines()
+        for token in strip_markdown(line).split()
+        if _WORD_RE.search(token)
+    )
+
+
+def split_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """Split a markdown resume into (title, lines) per '##' section.
+
+    Lines above the first '##' heading form the HEADER_SECTION.
+    """
+    sections: List[Tuple[str, List[str]]] = [(HEADER_SECTION, [])]
+    for line in text.splitlines():
+        if line.startswith("## "):
+            sections.append((line[3:].strip(), []))
+        else:
+            sections[-1][1].append(line)
+    return [(title, lines) for title, lines in sections if title != HEADER_SECTION or any(lines)]
+
+
+def allocate_section_budget(section_words: Dict[str, int], target_words: int) -> Dict[str, int]:
+    """Distribute the target word count over sections, proportionally to their size.
+
+    The header (name and contact) is kept as is; the other sections are
+    scaled so that all sections add up to the target. Text without '##'
+    sections is all header, and is scaled as a whole.
+    """
+    fixed = section_words.get(HEADER_SECTION, 0)
+    flexible = sum(section_words.values()) - fixed
+    if not flexible:
+        return {title: target_words if words else 0 for title, words in section_words.items()}
+    scale = max(target_words - fixed, 0) / flexible
+    return {
+        title: words if title == HEADER_SECTION else round(words * scale)
+        for title, words in section_words.items()
+    }
+
 
 class WordCounterInput(BaseModel):
     """Input schema for WordCounterTool."""
@@ -46,6 +114,16 @@ class WordCounterOutput(BaseModel):
         ),
     )
     message: str = Field(..., description="Human-readable explanation of the result")
+    sections: List[Dict[str, Any]] = Field(
+        ...,
+        description=(
+            "Per '##' section: word_count, suggested_words (budget that adds up to the "
+            "target), words_to_change and the word count of each bullet"
+        ),
+    )
+    longest_bullets: List[Dict[str, Any]] = Field(
+        ..., description="Longest bullets, the first candidates to shorten when too long"
+    )
 
 
 class WordCounterTool(BaseTool):
@@ -54,31 +132,48 @@ class WordCounterTool(BaseTool):
     name: str = "Word Counter and Target Checker"
     description: str = (
         "Counts the number of words in text and checks if it's within the target range. "
-        "The target word count is automatically read from the TARGET_RESUME_WORDS environment variable. "
-        "Returns word_count, target_word_count, is_within_target flag, and a message. "
+        "The target word count is set by the run configuration. "
+        "Returns word_count, target_word_count, is_within_target flag, and a message, plus "
+        "per-section word counts with a suggested word budget per section, and the longest "
+        "bullets. When the target is missed, adjust only the sections whose words_to_change "
+        "is not 0, by about that many words. "
         f"When is_within_target is True, the word count is within "
         f"{int(WORD_COUNT_TOLERANCE_MIN * 100)}%-{int(WORD_COUNT_TOLERANCE_MAX * 100)}% range. "
         "Use this tool to check if your resume meets the word count target. "
         "IMPORTANT: Only pass the text parameter - the target is read automatically from configuration."
     )
     args_schema: Type[BaseModel] = WordCounterInput
+    target_words: int = Field(
+        default=DEFAULT_TARGET_WORDS,
+        exclude=True,
+        description="Target word count of the run.",
+    )
+
+    _call_count: int = PrivateAttr(default=0)
+
+    @property
+    def call_count(self) -> int:
+        """Number of times the tool has been run."""
+        return self._call_count
 
     def _run(self, text: str) -> Dict[str, Any]:
         """Count words in text and check if within acceptable range of target.
 
-        The target word count is automatically read from TARGET_RESUME_WORDS
-        environment variable.
+        The target word count is the tool's target_words.
 
         Args:
             text: The text to count words in.
 
         Returns:
-            Dictionary with word_count, target_word_count, is_within_target, and message.
+            Dictionary with word_count, target_word_count, is_within_target,
+            message, sections and longest_bullets.
         """
-        target_words = int(os.getenv("TARGET_RESUME_WORDS", str(DEFAULT_TARGET_WORDS)))
+        target_words = self.target_words
         validate_target_words(target_words)
+        self._call_count += 1
 
-        word_count = len(text.split())
+        sections, bullets = self._count_sections(text)
+        word_count = sum(section["word_count"] for section in sections)
 
         min_acceptable = int(WORD_COUNT_TOLERANCE_MIN * target_words)
         max_acceptable = int(WORD_COUNT_TOLERANCE_MAX * target_words)
@@ -109,9 +204,58 @@ class WordCounterTool(BaseTool):
                 f"Consider removing irrelevant sections or rephrasing more concisely."
             )
 
+        budget = allocate_section_budget(
+            {section["section"]: section["word_count"] for section in sections},
+            target_words if not is_within_target else word_count
+        )
+        for section in sections:
+            section["suggested_words"] = budget[section["section"]]
+            section["words_to_change"] = section["suggested_words"] - section["word_count"]
+
+        changes = [
+            f"{section['section']} {section['words_to_change']:+d}"
+            for section in sorted(sections, key=lambda s: abs(s["words_to_change"]), reverse=True)
+            if section["words_to_change"]
+        ]
+        if changes:
+            message += f" Suggested changes per section: {', '.join(changes)}."
+
+        logger.info(
+            f"Word count check #{self._call_count}: {word_count}/{target_words} words"
+        )
+
         return {
             "word_count": word_count,
             "target_word_count": target_words,
             "is_within_target": is_within_target,
             "message": message,
+            "sections": sections,
+            "longest_bullets": sorted(bullets, key=lambda b: b["word_count"], reverse=True)[
+                :LONGEST_BULLETS_SHOWN
+            ],
         }
+
+    @staticmethod
+    def _count_sections(text: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Count the words of every section and bullet of a markdown resume."""
+        sections: List[Dict[str, Any]] = []
+        bullets: List[Dict[str, Any]] = []
+
+        for title, lines in split_sections(text):
+            bullet_counts = []
+            for line in lines:
+                if _BULLET_RE.match(line):
+                    words = count_words(line)
+                    bullet_counts.append(words)
+                    preview = " ".join(strip_markdown(line).split()[:8])
+                    bullets.append({"section": title, "bullet": preview, "word_count": words})
+
+            # The synthetic header has no heading line to count
+            heading_words = count_words(title) if title != HEADER_SECTION else 0
+            sections.append({
+                "section": title,
+                "word_count": count_words("\n".join(lines)) + heading_words,
+                "bullet_word_counts": bullet_counts,
+            })
+
+        return sections, bullets
@@ -5,10 +5,9 @@ import os
 import re
 import shutil
 import time
-from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Iterator, Optional
 
+from crewai import Crew
 from crewai.utilities.paths import db_storage_path
 
 from .constants import CREWAI_TEMP_DIR, OUTPUT_DIR, FIXTURES_DIR, MAX_FILENAME_LENGTH
@@ -64,6 +63,26 @@ def setup_clean_storage() -> None:
         raise
 
 
+def remove_crewai_storage() -> None:
+    """Delete CrewAI's knowledge base storage directory (see setup_clean_storage)."""
+    shutil.rmtree(db_storage_path(), ignore_errors=True)
+
+
+def reset_crew_memories(crew: Crew) -> None:
+    """Reset the memories and knowledge storage of a crew before it runs.
+
+    CrewAI refuses to reset knowledge that was never created, which is the
+    case when every knowledge file is inlined in the prompt (see knowledge),
+    so knowledge is only reset when the crew or one of its agents has some.
+    """
+    agent_knowledge = any(agent.knowledge is not None for agent in crew.agents)
+    if crew.knowledge is not None or agent_knowledge:
+        crew.reset_memories(command_type='knowledge')
+    crew.reset_memories(command_type='all')
+    if agent_knowledge:
+        crew.reset_memories(command_type='agent_knowledge')
+
+
 def simulate_crew_execution() -> None:
     """Simulate crew execution for developer mode.
 
@@ -148,40 +167,6 @@ def sanitize_for_filename(text: str, max_length: int = MAX_FILENAME_LENGTH) -> s
     return sanitized[:max_length] if len(sanitized) > max_length else sanitized
 
 
-@contextmanager
-def temporary_env(**kwargs: Any) -> Iterator[None]:
-    """Context manager for temporary environment variables.
-
-    Sets environment variables for the duration of the context and restores
-    original values afterward.
-
-    Args:
-        **kwargs: Environment variable name-value pairs to set temporarily.
-
-    Yields:
-        None
-
-    Examples:
-        >>> with temporary_env(OPENAI_MODEL="gpt-4", TARGET_WORDS="600"):
-        ...     # Environment variables are set
-        ...     pass
-        # Original values are restored
-    """
-    old_env: Dict[str, Optional[str]] = {}
-    for key, value in kwargs.items():
-        old_env[key] = os.environ.get(key)
-        os.environ[key] = str(value)
-
-    try:
-        yield
-    finally:
-        for key, old_value in old_env.items():
-            if old_value is None:
-                os.environ.pop(key, None)
-            else:
-                os.environ[key] = old_value
-
-
 def validate_path_exists(path: Path, file_type: str = "file") -> None:
     """Validate that a path exists.
 
@@ -9,6 +9,7 @@ import json
 import multiprocessing
 import os
 import re
+import threading
 import time
 import zipfile
 from io import BytesIO
@@ -17,8 +18,23 @@ from pathlib import Path
 import streamlit as st
 from dotenv import load_dotenv
 
-from src.resume_refiner_crew.constants import TASKS_INFO, TOTAL_TASKS
-from src.resume_refiner_crew.streamlit_runner import run_crew_with_params
+from src.resume_refiner_crew.constants import (
+    DEFAULT_MODEL_PRESET,
+    DEFAULT_PIPELINE_PROFILE,
+    LIVE_OUTPUT_FILE,
+    MODEL_PRESETS,
+    PIPELINE_PROFILES,
+    REPORT_MODES,
+    TASKS_INFO,
+    TOTAL_TASKS,
+)
+from src.resume_refiner_crew.ats_coverage import load_ats_coverage
+from src.resume_refiner_crew.rate_limiter import queue_metrics
+from src.resume_refiner_crew.report import get_report_mode
+from src.resume_refiner_crew.single_flight import SingleFlight, submission_key
+from src.resume_refiner_crew.stage_metrics import load_stage_metrics
+from src.resume_refiner_crew.streaming import extract_live_markdown
+from src.resume_refiner_crew.streamlit_runner import rerun_crew_with_params, run_crew_with_params
 from src.resume_refiner_crew.tools.latex_generator import generate_resume_pdf_from_json, compile_latex_to_pdf, convert_latex_to_docx
 
 # Load environment variables
@@ -29,10 +45,20 @@ DEFAULT_TARGET_WORDS = 400
 MIN_TARGET_WORDS = 100
 MAX_TARGET_WORDS = 1000
 
-ENABLE_REPORTS = os.getenv("ENABLE_REPORTS", "true").lower() == "true"
+REPORT_MODE = get_report_mode()
+REPORT_MODE_LABELS = {
+    "off": "Off",
+    "local": "Template (no LLM)",
+    "llm": "Template + AI summary",
+}
 ENABLE_FACT_CHECK = os.getenv("ENABLE_FACT_CHECK", "true").lower() == "true"
+PIPELINE_PROFILE_LABELS = {
+    "standard": "Standard (separate fact check)",
+    "fast": "Fast (writer checks its own facts)",
+}
 INCLUDE_SUMMARY = os.getenv("INCLUDE_SUMMARY", "true").lower() == "true"
 DEFAULT_RESUME_LANGUAGE = os.getenv("DEFAULT_RESUME_LANGUAGE", "Auto")
+LIVE_PREVIEW_TAIL_CHARS = 1500
 
 # Custom Header Defaults
 HEADER_OVERRIDE_DEFAULT = os.getenv("HEADER_OVERRIDE_DEFAULT", "").lower() == "true"
@@ -99,8 +125,8 @@ def init_session_state():
         'result': None,
         'edited_tex': None,
         'original_tex': None,
-        'process': None,
-        'result_queue': None,
+        'flight': None,
+        'flight_key': None,
         'start_time': None,
         'elapsed_time': None,
         'show_logs': False,
@@ -146,8 +172,8 @@ def reset_session():
     st.session_state.result = None
     st.session_state.edited_tex = None
     st.session_state.original_tex = None
-    st.session_state.process = None
-    st.session_state.result_queue = None
+    st.session_state.flight = None
+    st.session_state.flight_key = None
     st.session_state.start_time = None
     st.session_state.elapsed_time = None
     st.session_state.show_logs = False
@@ -157,7 +183,7 @@ def reset_session():
     st.session_state.editor_key = 0
 
 
-def run_crew_process(resume_bytes, job_desc, api_key, model, target_words, result_queue, enable_report, enable_fact_check, include_summary, language, header_override, header_items):
+def run_crew_process(resume_bytes, job_desc, api_key, model, target_words, result_queue, enable_report, enable_fact_check, include_summary, language, header_override, header_items, resume_run=None, rerun_from=None, model_preset=None, pipeline_profile=None):
     """Run crew in a separate process.
 
     Args:
@@ -167,10 +193,33 @@ def run_crew_process(resume_bytes, job_desc, api_key, model, target_words, resul
         model: OpenAI model name.
         target_words: Target word count.
         result_queue: multiprocessing.Queue for result communication.
-        enable_report: Whether to generate a report.
+        enable_report: Report mode ('off', 'local' or 'llm').
         enable_fact_check: Whether to run fact checker.
         include_summary: Whether to include summary section in output.
+        resume_run: Identifier of a failed run to resume from its checkpoints.
+        rerun_from: Identifier of a previous run to re-run with the new
+            settings, executing only the tasks they affect.
+        model_preset: Model routing preset for the agents.
+        pipeline_profile: Pipeline profile ('standard' or 'fast').
     """
+    if rerun_from:
+        result = rerun_crew_with_params(
+            previous_run_id=rerun_from,
+            api_key=api_key,
+            model=model,
+            target_words=target_words,
+            enable_report=enable_report,
+            enable_fact_check=enable_fact_check,
+            include_summary=include_summary,
+            language=language,
+            header_override=header_override,
+            header_items=header_items,
+            model_preset=model_preset,
+            pipeline_profile=pipeline_profile
+        )
+        result_queue.put(result)
+        return
+
     result = run_crew_with_params(
         resume_pdf_bytes=resume_bytes,
         job_description=job_desc,
@@ -182,13 +231,52 @@ def run_crew_process(resume_bytes, job_desc, api_key, model, target_words, resul
         include_summary=include_summary,
         language=language,
         header_override=header_override,
-        header_items=header_items
+        header_items=header_items,
+        resume_run=resume_run,
+        model_preset=model_preset,
+        pipeline_profile=pipeline_profile
     )
 
     # Put result in queue for main process to retrieve
     result_queue.put(result)
 
 
+class RunFlight:
+    """Crew run in a background process, shared by every session that submitted it."""
+
+    def __init__(self, run_kwargs):
+        self.result_queue = multiprocessing.Queue()
+        # Process isolation = automatic resource cleanup
+        self.process = multiprocessing.Process(
+            target=run_crew_process,
+            kwargs={**run_kwargs, 'result_queue': self.result_queue}
+        )
+        self.result = None
+        self._lock = threading.Lock()
+        self.process.start()
+
+    def poll(self):
+        """Return the run's result once it has arrived (to every session that polls), else None."""
+        with self._lock:
+            if self.result is None and not self.result_queue.empty():
+                self.result = self.result_queue.get()
+
+                # Terminate the process to release all resources (ChromaDB connections, file handles, etc.)
+                if self.process.is_alive():
+                    self.process.terminate()
+                    self.process.join(timeout=5)
+                    # Force kill if it didn't terminate gracefully
+                    if self.process.is_alive():
+                        self.process.kill()
+            return self.result
+
+
+@st.cache_resource
+def get_run_flights():
+    """In-flight runs of this server by submission, so identical submissions share one run."""
+    return SingleFlight()
+
+
 def get_current_progress():
     """Parse crew logs to determine current progress.
 
@@ -205,12 +293,16 @@ def get_current_progress():
         "generate_resume_task"
     ]
     
-    if st.session_state.get('enable_fact_check', True):
+    # The fast profile has no separate fact check task
+    if (
+        st.session_state.get('enable_fact_check', True)
+        and st.session_state.get('pipeline_profile', DEFAULT_PIPELINE_PROFILE) == 'standard'
+    ):
         active_tasks.append("verify_resume_task")
         
     active_tasks.append("harvard_format_task")
     
-    if st.session_state.get('enable_report', True):
+    if st.session_state.get('enable_report', REPORT_MODE) != 'off':
         active_tasks.append("generate_report_task")
         
     total_tasks = len(active_tasks)
@@ -241,6 +333,23 @@ def get_current_progress():
     return (completed_count, total_tasks, agent_name, status_text, log_content)
 
 
+def get_live_output():
+    """Read the token stream relayed from the writer and fact checker agents.
+
+    Returns:
+        tuple: (markdown, raw_stream) where markdown is None until the agent
+        starts its final answer, or None if nothing has been streamed yet.
+    """
+    if not LIVE_OUTPUT_FILE.exists():
+        return None
+
+    raw_stream = LIVE_OUTPUT_FILE.read_text(encoding='utf-8')
+    if not raw_stream.strip():
+        return None
+
+    return extract_live_markdown(raw_stream), raw_stream
+
+
 def create_zip_archive():
     """Create a ZIP file with all output files."""
     output_dir = Path("output")
@@ -276,6 +385,10 @@ def show_optimization_report():
 # Determine if inputs should be disabled
 inputs_disabled = st.session_state.processing or st.session_state.completed
 
+# After a run, length/language/agent settings stay editable for a partial re-run
+rerun_run_id = (st.session_state.result or {}).get('run_id') if st.session_state.completed else None
+rerun_settings_disabled = st.session_state.processing or (st.session_state.completed and not rerun_run_id)
+
 # Job Description
 st.sidebar.subheader("1. Job Description")
 job_description = st.sidebar.text_area(
@@ -343,6 +456,21 @@ with st.sidebar.expander("⚙️ Options", expanded=False):
         disabled=inputs_disabled
     )
 
+    preset_options = list(MODEL_PRESETS)
+    try:
+        default_preset_index = preset_options.index(os.getenv("MODEL_PRESET", DEFAULT_MODEL_PRESET))
+    except ValueError:
+        default_preset_index = 0
+
+    model_preset = st.selectbox(
+        "Model routing",
+        options=preset_options,
+        index=default_preset_index,
+        help="'single' runs every agent on the chosen model. 'balanced' and 'turbo' run the "
+             "mechanical stages (PDF parsing, Harvard formatting) on a smaller, faster model",
+        disabled=rerun_settings_disabled
+    )
+
     # Target Word Count
     st.subheader("Target Word Count")
     target_words = st.number_input(
@@ -352,21 +480,41 @@ with st.sidebar.expander("⚙️ Options", expanded=False):
         value=int(os.getenv("TARGET_RESUME_WORDS", str(DEFAULT_TARGET_WORDS))),
         step=50,
         help="200 words for single page, 400-500 for two pages",
-        disabled=inputs_disabled
+        disabled=rerun_settings_disabled
     )
 
     st.subheader("Agents Configuration")
-    enable_report = st.checkbox(
-        "Generate report",
-        value=ENABLE_REPORTS,
-        help="Enable the Report Generator agent",
-        disabled=inputs_disabled
+    enable_report = st.selectbox(
+        "Report",
+        options=list(REPORT_MODES),
+        index=REPORT_MODES.index(REPORT_MODE),
+        format_func=REPORT_MODE_LABELS.get,
+        help="The report is rendered from the job analysis without an LLM; "
+             "'Template + AI summary' adds a short paragraph written by the Report Generator agent",
+        disabled=rerun_settings_disabled
     )
     enable_fact_check = st.checkbox(
         "Check facts",
         value=ENABLE_FACT_CHECK,
         help="Enable the Fact Checker agent",
-        disabled=inputs_disabled
+        disabled=rerun_settings_disabled
+    )
+    profile_options = list(PIPELINE_PROFILES)
+    try:
+        default_profile_index = profile_options.index(
+            os.getenv("PIPELINE_PROFILE", DEFAULT_PIPELINE_PROFILE)
+        )
+    except ValueError:
+        default_profile_index = 0
+
+    pipeline_profile = st.selectbox(
+        "Pipeline",
+        options=profile_options,
+        index=default_profile_index,
+        format_func=PIPELINE_PROFILE_LABELS.get,
+        help="'Fast' skips the separate Fact Checker pass: the Resume Writer verifies its "
+             "own claims against your resume. Fewer LLM requests, slightly less thorough",
+        disabled=rerun_settings_disabled
     )
 
     st.subheader("Resume Configuration")
@@ -391,7 +539,7 @@ with st.sidebar.expander("⚙️ Options", expanded=False):
         options=language_options,
         index=default_lang_index,
         help="Select the language for the generated resume. 'Auto' will infer the language from the job description (experimental).",
-        disabled=inputs_disabled
+        disabled=rerun_settings_disabled
     )
     
     # Custom Header Override
@@ -473,6 +621,62 @@ if not inputs_valid:
 else:
     st.sidebar.write("&nbsp;")
 
+
+def start_processing(resume_run=None, rerun_from=None):
+    """Start the crew in a background process with the current sidebar inputs.
+
+    Args:
+        resume_run: Identifier of a failed run to resume from its checkpoints.
+        rerun_from: Identifier of a previous run to re-run with changed settings.
+    """
+    reset_session()
+    st.session_state.processing = True
+    st.session_state.start_time = time.time()
+
+    # Store configuration in session state for progress tracking
+    st.session_state.enable_report = enable_report
+    st.session_state.enable_fact_check = enable_fact_check
+    st.session_state.pipeline_profile = pipeline_profile
+    st.session_state.include_summary = include_summary
+    st.session_state.language = language
+    st.session_state.header_override = header_override
+    # Deep copy header items to avoid reference issues
+    st.session_state.header_items_snapshot = [item.copy() for item in st.session_state.header_items] if header_override else []
+
+    run_kwargs = {
+        'resume_bytes': uploaded_file.getvalue(),
+        'job_desc': job_description,
+        'api_key': api_key,
+        'model': model,
+        'target_words': target_words,
+        'enable_report': enable_report,
+        'enable_fact_check': enable_fact_check,
+        'include_summary': include_summary,
+        'language': language,
+        'header_override': st.session_state.header_override,
+        'header_items': st.session_state.header_items_snapshot,
+        'resume_run': resume_run,
+        'rerun_from': rerun_from,
+        'model_preset': model_preset,
+        'pipeline_profile': pipeline_profile,
+    }
+
+    # A double click, or a resubmission of a run still in progress, joins that
+    # run in the background instead of starting another one
+    st.session_state.flight_key = submission_key(
+        run_kwargs['resume_bytes'],
+        job_description,
+        api_key,
+        **{name: value for name, value in run_kwargs.items() if name not in ('resume_bytes', 'job_desc', 'api_key')}
+    )
+    st.session_state.flight, _ = get_run_flights().join(
+        st.session_state.flight_key,
+        lambda: RunFlight(run_kwargs),
+        alive=lambda flight: flight.process.is_alive()
+    )
+    st.rerun()
+
+
 # Process Button
 if st.sidebar.button(
     "🚀 Process Resume",
@@ -482,43 +686,19 @@ if st.sidebar.button(
 ):
     # Safety check (should never be None due to button disabled state)
     if uploaded_file is not None:
-        reset_session()
-        st.session_state.processing = True
-        st.session_state.start_time = time.time()
-
-        # Create a queue for process communication
-        st.session_state.result_queue = multiprocessing.Queue()
-
-        # Store configuration in session state for progress tracking
-        st.session_state.enable_report = enable_report
-        st.session_state.enable_fact_check = enable_fact_check
-        st.session_state.include_summary = include_summary
-        st.session_state.include_summary = include_summary
-        st.session_state.language = language
-        st.session_state.header_override = header_override
-        # Deep copy header items to avoid reference issues
-        st.session_state.header_items_snapshot = [item.copy() for item in st.session_state.header_items] if header_override else []
-
-        # Start processing in background process (process isolation = automatic resource cleanup)
-        st.session_state.process = multiprocessing.Process(
-            target=run_crew_process,
-            args=(
-                uploaded_file.read(),
-                job_description,
-                api_key,
-                model,
-                target_words,
-                st.session_state.result_queue,
-                enable_report,
-                enable_fact_check,
-                include_summary,
-                language,
-                st.session_state.header_override,
-                st.session_state.header_items_snapshot
-            )
-        )
-        st.session_state.process.start()
-        st.rerun()
+        start_processing()
+    else:
+        st.error("No file uploaded")
+
+# Re-run Button (only the steps affected by the changed settings are executed)
+if rerun_run_id and st.sidebar.button(
+    "🔁 Re-run with new settings",
+    help="Reuses the parsed resume, job analysis and optimization of the last run; "
+         "only the steps affected by the word count, language or agent settings run again",
+    use_container_width=True
+):
+    if uploaded_file is not None:
+        start_processing(rerun_from=rerun_run_id)
     else:
         st.error("No file uploaded")
 
@@ -527,6 +707,51 @@ if st.sidebar.button("🔄 Start Over", disabled=not st.session_state.completed,
     reset_session()
     st.rerun()
 
+# Per-stage latency and cost of the current or last run
+stage_metrics = load_stage_metrics() if (st.session_state.processing or st.session_state.completed) else []
+if stage_metrics:
+    with st.sidebar.expander("⏱️ Stage breakdown", expanded=st.session_state.completed):
+        st.dataframe(
+            [
+                {
+                    "Stage": TASKS_INFO.get(m['task'], (0, m['task']))[1],
+                    "Model": m['model'],
+                    "Time (s)": m['latency_seconds'],
+                    "Tokens": m['prompt_tokens'] + m['completion_tokens'],
+                    "Cached": f"{m['cached_prompt_tokens'] / m['prompt_tokens']:.0%}" if m['prompt_tokens'] else None,
+                    "Cost ($)": round(m['cost_usd'], 4) if m['cost_usd'] is not None else None,
+                    "Tool calls": sum(m.get('tool_calls', {}).values()),
+                }
+                for m in stage_metrics
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
+        known_costs = [m['cost_usd'] for m in stage_metrics if m['cost_usd'] is not None]
+        total_latency = sum(m['latency_seconds'] or 0 for m in stage_metrics)
+        st.caption(f"Total: {total_latency:.0f}s, ~${sum(known_costs):.4f} (estimated from list prices)")
+
+# LLM request queues shared by every run on this machine (web sessions and batches)
+request_queues = queue_metrics()
+if request_queues:
+    with st.sidebar.expander("🚦 LLM request queue", expanded=False):
+        st.dataframe(
+            [
+                {
+                    "Model": q['model'],
+                    "Queued": sum(q['queued'].values()),
+                    "Interactive": q['queued'].get('interactive', 0),
+                    "Sent": q['requests_sent'],
+                    "Waited": q['requests_waited'],
+                    "Wait (s)": q['wait_seconds'],
+                    "429s": q['rate_limited'],
+                }
+                for q in request_queues
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
+
 
 # ===== MAIN CONTENT AREA =====
 
@@ -539,22 +764,15 @@ st.markdown("Transform your resume into a job-specific, ATS-optimized document")
 @st.fragment(run_every=1.0)
 def show_processing_progress():
     """Auto-updating fragment that displays processing progress."""
-    # Check if process has completed (checked every 1 second via fragment auto-refresh)
-    if st.session_state.result_queue and not st.session_state.result_queue.empty():
-        # Process finished - get result from queue
-        result = st.session_state.result_queue.get()
+    # Check if the run has completed (checked every 1 second via fragment auto-refresh)
+    result = st.session_state.flight.poll() if st.session_state.flight else None
+    if result is not None:
+        # Run finished - every session waiting for it gets the same result
+        get_run_flights().finish(st.session_state.flight_key, st.session_state.flight)
         st.session_state.result = result
         st.session_state.processing = False
         st.session_state.completed = True
 
-        # Terminate the process to release all resources (ChromaDB connections, file handles, etc.)
-        if st.session_state.process and st.session_state.process.is_alive():
-            st.session_state.process.terminate()
-            st.session_state.process.join(timeout=5)
-            # Force kill if it didn't terminate gracefully
-            if st.session_state.process.is_alive():
-                st.session_state.process.kill()
-
         # Store the elapsed time once when processing completes
         if st.session_state.start_time:
             st.session_state.elapsed_time = time.time() - st.session_state.start_time
@@ -578,6 +796,17 @@ def show_processing_progress():
     progress_value = completed / total_tasks
     st.progress(progress_value, text=f"**Working Agent: {agent_name} ({completed+1}/{total_tasks})**")
 
+    # Live resume preview, streamed token by token from the writer and fact checker
+    live_output = get_live_output()
+    if live_output is not None:
+        live_markdown, raw_stream = live_output
+        with st.expander("📄 Live resume preview", expanded=True):
+            if live_markdown:
+                st.markdown(live_markdown)
+            else:
+                st.caption("The agent is drafting and checking the word count...")
+                st.code(raw_stream[-LIVE_PREVIEW_TAIL_CHARS:], language=None, wrap_lines=True)
+
     # Checkbox to control log expansion (persists across fragment reruns)
     show_logs = st.checkbox("Show detailed logs", value=st.session_state.show_logs, key="show_logs_check")
     st.session_state.show_logs = show_logs
@@ -618,10 +847,33 @@ elif st.session_state.completed:
                 st.info(f"⏱️ Processing completed in {int(elapsed//60)}m {int(elapsed%60)}s")
 
         # OPTIMIZATION REPORT BUTTON
-        if st.session_state.get('enable_report', True):
+        if st.session_state.get('enable_report', REPORT_MODE) != 'off':
             if st.button("📊 View Optimization Report", use_container_width=True, type="secondary"):
                 show_optimization_report()
 
+        # ATS KEYWORD COVERAGE (checked locally against the final resume)
+        ats_coverage = load_ats_coverage()
+        if ats_coverage:
+            with st.expander(f"🎯 ATS keyword coverage: {ats_coverage['coverage']:.0f}%", expanded=False):
+                st.caption(
+                    f"{len(ats_coverage['matched_keywords'])} of {ats_coverage['total_keywords']} job keywords "
+                    f"found in {ats_coverage['resume_source']}"
+                )
+                if ats_coverage['missing_keywords']:
+                    st.markdown("**Missing:** " + ", ".join(ats_coverage['missing_keywords']))
+                st.dataframe(
+                    [
+                        {
+                            "Keyword": k['keyword'],
+                            "Found": "✅" if k['found'] else "❌",
+                            "Sections": ", ".join(dict.fromkeys(loc['section'] for loc in k['locations'])),
+                        }
+                        for k in ats_coverage['keywords']
+                    ],
+                    hide_index=True,
+                    use_container_width=True
+                )
+
         # Get PDF path and derive TeX path
         pdf_path_str = result.get('pdf_path')
         
@@ -802,6 +1054,12 @@ elif st.session_state.completed:
         - Try with a different model
         """)
 
+        # Completed tasks of the failed run are checkpointed and can be reused
+        failed_run_id = result.get('run_id') if result else None
+        if failed_run_id and uploaded_file is not None:
+            if st.button("⏯️ Resume from last completed step", type="primary"):
+                start_processing(resume_run=failed_run_id)
+
         if st.button("🔄 Retry", type="primary"):
             reset_session()
             st.rerun()
@@ -0,0 +1,61 @@
+"""Asyncio runner of crew batches."""
+
+import asyncio
+import os
+import time
+
+from resume_refiner_crew import async_runner
+from resume_refiner_crew.async_runner import AsyncCrewRunner, prune_workspaces
+from resume_refiner_crew.streamlit_runner import CrewResult
+
+
+def test_runs_are_queued_as_batch(tmp_path, monkeypatch):
+    submitted = []
+
+    async def run_in_slot(self, params):
+        submitted.append(params)
+        return CrewResult(success=True, error=None, pdf_path=None, output_dir="output", run_id=None)
+
+    monkeypatch.setattr(AsyncCrewRunner, "_run_in_slot", run_in_slot)
+    runner = AsyncCrewRunner(runs_dir=tmp_path)
+    asyncio.run(runner.run(b"%PDF", "Data Engineer", "sk-test", "gpt-4o-mini", 500))
+    asyncio.run(runner.run(b"%PDF", "ML Engineer", "sk-test", "gpt-4o-mini", 500, request_priority="interactive"))
+
+    assert [params["request_priority"] for params in submitted] == ["batch", "interactive"]
+
+
+def test_only_the_newest_workspaces_are_kept(tmp_path):
+    now = time.time()
+    for age, name in enumerate(["newest", "newer", "older", "oldest"]):
+        (tmp_path / name).mkdir()
+        os.utime(tmp_path / name, (now - age, now - age))
+
+    prune_workspaces(tmp_path, keep=2)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["newer", "newest"]
+
+
+def test_runs_share_the_rate_limit_store_of_the_runner(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LLM_RATE_LIMIT_STORE", "rate_limits.sqlite3")
+    children = []
+
+    class Process:
+        returncode = 1
+
+        async def communicate(self, stdin):
+            return b"", b""
+
+    async def create_subprocess_exec(*args, cwd, env, **kwargs):
+        children.append((cwd, env))
+        return Process()
+
+    monkeypatch.setattr(async_runner.asyncio, "create_subprocess_exec", create_subprocess_exec)
+    (tmp_path / "workspace").mkdir()
+    runner = AsyncCrewRunner(runs_dir=tmp_path / ".async_runs")
+    result = asyncio.run(runner._run_in_workspace(tmp_path / "workspace", {}))
+
+    assert not result["success"]
+    ((_, env),) = children
+    assert env["LLM_RATE_LIMIT_STORE"] == str((tmp_path / "rate_limits.sqlite3").resolve())
+    assert env["CREWAI_STORAGE_DIR"] == "workspace"
@@ -0,0 +1,30 @@
+"""Local ATS keyword coverage."""
+
+import pytest
+
+from resume_refiner_crew.ats_coverage import compute_keyword_coverage, keyword_variants, markdown_segments
+
+RESUME = """# Jane Doe
+
+## Experience
+- Built a CD pipeline for a team of analysts in R
+"""
+
+
+@pytest.mark.parametrize("keyword", ["A/B testing", "CI/CD", "Python or R"])
+def test_short_alternatives_do_not_cover_a_keyword(keyword):
+    coverage = compute_keyword_coverage({keyword: ["technical_skills"]}, markdown_segments(RESUME))
+
+    assert coverage["missing_keywords"] == [keyword]
+
+
+def test_known_skills_are_alternatives():
+    assert keyword_variants("TensorFlow / Keras") == [("tensorflow", "kera"), ("tensorflow",), ("kera",)]
+
+
+def test_multiword_alternatives_are_split():
+    assert ("deep", "learn") in keyword_variants("machine learning or deep learning")
+
+
+def test_qualifiers_are_dropped():
+    assert ("aws",) in keyword_variants("AWS (EC2, S3)")
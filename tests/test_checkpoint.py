@@ -0,0 +1,54 @@
+"""Run checkpoints."""
+
+from crewai.tasks.task_output import TaskOutput
+
+from resume_refiner_crew import checkpoint
+from resume_refiner_crew.checkpoint import (
+    create_run,
+    find_parsed_resume,
+    fork_run,
+    get_invalidated_tasks,
+    load_manifest,
+    save_task_checkpoint,
+)
+
+
+def test_parsed_resume_is_only_reused_for_the_same_pdf(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "RUNS_DIR", tmp_path / ".runs")
+    parsed_pdf = tmp_path / "CV.pdf"
+    parsed_pdf.write_bytes(b"%PDF-1.4 first resume")
+    other_pdf = tmp_path / "other" / "CV.pdf"
+    other_pdf.parent.mkdir()
+    other_pdf.write_bytes(b"%PDF-1.4 second resume")
+
+    assert find_parsed_resume(parsed_pdf) is None
+    run_id = create_run({}, {}, [parsed_pdf])
+    save_task_checkpoint(run_id, TaskOutput(
+        name="parse_resume_task", description="Parse", raw="# Jane Doe", agent="Resume Parser"
+    ))
+
+    assert find_parsed_resume(parsed_pdf) == "# Jane Doe"
+    assert find_parsed_resume(other_pdf) is None
+
+
+def test_toggling_the_fact_check_regenerates_the_resume():
+    # In the fast profile the resume writer does the self-verification
+    invalidated = get_invalidated_tasks({"enable_fact_check"})
+
+    assert {"generate_resume_task", "verify_resume_task", "harvard_format_task"} <= invalidated
+    assert not {"parse_resume_task", "analyze_job_task", "optimize_resume_task"} & invalidated
+
+
+def test_fork_keeps_only_valid_checkpoints(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "RUNS_DIR", tmp_path / ".runs")
+    resume_pdf = tmp_path / "CV.pdf"
+    resume_pdf.write_bytes(b"%PDF-1.4 resume")
+    run_id = create_run({}, {"pipeline_profile": "fast", "enable_fact_check": True}, [resume_pdf])
+    for task_name in ("parse_resume_task", "optimize_resume_task", "generate_resume_task"):
+        save_task_checkpoint(run_id, TaskOutput(
+            name=task_name, description=task_name, raw=task_name, agent="Agent"
+        ))
+
+    forked = fork_run(run_id, {}, {"pipeline_profile": "fast", "enable_fact_check": False})
+
+    assert set(load_manifest(forked)["tasks"]) == {"parse_resume_task", "optimize_resume_task"}
@@ -0,0 +1,67 @@
+"""Local pre-pass of the fact check and application of the fact checker's verdicts."""
+
+from pathlib import Path
+
+from resume_refiner_crew.fact_check import (
+    ClaimVerdict,
+    SourceIndex,
+    apply_verdicts,
+    find_suspect_claims,
+    score_claims,
+)
+
+
+ORIGINAL = (Path(__file__).parent / "fixtures" / "output" / "parsed_resume.md").read_text(encoding="utf-8")
+
+OPTIMIZED = """# Marco Mongi
+marcomongi@gmail.com
+
+## Work Experience
+- Developed an automatic crop detection platform in Python with 80% accuracy
+- Managed a budget of $5 million for deep learning projects
+- Led teams of up to 10 people on the SABIA-Mar satellite mission
+"""
+
+
+def test_rewordings_of_the_original_are_supported():
+    claims = score_claims(OPTIMIZED, SourceIndex.build(ORIGINAL))
+
+    crop, _, teams = claims
+    assert not crop.is_suspect
+    assert not teams.is_suspect
+
+
+def test_number_with_an_invented_unit_is_suspect():
+    suspects = find_suspect_claims(ORIGINAL, OPTIMIZED)
+
+    assert [claim.text for claim in suspects] == [
+        "Managed a budget of $5 million for deep learning projects"
+    ]
+    assert suspects[0].claim_id == 1
+    assert suspects[0].unsupported_numbers == ["$5 million"]
+
+
+def test_known_number_with_a_different_unit_is_suspect():
+    optimized = OPTIMIZED.replace("80% accuracy", "80 years of accuracy")
+
+    claim = score_claims(optimized, SourceIndex.build(ORIGINAL))[0]
+
+    assert claim.unsupported_numbers == ["80 years"]
+
+
+def test_verdicts_are_applied_and_skipped_claims_removed():
+    optimized = OPTIMIZED.replace("with 80% accuracy", "with 95% accuracy")
+    suspects = find_suspect_claims(ORIGINAL, optimized)
+    assert [claim.claim_id for claim in suspects] == [1, 2]
+
+    verified = apply_verdicts(optimized, suspects, [
+        ClaimVerdict(
+            claim_id=1,
+            action="rewrite",
+            text="Developed an automatic crop detection platform in Python with 80% accuracy",
+        ),
+    ])
+
+    assert "- Developed an automatic crop detection platform in Python with 80% accuracy" in verified
+    assert "$5 million" not in verified
+    assert "Led teams of up to 10 people" in verified
@@ -0,0 +1,17 @@
+"""The compact job analysis keeps every field downstream tasks read."""
+
+from resume_refiner_crew.constants import CONTEXT_FIELDS
+from resume_refiner_crew.models import JobRequirements, JobRequirementsLite
+
+
+def test_compact_schema_has_every_field_the_optimizer_reads():
+    fields = CONTEXT_FIELDS["optimize_resume_task"]["analyze_job_task"]
+    assert set(fields) <= set(JobRequirementsLite.model_fields)
+
+
+def test_compact_schema_is_a_subset_of_the_full_schema():
+    assert set(JobRequirementsLite.model_fields) <= set(JobRequirements.model_fields)
+
+
+def test_compact_schema_keeps_tools_for_ats_coverage():
+    assert "tools_and_technologies" in JobRequirementsLite.model_fields
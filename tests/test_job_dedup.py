@@ -0,0 +1,54 @@
+"""Reuse of job analyses across near-duplicate job descriptions."""
+
+from resume_refiner_crew import job_dedup
+from resume_refiner_crew.job_dedup import JobAnalysisIndex
+
+WORDS = [f"requirement{i}" for i in range(200)]
+JOB_DESCRIPTION = " ".join(WORDS)
+
+
+def _edited(changed_words: int) -> str:
+    """The job description with words replaced 10 apart (5 shingles each)."""
+    words = list(WORDS)
+    for i in range(changed_words):
+        words[10 + i * 10] = f"changed{i}"
+    return " ".join(words)
+
+
+def _add(index: JobAnalysisIndex, job_description: str = JOB_DESCRIPTION) -> str:
+    return index.add(job_description, '{"job_title": "Data Engineer"}', "full", "resume text")
+
+
+def test_near_duplicate_reuses_the_analysis(tmp_path):
+    _add(JobAnalysisIndex(tmp_path))
+
+    # Reloaded from disk, reformatted and with three words changed (Jaccard ~0.86)
+    reposted = _edited(3).upper().replace(" ", "\n  ", 20)
+    match = JobAnalysisIndex(tmp_path).find(reposted, "full")
+
+    assert match is not None
+    assert match["similarity"] >= job_dedup.JOB_DEDUP_THRESHOLD
+    assert match["analysis"] == {"job_title": "Data Engineer"}
+
+
+def test_different_postings_and_modes_are_not_reused(tmp_path):
+    index = JobAnalysisIndex(tmp_path)
+    _add(index)
+
+    # Five changed words leave a Jaccard similarity of ~0.77, below the threshold
+    assert index.find(_edited(5), "full") is None
+    assert index.find(JOB_DESCRIPTION, "fast") is None
+    assert index.find("", "full") is None
+
+
+def test_oldest_analyses_are_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_dedup, "JOB_DEDUP_MAX_ENTRIES", 2)
+    index = JobAnalysisIndex(tmp_path)
+    postings = [" ".join(f"{prefix}{i}" for i in range(50)) for prefix in ("alpha", "beta", "gamma")]
+    oldest_id, *_ = [_add(index, posting) for posting in postings]
+
+    reloaded = JobAnalysisIndex(tmp_path)
+    assert len(reloaded.entries) == 2
+    assert not (tmp_path / f"{oldest_id}.json").exists()
+    assert reloaded.find(postings[0], "full") is None
+    assert reloaded.find(postings[2], "full") is not None
@@ -0,0 +1,40 @@
+"""Boilerplate removal from pasted job descriptions."""
+
+from resume_refiner_crew.job_description import preprocess_job_description
+
+INTRO = (
+    "Data Engineer at Acme. You will design and build batch and streaming pipelines "
+    "for the analytics platform, and develop the data models our analysts query."
+)
+
+
+def test_single_line_heading_ends_a_boilerplate_section():
+    text = "\n\n".join([
+        INTRO,
+        "Benefits",
+        "Flexible hours and a yearly learning budget.",
+        "Requirements",
+        "Python and SQL in production.",
+        "Qualifications",
+        "Airflow or Dagster.",
+    ])
+
+    reduced, stats = preprocess_job_description(text)
+
+    assert "learning budget" not in reduced
+    assert "Python and SQL in production." in reduced
+    assert "Airflow or Dagster." in reduced
+    assert stats["removed_paragraphs"] == {"benefits": 2}
+
+
+def test_requirements_inside_a_boilerplate_section_are_kept():
+    text = "\n\n".join([
+        INTRO,
+        "About us:\nWe are a small team of data people.",
+        "Experience with Kafka is a plus.",
+    ])
+
+    reduced, _ = preprocess_job_description(text)
+
+    assert "small team" not in reduced
+    assert "Experience with Kafka is a plus." in reduced
@@ -0,0 +1,20 @@
+"""Keyword bolding of the LaTeX resume."""
+
+import pytest
+
+from resume_refiner_crew.tools.latex_generator import bold_keywords
+
+
+@pytest.mark.parametrize("keyword, bolded", [
+    ("40%", r"\textbf{40\%}"),
+    ("$2M", r"\textbf{\$2M}"),
+])
+def test_metric_keywords_are_bolded_with_their_symbols(keyword, bolded):
+    text = bold_keywords("Cut costs by 40% and saved $2M a year", [keyword])
+
+    assert bolded in text
+    assert text.count("%") == 1 and text.count("$") == 1
+
+
+def test_taxonomy_aliases_are_bolded():
+    assert bold_keywords("Trained models in pytorch", ["PyTorch"]) == r"Trained models in \textbf{pytorch}"
@@ -0,0 +1,50 @@
+"""Hedge delay settings of LLM requests."""
+
+import pytest
+
+from resume_refiner_crew.constants import LLM_HEDGE_PERCENTILE, LLM_LATENCY_SLO_SECONDS
+from resume_refiner_crew.llm_resilience import LatencyTracker, request_policy
+from resume_refiner_crew.validation import ConfigurationError
+
+
+def test_defaults_apply_without_overrides(monkeypatch):
+    monkeypatch.delenv("LLM_HEDGE_PERCENTILE", raising=False)
+    monkeypatch.delenv("LLM_LATENCY_SLO_SECONDS", raising=False)
+
+    policy = request_policy("resume_writer")
+
+    assert policy.hedge_percentile == LLM_HEDGE_PERCENTILE
+    assert policy.slo_seconds == LLM_LATENCY_SLO_SECONDS["resume_writer"]
+
+
+def test_environment_overrides_percentile_and_slos(monkeypatch):
+    monkeypatch.setenv("LLM_HEDGE_PERCENTILE", "50")
+    monkeypatch.setenv("LLM_LATENCY_SLO_SECONDS", '{"resume_writer": 180}')
+
+    policy = request_policy("resume_writer")
+
+    assert policy.hedge_percentile == 50.0
+    assert policy.slo_seconds == 180.0
+    assert request_policy("fact_checker").slo_seconds == LLM_LATENCY_SLO_SECONDS["fact_checker"]
+
+
+@pytest.mark.parametrize("name, value", [
+    ("LLM_HEDGE_PERCENTILE", "0"),
+    ("LLM_HEDGE_PERCENTILE", "p95"),
+    ("LLM_LATENCY_SLO_SECONDS", "[180]"),
+    ("LLM_LATENCY_SLO_SECONDS", '{"resume_writer": -1}'),
+])
+def test_invalid_overrides_are_rejected(monkeypatch, name, value):
+    monkeypatch.setenv(name, value)
+
+    with pytest.raises(ConfigurationError):
+        request_policy("resume_writer")
+
+
+def test_hedge_delay_uses_the_percentile():
+    tracker = LatencyTracker()
+    for seconds in range(10, 20):
+        tracker.record(("agent", "model", False), float(seconds))
+
+    assert tracker.hedge_delay(("agent", "model", False), 60.0, percentile=50) == 15.0
+    assert tracker.hedge_delay(("agent", "model", False), 60.0, percentile=95) == 19.0
@@ -0,0 +1,55 @@
+"""LocalFirstAgent fallbacks and retries."""
+
+import pytest
+from crewai import LLM, Agent, Task
+
+from resume_refiner_crew.fact_check import parse_verdicts
+from resume_refiner_crew.local_first import LocalFirstAgent
+
+
+def make_agent(answers, **handlers):
+    agent = LocalFirstAgent(
+        role="Checker", goal="Check", backstory="Checks",
+        llm=LLM(model="gpt-4o-mini", api_key="test"), **handlers
+    )
+    task = Task(description="Check", expected_output="JSON", agent=agent)
+    calls = []
+
+    def execute_task(self, task, context=None, tools=None):
+        calls.append(context)
+        return answers[len(calls) - 1]
+
+    return agent, task, calls, execute_task
+
+
+def test_unusable_answer_is_asked_again(monkeypatch):
+    agent, task, calls, execute_task = make_agent(
+        ["not json", '[{"claim_id": 1, "action": "keep"}]'],
+        output_handler=lambda task, result: str(len(parse_verdicts(result)))
+    )
+    monkeypatch.setattr(Agent, "execute_task", execute_task)
+
+    assert agent.execute_task(task) == "1"
+    assert len(calls) == 2
+
+
+def test_unusable_answers_fail_after_the_retries(monkeypatch):
+    agent, task, calls, execute_task = make_agent(
+        ["not json", "still not json"],
+        output_handler=lambda task, result: str(len(parse_verdicts(result)))
+    )
+    monkeypatch.setattr(Agent, "execute_task", execute_task)
+
+    with pytest.raises(ValueError):
+        agent.execute_task(task)
+    assert len(calls) == agent.output_retries + 1
+
+
+def test_failing_local_handler_falls_back_to_the_llm(monkeypatch):
+    def local_handler(task):
+        raise RuntimeError("no local result")
+
+    agent, task, calls, execute_task = make_agent(["llm answer"], local_handler=local_handler)
+    monkeypatch.setattr(Agent, "execute_task", execute_task)
+
+    assert agent.execute_task(task) == "llm answer"
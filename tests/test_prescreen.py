@@ -0,0 +1,36 @@
+"""Local BM25 pre-screen of job descriptions."""
+
+import pytest
+
+from resume_refiner_crew.prescreen import rank_job_descriptions
+from resume_refiner_crew.validation import InvalidInputError
+
+RESUME = """Computer vision engineer. Built object detection and tracking pipelines in
+Python with PyTorch and OpenCV, deployed on edge devices with Docker."""
+
+POSTINGS = {
+    "cv_engineer": "Computer vision engineer: object detection and tracking with PyTorch, OpenCV and Docker.",
+    "data_engineer": "Data engineer: Python ETL pipelines, Airflow, Spark and SQL warehouses.",
+    "accountant": "Accountant: payroll, invoices, tax filings and monthly financial statements.",
+}
+
+
+def test_postings_are_ranked_by_match():
+    ranking = rank_job_descriptions(RESUME, POSTINGS)
+
+    assert [score["posting"] for score in ranking] == ["cv_engineer", "data_engineer", "accountant"]
+    assert [score["rank"] for score in ranking] == [1, 2, 3]
+    assert ranking[0]["score"] > ranking[1]["score"] > ranking[2]["score"]
+    assert "opencv" in ranking[0]["matched_keywords"]
+    assert ranking[2]["matched_keywords"] == []
+
+
+def test_top_k_keeps_the_best_postings():
+    ranking = rank_job_descriptions(RESUME, POSTINGS, top_k=1)
+
+    assert [score["posting"] for score in ranking] == ["cv_engineer"]
+
+
+def test_empty_documents_are_rejected():
+    with pytest.raises(InvalidInputError):
+        rank_job_descriptions(RESUME, {"empty": "   "})
@@ -0,0 +1,77 @@
+"""Rate-limit scheduler shared across processes."""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+from resume_refiner_crew.rate_limiter import RateLimitScheduler
+
+MODEL = "gpt-4o-mini"
+
+CHILD = """
+import sys, time
+from resume_refiner_crew.rate_limiter import get_rate_limit_scheduler
+scheduler = get_rate_limit_scheduler()
+if sys.argv[1] == "try":
+    print(scheduler.try_acquire("sk-shared", "gpt-4o-mini", 100))
+else:
+    scheduler.acquire("sk-shared", "gpt-4o-mini", 100, priority=sys.argv[1])
+    print(time.time())
+"""
+
+
+def _start_child(store, limits, mode):
+    env = {**os.environ, "LLM_RATE_LIMIT_STORE": str(store), "LLM_RATE_LIMITS": json.dumps(limits)}
+    return subprocess.Popen(
+        [sys.executable, "-c", CHILD, mode], env=env, stdout=subprocess.PIPE, text=True
+    )
+
+
+def _output(child):
+    stdout, _ = child.communicate(timeout=30)
+    assert child.returncode == 0
+    return stdout.strip()
+
+
+def test_processes_sharing_a_key_share_one_budget(tmp_path):
+    store = tmp_path / "rate_limits.sqlite3"
+    limits = {MODEL: [1, 1_000_000]}
+
+    children = [_start_child(store, limits, "try") for _ in range(2)]
+
+    assert sorted(_output(child) for child in children) == ["False", "True"]
+    metrics = RateLimitScheduler(limits, store=store).queue_metrics()
+    assert [(m["model"], m["requests_sent"]) for m in metrics] == [(MODEL, 1)]
+
+
+def test_interactive_requests_of_another_process_go_first(tmp_path):
+    store = tmp_path / "rate_limits.sqlite3"
+    # One request per second once the budget is spent
+    limits = {MODEL: [60, 1_000_000]}
+    scheduler = RateLimitScheduler(limits, store=store)
+    while scheduler.try_acquire("sk-shared", MODEL, 100):
+        pass
+
+    batch = _start_child(store, limits, "batch")
+    deadline = time.time() + 20
+    while not any(m["queued"]["batch"] for m in scheduler.queue_metrics()):
+        assert time.time() < deadline, "the batch request was never queued"
+        time.sleep(0.01)
+    scheduler.acquire("sk-shared", MODEL, 100, priority="interactive")
+    interactive_done = time.time()
+
+    assert interactive_done < float(_output(batch))
+
+
+def test_rejected_request_empties_the_shared_budget(tmp_path):
+    store = tmp_path / "rate_limits.sqlite3"
+    limits = {MODEL: (500, 1_000_000)}
+    first, second = RateLimitScheduler(limits, store=store), RateLimitScheduler(limits, store=store)
+
+    first.rate_limited("sk-shared", MODEL)
+
+    assert not second.try_acquire("sk-shared", MODEL, 100)
+    assert second.try_acquire("sk-other", MODEL, 100)
+    assert [m["rate_limited"] for m in second.queue_metrics() if m["requests_sent"] == 0] == [1]
@@ -0,0 +1,26 @@
+"""Final report rendering."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from resume_refiner_crew.models import JobRequirementsLite
+from resume_refiner_crew.report import render_report
+from resume_refiner_crew.validation import ConfigurationError
+
+FIXTURE = Path(__file__).parent / "fixtures" / "output" / "job_analysis.json"
+
+
+def test_report_renders_outside_the_project_folder(tmp_path, monkeypatch):
+    job_analysis = JobRequirementsLite.model_validate(json.loads(FIXTURE.read_text(encoding="utf-8")))
+    monkeypatch.chdir(tmp_path)
+
+    report = render_report(job_analysis, None)
+
+    assert job_analysis.job_title in report
+
+
+def test_missing_template_fails_loudly(tmp_path):
+    with pytest.raises(ConfigurationError):
+        render_report(None, None, template_path=tmp_path / "final_report.md.j2")
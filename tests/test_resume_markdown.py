@@ -0,0 +1,97 @@
+"""Deterministic parsing of the generated markdown resume."""
+
+from pathlib import Path
+
+import pytest
+
+from resume_refiner_crew.resume_markdown import ResumeParseError, parse_resume_markdown
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "output"
+
+RESUME = """# Jane Doe
+jane@example.com • Madrid, Spain
+
+## Summary
+Backend engineer with 6 years of experience.
+
+## Work Experience
+### Acme Corp — Madrid, Spain
+- Senior Engineer, Engineer — July 2020 – Present
+  - Cut API latency by 40% with Python and Redis
+- Intern — 2019
+  - Built internal tooling
+
+## Education
+### Universidad Politécnica — Madrid
+- BSc Computer Science — 2015 – 2019
+  - GPA 8.9
+
+## Certifications
+- AWS Solutions Architect — Amazon (Associate), 2023
+
+## Skills
+### Backend
+- Python, Go; SQL
+
+## Languages
+- Spanish (Native), English (C1)
+"""
+
+
+def test_parses_resume_in_writer_conventions():
+    resume = parse_resume_markdown(RESUME, bold_candidates=["Python", "Kubernetes"])
+
+    assert resume.candidate_name == "Jane Doe"
+    assert resume.contact_info == "jane@example.com • Madrid, Spain"
+    assert resume.language == "English"
+
+    current, internship = resume.work_experience
+    assert (current.institution, current.location) == ("Acme Corp", "Madrid, Spain")
+    assert current.roles == ["Senior Engineer", "Engineer"]
+    assert (current.date_start, current.date_end) == ("July 2020", "Present")
+    assert current.keywords_to_bold == ["Python"]
+    assert (internship.date_start, internship.date_end) == ("2019", "2019")
+
+    education = resume.education[0]
+    assert (education.degree, education.year_start, education.year_end) == (
+        "BSc Computer Science", "2015", "2019"
+    )
+    assert education.additional_info == "GPA 8.9"
+
+    certification = resume.certifications[0]
+    assert (certification.provider, certification.grade) == ("Amazon", "Associate")
+    assert resume.skills == {"Backend": ["Python", "Go", "SQL"]}
+
+
+def test_parses_repo_fixture():
+    markdown = (FIXTURES_DIR / "optimized_resume.md").read_text(encoding="utf-8")
+
+    resume = parse_resume_markdown(markdown)
+
+    faculty = resume.work_experience[-1]
+    assert (faculty.institution, faculty.location) == ("Faculty of Engineering, UNRC", "Río Cuarto")
+
+
+def test_comma_heading_with_unknown_location_is_ambiguous():
+    markdown = RESUME.replace("### Acme Corp — Madrid, Spain", "### Acme, Inc., Lisbon, Portugal")
+
+    with pytest.raises(ResumeParseError, match="Ambiguous location"):
+        parse_resume_markdown(markdown)
+
+
+@pytest.mark.parametrize("old, new, message", [
+    ("# Jane Doe\n", "", "does not start with"),
+    ("July 2020 – Present", "since forever", "Unrecognized"),
+    ("## Languages", "## Skills", "Duplicate section"),
+])
+def test_unmappable_resumes_raise(old, new, message):
+    with pytest.raises(ResumeParseError, match=message):
+        parse_resume_markdown(RESUME.replace(old, new, 1))
+
+
+def test_mixed_language_headings_raise():
+    markdown = "# Jane Doe\njane@example.com\n\n## Summary\nEngineer.\n\n## Idiomas\n- Español\n"
+
+    with pytest.raises(ResumeParseError, match="language"):
+        parse_resume_markdown(markdown)
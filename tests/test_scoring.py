@@ -0,0 +1,74 @@
+"""Local job match scoring and the job analysis fixture."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from resume_refiner_crew.models import JobMatchScore, JobRequirements, JobRequirementsLite, SkillScore
+from resume_refiner_crew.scoring import compute_match_scores, get_scoring_factors
+
+FIXTURE = Path(__file__).parent / "fixtures" / "output" / "job_analysis.json"
+
+ASSESSMENTS = {"experience": 0.5, "education": 1.0, "industry": 0.0}
+
+
+def skill(name, category="technical", required=True, match_level=1.0, context_score=1.0):
+    return SkillScore(
+        skill_name=name, category=category, required=required,
+        match_level=match_level, context_score=context_score
+    )
+
+
+def test_category_matches_are_importance_weighted():
+    skills = [
+        skill("Python", match_level=1.0),
+        skill("Rust", required=False, match_level=0.0),
+        skill("Teamwork", category="soft", match_level=0.5),
+    ]
+    scores = compute_match_scores(skills, ASSESSMENTS)
+
+    assert scores["technical_skills_match"] == pytest.approx(100 * 1.0 / 1.5, abs=0.1)
+    assert scores["soft_skills_match"] == 50.0
+    assert scores["experience_match"] == 50.0
+    assert scores["education_match"] == 100.0
+    assert scores["industry_match"] == 0.0
+
+
+def test_category_without_skills_is_not_scored():
+    factors = get_scoring_factors()
+    scores = compute_match_scores([skill("Python", match_level=0.0)], ASSESSMENTS, factors)
+
+    assert scores["soft_skills_match"] is None
+    scored = {name: weight for name, weight in factors.items() if name != "soft_skills"}
+    expected = sum(weight * scores[f"{name}_match"] for name, weight in scored.items()) / sum(scored.values())
+    assert scores["overall_match"] == pytest.approx(expected, abs=0.1)
+
+
+def test_no_skills_does_not_score_100():
+    scores = compute_match_scores([], {"experience": 0.0, "education": 0.0, "industry": 0.0})
+
+    assert scores["technical_skills_match"] is None
+    assert scores["soft_skills_match"] is None
+    assert scores["overall_match"] == 0.0
+
+
+def test_match_score_migrates_percentages_of_older_analyses():
+    score = JobMatchScore.model_validate({
+        "overall_match": 82,
+        "experience_match": 75,
+        "education_match": 0.85,
+        "industry_match": 60,
+        "skill_details": [],
+    })
+
+    assert score.experience_assessment == 0.75
+    assert score.education_assessment == 0.85
+    assert score.industry_assessment == 0.6
+
+
+@pytest.mark.parametrize("schema", [JobRequirements, JobRequirementsLite])
+def test_fixture_validates(schema):
+    analysis = schema.model_validate(json.loads(FIXTURE.read_text(encoding="utf-8")))
+    assert analysis.match_score.technical_skills_match is not None
+    assert analysis.match_score.soft_skills_match is not None
@@ -0,0 +1,74 @@
+"""Single-flight coalescing of identical crew submissions."""
+
+import asyncio
+
+import pytest
+
+from resume_refiner_crew.single_flight import SingleFlight, submission_key
+
+
+def test_submission_key_depends_on_every_parameter():
+    key = submission_key(b"%PDF", "Data Engineer", "sk-a", model="gpt-4o-mini", target_words=500)
+
+    assert key == submission_key(b"%PDF", "Data Engineer", "sk-a", target_words=500, model="gpt-4o-mini")
+    assert key != submission_key(b"%PDF", "Data Engineer", "sk-b", model="gpt-4o-mini", target_words=500)
+    assert key != submission_key(b"%PDF", "Data Engineer", "sk-a", model="gpt-4o-mini", target_words=600)
+
+
+async def _submit(flights: SingleFlight, key: str, run) -> str:
+    task, started = flights.join(key, lambda: asyncio.ensure_future(run()))
+    if started:
+        task.add_done_callback(lambda done: flights.finish(key, done))
+    return await task
+
+
+def test_concurrent_identical_submissions_share_one_run():
+    starts = []
+
+    async def run():
+        starts.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        flights: SingleFlight = SingleFlight()
+        results = await asyncio.gather(*(_submit(flights, "key", run) for _ in range(3)))
+        return results, len(flights)
+
+    results, in_flight = asyncio.run(main())
+
+    assert results == ["result"] * 3
+    assert len(starts) == 1
+    assert in_flight == 0
+
+
+def test_error_reaches_every_waiter_and_next_submission_starts_again():
+    starts = []
+
+    async def run():
+        starts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("crew failed")
+
+    async def main():
+        flights: SingleFlight = SingleFlight()
+        results = await asyncio.gather(
+            *(_submit(flights, "key", run) for _ in range(3)), return_exceptions=True
+        )
+        with pytest.raises(RuntimeError):
+            await _submit(flights, "key", run)
+        return results
+
+    results = asyncio.run(main())
+
+    assert [str(result) for result in results] == ["crew failed"] * 3
+    assert len(starts) == 2
+
+
+def test_finished_execution_that_was_not_collected_is_replaced():
+    flights: SingleFlight = SingleFlight()
+    flights.join("key", lambda: "dead")
+
+    flight, started = flights.join("key", lambda: "new", alive=lambda f: f != "dead")
+
+    assert (flight, started) == ("new", True)
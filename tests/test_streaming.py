@@ -0,0 +1,27 @@
+"""Live output relay of streamed completions."""
+
+from types import SimpleNamespace
+
+from resume_refiner_crew.streaming import LiveOutputRelay, extract_live_markdown
+
+
+def chunk(task_name, text):
+    return SimpleNamespace(task_name=task_name, chunk=text)
+
+
+def test_chunks_are_appended_per_task(tmp_path):
+    output_file = tmp_path / "live_output.md"
+    relay = LiveOutputRelay(output_file, task_names=["generate_resume_task", "verify_resume_task"])
+
+    relay._on_chunk(None, chunk("generate_resume_task", "Final Answer: # Jane"))
+    relay._on_chunk(None, chunk("generate_resume_task", " Doe"))
+    relay._on_chunk(None, chunk("parse_resume_task", "ignored"))
+    assert output_file.read_text(encoding="utf-8") == "Final Answer: # Jane Doe"
+
+    relay._on_chunk(None, chunk("verify_resume_task", "Thought:"))
+    assert output_file.read_text(encoding="utf-8") == "Thought:"
+
+
+def test_markdown_starts_after_the_final_answer():
+    assert extract_live_markdown("Thought: draft") is None
+    assert extract_live_markdown("Thought: ok\nFinal Answer:\n# Jane Doe") == "# Jane Doe"
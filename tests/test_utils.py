@@ -0,0 +1,18 @@
+"""Crew storage helpers."""
+
+import pytest
+from crewai import LLM, Agent, Crew, Task
+
+from resume_refiner_crew.utils import reset_crew_memories
+
+
+def test_crew_with_all_knowledge_inlined_is_reset():
+    agent = Agent(
+        role="Analyzer", goal="Analyze", backstory="Analyzes",
+        llm=LLM(model="gpt-4o-mini", api_key="test")
+    )
+    crew = Crew(agents=[agent], tasks=[Task(description="Analyze", expected_output="Text", agent=agent)])
+
+    with pytest.raises(RuntimeError):
+        crew.reset_memories(command_type='knowledge')
+    reset_crew_memories(crew)
@@ -0,0 +1,39 @@
+"""Word counts and per-section budgets of WordCounterTool."""
+
+from resume_refiner_crew.tools.word_counter_tool import HEADER_SECTION, WordCounterTool
+
+RESUME = """# Jane Doe
+jane@example.com
+
+## Experience
+- Built data pipelines in Python
+- Led a team of four engineers
+
+## Skills
+Python, SQL
+"""
+
+
+def test_plain_text_is_not_counted_with_a_header_title():
+    result = WordCounterTool(target_words=100)._run("hello world")
+
+    assert result["word_count"] == 2
+    assert result["sections"][0]["section"] == HEADER_SECTION
+    assert result["sections"][0]["word_count"] == 2
+
+
+def test_section_titles_are_counted():
+    result = WordCounterTool(target_words=100)._run(RESUME)
+    words = {section["section"]: section["word_count"] for section in result["sections"]}
+
+    assert words == {HEADER_SECTION: 3, "Experience": 12, "Skills": 3}
+    assert result["word_count"] == 18
+
+
+def test_text_without_sections_gets_a_budget():
+    result = WordCounterTool(target_words=100)._run("word " * 200)
+
+    assert not result["is_within_target"]
+    assert result["sections"][0]["suggested_words"] == 100
+    assert result["sections"][0]["words_to_change"] == -100
+    assert "Header -100" in result["message"]